@@ -1,7 +1,9 @@
 import os
-import requests
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
+from website_scraper_project.scraper.http_client import fetch
+from website_scraper_project.scraper.readability import extract_main_content
+from website_scraper_project.scraper.llm import MapReduceSummarizer
 from IPython.display import Markdown, display
 from openai import OpenAI
 load_dotenv(override=True)
@@ -24,36 +26,37 @@ message = "Hello, GPT! This is my first ever message to you! Hi!"
 response = openai.chat.completions.create(model="gpt-4o-mini", messages=[{"role":"user", "content":message}])
 print(response.choices[0].message.content)
 
-headers = {
- "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
-}
 
 class Website:
 
-    def __init__(self, url):
+    def __init__(self, url, session=None, timeout=None):
         """
         Create this Website object from the given url using the BeautifulSoup library
         """
         self.url = url
-        response = requests.get(url, headers=headers)
+        response = fetch(url, session=session, timeout=timeout)
         soup = BeautifulSoup(response.content, 'html.parser')
         self.title = soup.title.string if soup.title else "No title found"
         for irrelevant in soup.body(["script", "style", "img", "input"]):
             irrelevant.decompose()
         self.text = soup.body.get_text(separator="\n", strip=True)
+        # Navigation, footers and cookie banners stripped; far fewer tokens for the prompt
+        self.main_text = extract_main_content(soup) or self.text
 
 system_prompt = "You are an assistant that analyzes the contents of a website \
 and provides a short summary, ignoring text that might be navigation related. \
 Respond in markdown."
 
-def user_prompt_for(website):
-    user_prompt = f"You are looking at a website titled {website.title}"
-    user_prompt += "\nThe contents of this website is as follows; \
+def instructions_for(website):
+    instructions = f"You are looking at a website titled {website.title}"
+    instructions += "\nThe contents of this website is as follows; \
 please provide a short summary of this website in markdown. \
 Total employee count ? \
-If it includes news or announcements, then summarize these too.\n\n"
-    user_prompt += website.text
-    return user_prompt
+If it includes news or announcements, then summarize these too."
+    return instructions
+
+def user_prompt_for(website):
+    return instructions_for(website) + "\n\n" + website.main_text
 
 def messages_for(website):
     return [
@@ -61,13 +64,12 @@ def messages_for(website):
         {"role": "user", "content": user_prompt_for(website)}
     ]
 
+# Long pages are summarized in token-budgeted chunks; answers are cached on disk
+summarizer = MapReduceSummarizer(client=openai, model="gpt-4o-mini", system_prompt=system_prompt)
+
 def summarize(url):
     website = Website(url)
-    response = openai.chat.completions.create(
-        model = "gpt-4o-mini",
-        messages = messages_for(website)
-    )
-    return response.choices[0].message.content
+    return summarizer.summarize(website.main_text, instructions=instructions_for(website))
 
 def display_summary(url):
     summary = summarize(url)
@@ -1,7 +1,9 @@
 import os
-import requests
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
+from website_scraper_project.scraper.http_client import fetch
+from website_scraper_project.scraper.readability import extract_main_content
+from website_scraper_project.scraper.llm import MapReduceSummarizer
 from openai import OpenAI
 
 # Load environment variables
@@ -29,22 +31,20 @@ def chat_with_openai(message):
     )
     return response.choices[0].message.content
 
-# User-Agent for web scraping
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
-}
 
 # Class for scraping website data
 class Website:
-    def __init__(self, url):
+    def __init__(self, url, session=None, timeout=None):
         """Create a Website object using BeautifulSoup."""
         self.url = url
-        response = requests.get(url, headers=headers)
+        response = fetch(url, session=session, timeout=timeout)
         soup = BeautifulSoup(response.content, 'html.parser')
         self.title = soup.title.string if soup.title else "No title found"
         for irrelevant in soup.body(["script", "style", "img", "input"]):
             irrelevant.decompose()
         self.text = soup.body.get_text(separator="\n", strip=True)
+        # Navigation, footers and cookie banners stripped; far fewer tokens for the prompt
+        self.main_text = extract_main_content(soup) or self.text
 
 # Prompts for OpenAI
 system_prompt = (
@@ -52,11 +52,13 @@ system_prompt = (
     "ignoring text that might be navigation related. Respond in markdown."
 )
 
+def instructions_for(website):
+    instructions = f"You are looking at a website titled {website.title}.\n"
+    instructions += "The contents of this website are as follows. Please provide a short summary in markdown."
+    return instructions
+
 def user_prompt_for(website):
-    user_prompt = f"You are looking at a website titled {website.title}.\n"
-    user_prompt += "The contents of this website are as follows. Please provide a short summary in markdown.\n\n"
-    user_prompt += website.text
-    return user_prompt
+    return instructions_for(website) + "\n\n" + website.main_text
 
 def messages_for(website):
     return [
@@ -64,23 +66,29 @@ def messages_for(website):
         {"role": "user", "content": user_prompt_for(website)}
     ]
 
+# Long pages are summarized in token-budgeted chunks; answers are cached on disk
+summarizer = MapReduceSummarizer(client=openai, model="gpt-4o-mini", system_prompt=system_prompt)
+
 def summarize(url):
     website = Website(url)
     print(f"Website Title: {website.title}")
-    print(f"Website Text (sample): {website.text[:500]}")  # Debugging: print the first 500 characters
+    print(f"Website Text (sample): {website.main_text[:500]}")  # Debugging: print the first 500 characters
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages_for(website)
-        )
-        return response.choices[0].message.content
+        return summarizer.summarize(website.main_text, instructions=instructions_for(website))
     except Exception as e:
         return f"Error during summarization: {e}"
 
 def display_summary(url):
-    summary = summarize(url)
+    website = Website(url)
+    print(f"Website Title: {website.title}")
     print("Generated Summary:")
-    print(summary)
+    try:
+        # Print the summary as the model generates it instead of waiting for the whole answer
+        for token in summarizer.summarize_stream(website.main_text, instructions=instructions_for(website)):
+            print(token, end="", flush=True)
+        print()
+    except Exception as e:
+        print(f"Error during summarization: {e}")
 
 # Call the function
 display_summary("https://www.infosys.com")
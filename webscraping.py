@@ -1,31 +1,21 @@
+import argparse
+
 import requests
 from bs4 import BeautifulSoup
 
-# Get the company name from the user
-company = input("Enter the Company Name: ")
-
-# Construct the Wikipedia URL
-website = "https://en.wikipedia.org/wiki/"
-formatted_url = website + company.replace(" ", "_")  # Replace spaces with underscores
-print(f"Fetching data from: {formatted_url}")
-
-# File to save the output
-output_file = f"{company.replace(' ', '_')}_details.txt"
+from website_scraper_project.scraper.http_client import fetch
+from wikipedia_api import DEFAULT_WORKERS, lookup_companies, read_company_names, write_records
+from wikipedia_dump import DEFAULT_INDEX, DumpIndex, build_index
+from wikipedia_infobox import lead_summary_html, parse_infobox_html
 
-try:
-    # Make a single GET request to fetch the content
-    result = requests.get(formatted_url)
-    result.raise_for_status()  # Raise an error for invalid HTTP responses
 
-    # Parse the HTML content once
-    soup = BeautifulSoup(result.text, 'lxml')
+def save_details(company, combined_text, infobox):
+    """Write a company's summary and infobox to <name>_details.txt."""
+    # File to save the output
+    output_file = f"{company.replace(' ', '_')}_details.txt"
 
     # Open the file in write mode
     with open(output_file, 'w', encoding='utf-8') as file:
-        # Extract the first three <p> elements
-        paragraphs = soup.find_all('p', limit=3)  # Limit to the first 3 <p> elements
-        combined_text = " ".join([p.text.strip() for p in paragraphs if p.text.strip()])
-
         if combined_text:
             file.write("Company Summary:\n")
             file.write(combined_text + "\n\n")
@@ -34,15 +24,10 @@ try:
             file.write("Company Summary:\nNo meaningful content found in the first three paragraphs.\n\n")
             print("Could not extract meaningful content from the first three paragraphs.")
 
-        # Extract the infobox with class 'ib-company vCard'
-        infobox = soup.find('table', class_='infobox ib-company vcard')
-        if infobox:
+        if infobox is not None:
             file.write("Infobox Details:\n")
-            for row in infobox.find_all('tr'):
-                header = row.find('th')
-                data = row.find('td')
-                if header and data:
-                    file.write(f"{header.text.strip()}: {data.text.strip()}\n")
+            for header, data in infobox.items():
+                file.write(f"{header}: {data}\n")
             print("Infobox Details saved to file.")
         else:
             file.write("Infobox Details:\nNo infobox with class 'ib-company vCard' found.\n")
@@ -50,5 +35,101 @@ try:
 
     print(f"\nAll data has been saved to '{output_file}'.")
 
-except requests.exceptions.RequestException as e:
-    print(f"An error occurred: {e}")
\ No newline at end of file
+
+def scrape_company(company):
+    """Fetch one company's Wikipedia article and save its summary and infobox to <name>_details.txt."""
+    # Construct the Wikipedia URL
+    website = "https://en.wikipedia.org/wiki/"
+    formatted_url = website + company.replace(" ", "_")  # Replace spaces with underscores
+    print(f"Fetching data from: {formatted_url}")
+
+    try:
+        # Make a single GET request to fetch the content
+        result = fetch(formatted_url)
+        result.raise_for_status()  # Raise an error for invalid HTTP responses
+
+        # Parse the HTML content once
+        soup = BeautifulSoup(result.text, 'lxml')
+
+        # First three <p> elements and the infobox with class 'ib-company vCard'
+        save_details(company, lead_summary_html(soup), parse_infobox_html(soup))
+
+    except requests.exceptions.RequestException as e:
+        print(f"An error occurred: {e}")
+
+
+def lookup_company_offline(company, index_path=DEFAULT_INDEX):
+    """Same as scrape_company, but read from a local dump index instead of the live site."""
+    index = DumpIndex(index_path)
+    try:
+        record = index.lookup(company)
+    finally:
+        index.close()
+    if record["status"] == "missing":
+        print(f"'{company}' is not in the index '{index_path}'.")
+        return
+    print(f"Found '{record['title']}' in the index '{index_path}'.")
+    save_details(company, record["summary"], record["infobox"])
+
+
+def scrape_companies(names_file, output_file, workers=DEFAULT_WORKERS, index_path=None):
+    """Look up every company in names_file and save one JSON file.
+
+    Uses the MediaWiki API, or the local dump index at index_path when one is given.
+    """
+    names = read_company_names(names_file)
+    print(f"Looking up {len(names)} companies...")
+    if index_path:
+        index = DumpIndex(index_path)
+        try:
+            records = index.lookup_many(names)
+        finally:
+            index.close()
+    else:
+        try:
+            records = lookup_companies(names, workers=workers)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"An error occurred: {e}")
+            return
+    write_records(records, output_file)
+
+    counts = {}
+    for record in records:
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    resolved = sum(1 for record in records if "resolved_from" in record)
+    print(f"Found: {counts.get('found', 0)} ({resolved} via disambiguation pages), "
+          f"ambiguous: {counts.get('disambiguation', 0)}, missing: {counts.get('missing', 0)}")
+    print(f"\nAll data has been saved to '{output_file}'.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Save company summaries and infoboxes from Wikipedia.")
+    parser.add_argument("--batch", metavar="NAMES_FILE",
+                        help="file with one company name per line, looked up in bulk via the MediaWiki API")
+    parser.add_argument("--output", default="companies.json", help="JSON output file for --batch")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="concurrent API requests, or parser processes for --build-index")
+    parser.add_argument("--offline", action="store_true", help="look companies up in the local dump index")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="dump index file used by --offline")
+    parser.add_argument("--build-index", metavar="DUMP",
+                        help="build the --index file from a pages-articles XML dump (.xml, .bz2, .gz or .xz)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.build_index:
+            print(f"Indexing companies from '{args.build_index}'...")
+            count = build_index(args.build_index, args.index, args.workers)
+            print(f"Indexed {count} companies into '{args.index}'.")
+        elif args.batch:
+            scrape_companies(args.batch, args.output, args.workers, args.index if args.offline else None)
+        elif args.offline:
+            lookup_company_offline(input("Enter the Company Name: "), args.index)
+        else:
+            # Get the company name from the user
+            scrape_company(input("Enter the Company Name: "))
+    except FileNotFoundError as e:
+        print(f"An error occurred: {e}")
+
+
+if __name__ == "__main__":
+    main()
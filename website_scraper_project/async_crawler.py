@@ -0,0 +1,244 @@
+import asyncio
+import logging
+
+from playwright.async_api import async_playwright
+from playwright_stealth import stealth_async
+
+from crawl_state import CrawlState
+from scraper.deadline import Deadline
+from scraper.politeness import PolitenessScheduler
+from fingerprint import DuplicateIndex
+from page_records import open_writer
+from scraping_covertlangauage import (COOKIE_BUTTON_SELECTORS, GOTO_TIMEOUT, PAGE_DEADLINE, UNWANTED_TAGS,
+                                      browser_timeout, fetch_static_page, filter_links, get_url_depth,
+                                      MAX_URL_DEPTH, process_page_content, should_block_request)
+
+DEFAULT_CONCURRENCY = 4  # Browser contexts (and so page loads) in flight at once
+
+# === Page helpers (async versions of the ones in scraping_covertlangauage) ===
+
+async def close_cookie_popup(page):
+    for sel in COOKIE_BUTTON_SELECTORS:
+        try:
+            button = await page.query_selector(sel)
+            if button:
+                await button.click()
+                await asyncio.sleep(1)
+                break
+        except Exception:
+            continue
+
+async def remove_unwanted_elements(page):
+    for tag in UNWANTED_TAGS:
+        try:
+            await page.eval_on_selector_all(tag, "els => els.forEach(el => el.remove())")
+        except Exception:
+            continue
+
+async def block_resources(route):
+    """Playwright route handler that aborts requests the page text does not depend on."""
+    request = route.request
+    if should_block_request(request.resource_type, request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def safe_goto(page, url, max_retries=3, timeout=GOTO_TIMEOUT, deadline=None):
+    for i in range(max_retries):
+        if deadline and deadline.expired():
+            break
+        try:
+            await page.goto(url, timeout=browser_timeout(deadline, timeout), wait_until="domcontentloaded")
+            return True
+        except Exception as e:
+            print(f"Goto failed ({i+1}/{max_retries}): {e}")
+            await asyncio.sleep(deadline.timeout(2) if deadline else 2)
+    return False
+
+async def scrape_page(page, url, deadline=None):
+    """Load url in page and return (info, links) with the page text and every link on it."""
+    info = {"url": url}
+    links = []
+    try:
+        print(f"\nScraping: {url}")
+        if not await safe_goto(page, url, deadline=deadline):
+            if deadline and deadline.expired():
+                info["error"] = "Page load did not finish within the deadline"
+            else:
+                info["error"] = "Page load failed after retries"
+            return info, links
+        await page.wait_for_selector("body", timeout=browser_timeout(deadline, 5000))
+        await close_cookie_popup(page)
+        await remove_unwanted_elements(page)
+        info["page_content"] = await page.inner_text("body")
+        links = await page.eval_on_selector_all("a", "elements => elements.map(el => el.href)")
+    except Exception as e:
+        info["error"] = str(e)
+    return info, links
+
+# === Crawler ===
+
+class AsyncCrawler:
+    """Crawl company "about" pages with one shared browser and a pool of browser contexts.
+
+    Frontier URLs are fetched in parallel, at most `concurrency` page loads at a time across
+    all crawls running on this crawler, so many start URLs can share the one browser. URLs are
+    deduplicated and tracked in a CrawlState (in-memory unless one is passed in), and pages whose
+    text nearly matches an earlier page are recorded with "duplicate_of" and not processed.
+    With hybrid, pages are fetched over plain HTTP first and the browser (launched on first
+    need, with images/fonts/media/CSS and trackers blocked) only renders pages whose static
+    HTML has too little text. Each page gets page_deadline seconds from fetch to translation,
+    and every request is paced per host (and checked against robots.txt) by one shared
+    PolitenessScheduler. With output (a writer from page_records.open_writer), page infos
+    are written there as soon as they are processed instead of being collected in the results:
+
+        async with AsyncCrawler(concurrency=8) as crawler:
+            results = await crawler.crawl_many(start_urls)
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, max_depth=1, headless=True, hybrid=True, state=None,
+                 skip_duplicates=True, page_deadline=PAGE_DEADLINE, scheduler=None, output=None):
+        self.concurrency = concurrency
+        self.output = output
+        self.page_deadline = page_deadline
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.state = state or CrawlState()
+        self.duplicates = DuplicateIndex() if skip_duplicates else None
+        self.max_depth = max_depth
+        self.headless = headless
+        self.hybrid = hybrid
+        self._playwright = None
+        self._browser = None
+        self._contexts = []
+        self._pages = None
+        self._launch_lock = None
+        self._http_slots = None
+
+    async def __aenter__(self):
+        self._launch_lock = asyncio.Lock()
+        self._http_slots = asyncio.Semaphore(self.concurrency)
+        if not self.hybrid:
+            await self._ensure_browser()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for context in self._contexts:
+            await context.close()
+        if self._browser:
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+
+    async def _ensure_browser(self):
+        """Launch the browser and its pool of contexts the first time a page must be rendered."""
+        async with self._launch_lock:
+            if self._browser is not None:
+                return
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._pages = asyncio.Queue()
+            for _ in range(self.concurrency):
+                context = await self._browser.new_context()
+                await context.route("**/*", block_resources)
+                page = await context.new_page()
+                await stealth_async(page)
+                self._contexts.append(context)
+                self._pages.put_nowait(page)
+
+    async def crawl(self, start_url):
+        """Crawl one site breadth-first from start_url and return the info dict of every page."""
+        if get_url_depth(start_url) > MAX_URL_DEPTH:
+            return []
+        await asyncio.to_thread(self.state.add, start_url, depth=0)
+        return await self.crawl_frontier(site=start_url)
+
+    async def crawl_frontier(self, site=None):
+        """Work through the crawl state's frontier (optionally one site's) until it is empty.
+
+        CrawlState talks to SQLite, so its calls run in threads, off the event loop.
+        """
+        results = []
+        active = 0
+        finished = 0  # URLs visited so far; each one may have added links to the frontier
+        changed = asyncio.Condition()
+
+        async def worker():
+            nonlocal active, finished
+            while True:
+                seen = finished
+                claimed = await asyncio.to_thread(self.state.claim, site=site)
+                if not claimed:
+                    if not active and finished == seen:
+                        return
+                    # Other workers may still discover links; wait until one of them is done
+                    async with changed:
+                        await changed.wait_for(lambda: finished != seen)
+                    continue
+                url, depth, url_site = claimed[0]
+                active += 1
+                try:
+                    info, links = await self._visit(url)
+                    if self.output is not None:
+                        self.output.write(info)
+                    else:
+                        results.append(info)
+                    if depth < self.max_depth and not info.get("error"):
+                        await asyncio.to_thread(self._queue_links, links, depth + 1, url_site)
+                    await asyncio.to_thread(self.state.complete, url)
+                except Exception as e:
+                    logging.error(f"Failed to crawl {url}: {e}")
+                    await asyncio.to_thread(self.state.fail, url, e)
+                finally:
+                    active -= 1
+                    finished += 1
+                    async with changed:
+                        changed.notify_all()
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return results
+
+    def _queue_links(self, links, depth, site):
+        for link in filter_links(links, self.state):
+            self.state.add(link, depth, site=site)
+
+    async def crawl_many(self, start_urls):
+        """Crawl several sites concurrently on the shared browser; returns {start_url: results}."""
+        crawls = await asyncio.gather(*(self.crawl(url) for url in start_urls))
+        return dict(zip(start_urls, crawls))
+
+    async def _visit(self, url):
+        deadline = Deadline(self.page_deadline)
+        static = None
+        if self.hybrid:
+            async with self._http_slots:
+                static = await asyncio.to_thread(fetch_static_page, url, deadline=deadline, scheduler=self.scheduler)
+        if static:
+            info, links = static
+        else:
+            # Wait for the host's turn before taking a browser page from the pool
+            await asyncio.to_thread(self.scheduler.acquire, url, deadline)
+            await self._ensure_browser()
+            # Borrow a page from the pool so the total number of page loads stays bounded
+            page = await self._pages.get()
+            try:
+                info, links = await scrape_page(page, url, deadline=deadline)
+            finally:
+                self._pages.put_nowait(page)
+        # Summarizing and translating are blocking, so keep them off the event loop
+        await asyncio.to_thread(process_page_content, info, self.duplicates, deadline)
+        return info, links
+
+
+async def scrape_companies(start_urls, max_depth=1, concurrency=DEFAULT_CONCURRENCY, state=None,
+                           page_deadline=PAGE_DEADLINE, scheduler=None, output=None):
+    """Crawl the about/company pages of many sites with one browser; returns {start_url: results}."""
+    async with AsyncCrawler(concurrency=concurrency, max_depth=max_depth, state=state,
+                            page_deadline=page_deadline, scheduler=scheduler, output=output) as crawler:
+        return await crawler.crawl_many(start_urls)
+
+# === Run Script ===
+if __name__ == "__main__":
+    start_urls = ["https://www.beroepskaart.be/nl"]  # Replace with your target URLs
+    # Each page is appended as soon as it is processed; read it back with page_records.read_records
+    with open_writer("scraped_about_company_info_with_summary.jsonl") as output:
+        asyncio.run(scrape_companies(start_urls, max_depth=1, output=output))
@@ -0,0 +1,168 @@
+import hashlib
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+DEFAULT_LEASE_SECONDS = 600  # A claimed URL is handed out again if not finished within this time
+
+# === URL canonicalization ===
+
+def canonicalize_url(url):
+    """Canonical form of a URL used for crawl dedup.
+
+    Extends normalize_url (scheme://host/path, no query or fragment, no trailing slash) with a
+    lower-cased scheme and host, default ports dropped and repeated slashes collapsed.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    path = "/".join(segment for segment in parts.path.split("/") if segment)
+    path = f"/{path}" if path else ""
+    return urlunsplit((scheme, host, path, "", ""))
+
+# === Bloom filter ===
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, sized for `capacity` items at `error_rate`."""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+# === Crawl state ===
+
+class CrawlState:
+    """SQLite-backed crawl frontier with a Bloom-filter dedup layer.
+
+    Every URL ever discovered is stored once (by canonical form) with its depth, the start URL
+    of the crawl it belongs to and a status: pending, in_progress, done or failed. Workers
+    claim pending URLs atomically, so several processes can share one database file, and a
+    crashed run is resumed by opening the same file again: unfinished claims go back to the
+    frontier once their lease expires.
+    """
+
+    def __init__(self, path=":memory:", worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 bloom_capacity=1_000_000):
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                site TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                claimed_by TEXT,
+                claimed_at REAL,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS frontier_status ON frontier (status, site);
+        """)
+        # Rebuild the in-memory dedup layer from what earlier runs discovered
+        self._bloom = BloomFilter(capacity=bloom_capacity)
+        for (url,) in self._db.execute("SELECT url FROM frontier"):
+            self._bloom.add(url)
+
+    def close(self):
+        self._db.close()
+
+    def seen(self, url):
+        """True if url (in canonical form) has already been added to the frontier."""
+        url = canonicalize_url(url)
+        if url not in self._bloom:
+            return False
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM frontier WHERE url = ?", (url,)).fetchone() is not None
+
+    def add(self, url, depth, site=None):
+        """Queue url for crawling unless it is already known; returns True if it was new."""
+        url = canonicalize_url(url)
+        site = canonicalize_url(site) if site else url
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO frontier (url, depth, site) VALUES (?, ?, ?)", (url, depth, site))
+        self._bloom.add(url)
+        return cursor.rowcount == 1
+
+    def claim(self, site=None, limit=1):
+        """Atomically take up to limit pending URLs (optionally of one site) as [(url, depth, site)]."""
+        now = time.time()
+        query = ("SELECT url, depth, site FROM frontier WHERE "
+                 "(status = 'pending' OR (status = 'in_progress' AND claimed_at < ?))")
+        params = [now - self.lease_seconds]
+        if site is not None:
+            query += " AND site = ?"
+            params.append(canonicalize_url(site))
+        query += " ORDER BY depth LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(query, params).fetchall()
+                self._db.executemany(
+                    "UPDATE frontier SET status = 'in_progress', claimed_by = ?, claimed_at = ? WHERE url = ?",
+                    [(self.worker_id, now, url) for url, _, _ in rows])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return rows
+
+    def release_claims(self):
+        """Return every in-progress URL to the frontier, e.g. when resuming a single-process crawl."""
+        with self._lock:
+            self._db.execute("UPDATE frontier SET status = 'pending', claimed_by = NULL WHERE status = 'in_progress'")
+
+    def complete(self, url):
+        self._finish(url, "done", None)
+
+    def fail(self, url, error):
+        self._finish(url, "failed", str(error))
+
+    def _finish(self, url, status, error):
+        with self._lock:
+            self._db.execute("UPDATE frontier SET status = ?, error = ?, claimed_by = NULL WHERE url = ?",
+                             (status, error, canonicalize_url(url)))
+
+    def counts(self, site=None):
+        """Return {status: number of URLs}, optionally for one site."""
+        query = "SELECT status, COUNT(*) FROM frontier"
+        params = ()
+        if site is not None:
+            query += " WHERE site = ?"
+            params = (canonicalize_url(site),)
+        with self._lock:
+            return dict(self._db.execute(query + " GROUP BY status", params).fetchall())
+
+    def has_unfinished(self, site=None):
+        """True while any URL (optionally of one site) is pending or claimed by a worker."""
+        counts = self.counts(site)
+        return bool(counts.get("pending") or counts.get("in_progress"))
@@ -0,0 +1,74 @@
+import hashlib
+import re
+import threading
+
+import numpy as np
+
+SHINGLE_SIZE = 3
+DEFAULT_MAX_DISTANCE = 3  # Pages whose 64-bit SimHashes differ in at most this many bits are duplicates
+
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """Return the 64-bit SimHash of text's word shingles (0 for text without words)."""
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    if not shingles:
+        return 0
+
+    hashes = np.frombuffer(
+        b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles),
+        dtype=np.uint8).reshape(len(shingles), 8)
+    # Each bit votes +1 when set in a shingle's hash and -1 otherwise
+    votes = np.unpackbits(hashes, axis=1, bitorder="little").sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int.from_bytes(np.packbits(votes > 0, bitorder="little").tobytes(), "little")
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class DuplicateIndex:
+    """Remembers page fingerprints and finds earlier pages within max_distance bits.
+
+    Fingerprints are split into max_distance + 1 bands: two fingerprints that differ in at most
+    max_distance bits must agree exactly on at least one band, so only pages sharing a band
+    are compared.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._band_bits = -(-64 // self.bands)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self._band_bits) - 1
+        return [(fingerprint >> (band * self._band_bits)) & mask for band in range(self.bands)]
+
+    def find(self, fingerprint):
+        """Return the URL of an indexed near-duplicate of fingerprint, or None."""
+        with self._lock:
+            return self._find(fingerprint)
+
+    def _find(self, fingerprint):
+        for bucket, key in zip(self._buckets, self._band_keys(fingerprint)):
+            for other, url in bucket.get(key, ()):
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    return url
+        return None
+
+    def check(self, url, text):
+        """Return the URL text duplicates, or index it under url and return None."""
+        fingerprint = simhash(text)
+        with self._lock:
+            original = self._find(fingerprint)
+            if original is None:
+                for bucket, key in zip(self._buckets, self._band_keys(fingerprint)):
+                    bucket.setdefault(key, []).append((fingerprint, url))
+            return original
@@ -0,0 +1,89 @@
+import re
+import unicodedata
+
+UNDETERMINED = "und"
+
+# Frequent function words per Latin-script language; short texts are told apart by which
+# list their words fall into
+STOPWORDS = {
+    "en": "the of and to in is that for it with as was on are be by this from at or an which have not "
+          "has we our you your their they will can more all about who its been also",
+    "nl": "de het een en van in is dat op te zijn voor met die niet aan er om ook als bij of uit "
+          "wordt door over naar ons onze wij we worden heeft kunnen meer",
+    "de": "der die das und in den von zu mit ist im dem nicht ein eine als auch es an werden aus "
+          "er hat dass sie nach wird bei einer um für wir unsere sind",
+    "fr": "le la les de des et en un une du est que qui dans pour pas sur au par plus ce avec sont "
+          "nous notre nos vous ou ses leur aux été cette",
+    "es": "el la los las de del y en un una que es por con para se no al lo como más su sus "
+          "nuestra nuestro somos son este esta entre también",
+    "it": "il lo la gli le di del della e è un una che per con non sono al nel alla come più "
+          "nostra nostro siamo anche tra questo questa dei delle",
+    "pt": "o a os as de do da dos das e em um uma que é para com não por no na se mais como "
+          "nossa nosso somos são ao pelo pela também",
+    "sv": "och att det som en på är av för med den till inte har de om ett vi vår våra kan "
+          "från eller också sina",
+    "da": "og at det som en på er af for med den til ikke har de om et vi vores kan fra eller "
+          "også sine være",
+}
+STOPWORDS = {language: frozenset(words.split()) for language, words in STOPWORDS.items()}
+
+# Non-Latin scripts identify the language (or a close enough guess) on their own
+SCRIPTS = [
+    ("ARABIC", "ar"), ("CYRILLIC", "ru"), ("GREEK", "el"), ("HEBREW", "he"), ("HANGUL", "ko"),
+    ("HIRAGANA", "ja"), ("KATAKANA", "ja"), ("CJK", "zh"), ("THAI", "th"), ("DEVANAGARI", "hi"),
+]
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def _script_language(text):
+    """Return the language implied by the text's dominant non-Latin script, if any."""
+    counts = {}
+    letters = 0
+    for char in text:
+        if not char.isalpha():
+            continue
+        letters += 1
+        if char.isascii():
+            continue
+        name = unicodedata.name(char, "")
+        for script, language in SCRIPTS:
+            if name.startswith(script):
+                counts[language] = counts.get(language, 0) + 1
+                break
+    if not counts:
+        return None
+    # Any kana means Japanese even when most characters are kanji
+    if counts.get("ja") and counts.get("zh"):
+        counts["ja"] += counts.pop("zh")
+    language, count = max(counts.items(), key=lambda item: item[1])
+    return language if count * 2 >= letters else None
+
+
+def detect_language(text, min_hits=2):
+    """Guess the ISO 639-1 language of text offline; returns "und" when undecided.
+
+    Non-Latin scripts are recognised by their Unicode block; Latin-script text is
+    scored by how many of its words are function words of each candidate language.
+    """
+    if not text or not text.strip():
+        return UNDETERMINED
+    language = _script_language(text)
+    if language:
+        return language
+
+    words = _WORD.findall(text.lower())
+    scores = {language: sum(word in stopwords for word in words) for language, stopwords in STOPWORDS.items()}
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best, best_hits), (_, runner_up_hits) = ranked[0], ranked[1]
+    if best_hits < min_hits or best_hits == runner_up_hits:
+        return UNDETERMINED
+    return best
+
+
+def needs_translation(text, target="en", language=None):
+    """True unless text is confidently detected as already being in the target language.
+
+    Pass language when detect_language(text) has already been called, to skip detecting again.
+    """
+    return (language or detect_language(text)) != target
@@ -0,0 +1,169 @@
+import bz2
+import gzip
+import json
+import logging
+import lzma
+import os
+import threading
+
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+PARQUET_BATCH_SIZE = 500  # Records per Parquet row group
+
+# Columns of the Parquet output: the keys process_page_content() fills in. Anything else
+# a record carries goes into the "extra" column as JSON.
+PARQUET_COLUMNS = [
+    ("url", "string"),
+    ("page_content", "string"),
+    ("summarized_content", "list"),
+    ("translated_content", "list"),
+    ("language", "string"),
+    ("paragraph_languages", "list"),
+    ("duplicate_of", "string"),
+    ("skipped_stages", "list"),
+    ("error", "string"),
+]
+
+
+def _open_text(path, mode):
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower(), open)
+    return opener(path, mode, encoding="utf-8")
+
+# === Writers ===
+
+class JsonlWriter:
+    """Appends page records to a JSON Lines file, one line per record, as they come in.
+
+    Every record is flushed, so the file can be tailed while a crawl runs and a crash loses
+    at most the page being written. A .gz/.bz2/.xz suffix compresses the output; gzip keeps
+    each flushed record readable, bz2 and xz only once the writer is closed. Re-opening an
+    existing file appends to it, which is what a resumed crawl wants.
+    """
+
+    def __init__(self, path, flush_every=1):
+        self.path = path
+        self.flush_every = flush_every
+        self.count = 0
+        self._lock = threading.Lock()
+        compressed = os.path.splitext(path)[1].lower() in COMPRESSED_OPENERS
+        self._file = _open_text(path, "at")
+        if not compressed and os.path.getsize(path) and not _ends_with_newline(path):
+            # A previous run died mid-line: keep its partial record on a line of its own
+            self._file.write("\n")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self.count += 1
+            if self.count % self.flush_every == 0:
+                self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class ParquetWriter:
+    """Writes page records to a Parquet file in row groups of batch_size (needs pyarrow).
+
+    Records are buffered until a row group is full, so unlike JsonlWriter the last partial
+    batch only reaches the file on close(). An existing file is replaced, not appended to.
+    """
+
+    def __init__(self, path, batch_size=PARQUET_BATCH_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from exc
+        self._pa = pa
+        types = {"string": pa.string(), "list": pa.list_(pa.string())}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in PARQUET_COLUMNS] + [("extra", pa.string())])
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows = []
+        self._lock = threading.Lock()
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def _row(self, record):
+        row = {name: record.get(name) for name, _ in PARQUET_COLUMNS}
+        extra = {key: value for key, value in record.items() if key not in row}
+        row["extra"] = json.dumps(extra, ensure_ascii=False) if extra else None
+        return row
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def write(self, record):
+        with self._lock:
+            self._rows.append(self._row(record))
+            self.count += 1
+            if len(self._rows) >= self.batch_size:
+                self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_writer(path, **kwargs):
+    """Writer for path by its suffix: .parquet gives a ParquetWriter, anything else JSON Lines."""
+    if path.lower().endswith(".parquet"):
+        return ParquetWriter(path, **kwargs)
+    return JsonlWriter(path, **kwargs)
+
+# === Reader ===
+
+def read_records(path):
+    """Yield the page records of a file written by open_writer(), one at a time.
+
+    Lines that are not valid JSON (e.g. the last one of a crawl that was killed) are
+    skipped, as is a compressed file's unfinished tail.
+    """
+    if path.lower().endswith(".parquet"):
+        yield from _read_parquet(path)
+        return
+    with _open_text(path, "rt") as f:
+        try:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping malformed record on line {number} of {path}")
+        except (EOFError, OSError) as e:
+            logging.warning(f"Stopped reading {path} at an incomplete compressed block: {e}")
+
+
+def _read_parquet(path):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches():
+        for row in batch.to_pylist():
+            extra = row.pop("extra", None)
+            record = {key: value for key, value in row.items() if value is not None}
+            if extra:
+                record.update(json.loads(extra))
+            yield record
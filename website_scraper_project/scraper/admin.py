@@ -1,3 +1,16 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import FetchCacheEntry, ScrapeJob
+
+
+@admin.register(FetchCacheEntry)
+class FetchCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('url', 'etag', 'last_modified', 'size', 'fetched_at')
+    search_fields = ('url',)
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ('url', 'status', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('url',)
@@ -0,0 +1,70 @@
+from collections import OrderedDict, deque
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST = 2
+
+
+def host_of(url):
+    """Return the lower-cased host (netloc) of a URL, used as the concurrency key."""
+    return urlparse(url).netloc.lower()
+
+
+def run_concurrently(urls, func, max_workers=DEFAULT_MAX_WORKERS, per_host=DEFAULT_PER_HOST, scheduler=None):
+    """Call func(url) for every URL on a thread pool and yield (url, result, exc) as calls complete.
+
+    At most max_workers calls run at once overall and at most per_host against any single host.
+    Hosts are served round-robin so one large domain cannot starve the rest of the batch.
+    With a politeness.PolitenessScheduler, hosts that are being rate limited are passed over
+    until their next request is due, so workers are kept busy with other hosts meanwhile.
+    Duplicate URLs are only fetched once.
+    """
+    queues = OrderedDict()
+    for url in OrderedDict.fromkeys(urls):
+        queues.setdefault(host_of(url), deque()).append(url)
+
+    in_flight = {}
+    host_load = {host: 0 for host in queues}
+
+    def submit_ready(executor):
+        """Walk hosts round-robin, starting one call per eligible host per pass.
+
+        Returns the seconds until a rate-limited host is due again (None if none is waiting).
+        """
+        next_due = None
+        progress = True
+        while progress and len(in_flight) < max_workers:
+            progress = False
+            for host in list(queues):
+                if len(in_flight) >= max_workers:
+                    break
+                if host_load[host] >= per_host:
+                    continue
+                due = scheduler.ready_in(queues[host][0]) if scheduler else 0
+                if due > 0:
+                    next_due = due if next_due is None else min(next_due, due)
+                    continue
+                url = queues[host].popleft()
+                if not queues[host]:
+                    del queues[host]
+                host_load[host] += 1
+                in_flight[executor.submit(func, url)] = (url, host)
+                progress = True
+        return next_due
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        next_due = submit_ready(executor)
+        while in_flight or queues:
+            if not in_flight:
+                # Every remaining host is rate limited; sleep until the first one is due
+                time.sleep(next_due or 0)
+            else:
+                done, _ = wait(in_flight, timeout=next_due, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, host = in_flight.pop(future)
+                    host_load[host] -= 1
+                    exc = future.exception()
+                    yield url, (None if exc else future.result()), exc
+            next_due = submit_ready(executor)
@@ -0,0 +1,267 @@
+import json
+import os
+import platform
+import random
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .nltk_summarizer import Summarizer
+from .website_scraper import Website, summarize_text
+
+# Sizes (bytes of HTML) of the generated corporate pages used when no recorded fixtures are given
+FIXTURE_SIZES = {'small': 20_000, 'medium': 200_000, 'large': 2_000_000}
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+DEFAULT_TOLERANCE = 0.2  # A stage regresses when 20% slower (or hungrier) than its baseline...
+MIN_TIME_DELTA = 0.0005  # ...and at least this many seconds slower, so timer noise on tiny runs is ignored
+MIN_MEMORY_DELTA = 64 * 1024  # ...or at least this many bytes more memory
+
+# === Fixtures ===
+
+WORDS = ("acme global solutions customers digital platform services consulting innovation partners "
+         "engineering cloud data quality team worldwide industry leading trusted delivery growth "
+         "sustainable technology enterprise operations offices clients value research products "
+         "experience secure reliable markets strategy transformation support employees years").split()
+SECTIONS = ["Overview", "About us", "Our services", "Industries", "Careers", "News", "Investors",
+            "Sustainability", "Leadership", "Contact us"]
+
+
+def _sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 22))]
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "!"])
+
+
+def _paragraph(rng):
+    return " ".join(_sentence(rng) for _ in range(rng.randint(2, 6)))
+
+
+def build_fixture(size, seed=0):
+    """Generate a corporate home page of about size bytes: nav, overview/services/contact
+    sections, boilerplate, inline scripts and styles, as real sites serve them."""
+    rng = random.Random(seed)
+    head = ("<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Acme Global Solutions</title>"
+            "<style>" + "body{margin:0}.nav a{padding:4px}" * 40 + "</style>"
+            "<script>window.dataLayer=[];" + "function f(){return 1};" * 40 + "</script></head><body>"
+            "<div class=\"cookie-banner\">We use cookies to improve your experience. <button>Accept</button></div>"
+            "<nav class=\"nav\">" + "".join(f"<a href=\"/{name.lower().replace(' ', '-')}\">{name}</a>"
+                                            for name in SECTIONS) + "</nav><main>")
+    tail = ("</main><footer class=\"footer\"><p>&copy; Acme Global Solutions. All rights reserved.</p>"
+            "<a href=\"/privacy\">Privacy</a> <a href=\"/terms\">Terms</a></footer>"
+            "<script src=\"/static/app.js\"></script></body></html>")
+    parts, length, index = [head], len(head) + len(tail), 0
+    while length < size:
+        name = SECTIONS[index % len(SECTIONS)]
+        section = (f"<section id=\"s{index}\"><h2>{name}</h2>"
+                   + "".join(f"<p>{_paragraph(rng)}</p>" for _ in range(rng.randint(2, 5)))
+                   + (f"<img src=\"/img/{index}.jpg\" alt=\"\"><input type=\"hidden\" value=\"{index}\">")
+                   + "</section>")
+        parts.append(section)
+        length += len(section)
+        index += 1
+    parts.append(tail)
+    return "".join(parts).encode("utf-8")
+
+
+def generated_fixtures(sizes=None):
+    """{name: html bytes} of generated pages, the same on every run."""
+    return {name: build_fixture(size, seed=i) for i, (name, size) in enumerate((sizes or FIXTURE_SIZES).items())}
+
+
+def load_fixtures(directory):
+    """{name: html bytes} of the recorded pages (*.html, *.htm) in directory."""
+    fixtures = {}
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() in ('.html', '.htm'):
+            with open(os.path.join(directory, filename), 'rb') as f:
+                fixtures[name] = f.read()
+    return fixtures
+
+
+class FixtureServer:
+    """Serves {name: html bytes} at http://127.0.0.1:<port>/<name>.html from a background thread.
+
+    Pages are fetched through the same HTTP client as live sites, without network noise.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                body = pages.get(handler.path.lstrip('/').rsplit('.', 1)[0])
+                if body is None:
+                    handler.send_error(404)
+                    return
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/html; charset=utf-8')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{name}.html"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+# === Stages ===
+
+def _summarize_paragraphs(text):
+    # The crawler's paragraph summaries; the crawler script sits next to manage.py
+    from scraping_covertlangauage import summarize_paragraphs
+    return summarize_paragraphs(text)
+
+
+def _fresh_website(page):
+    website = Website(page['url'])
+    website.soup  # Parsed outside the timed part
+    return website
+
+
+# name: (setup(page) -> argument, run(argument), input measured for throughput). setup is not timed
+# and runs before every call, so stages that cache on the Website always start cold.
+STAGES = {
+    'website': (lambda page: page['url'], lambda url: Website(url), 'html'),
+    'website_stream': (lambda page: page['url'], lambda url: Website(url, stream=True), 'html'),
+    'website_stream_text': (lambda page: page['url'], lambda url: Website(url, stream=True, text_only=True), 'html'),
+    'company_details': (_fresh_website, lambda website: website.get_company_details(), 'html'),
+    'summarize_text': (lambda page: page['text'], summarize_text, 'text'),
+    'nltk_summarize': (lambda page: page['text'], lambda text: Summarizer(text).summarize(), 'text'),
+    'summarize_paragraphs': (lambda page: page['text'], _summarize_paragraphs, 'text'),
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def _peak_memory(setup, run, page):
+    """Peak bytes Python allocates during one run (C allocations, e.g. inside lxml, are not seen)."""
+    argument = setup(page)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def measure(stage, page, repeat=DEFAULT_REPEAT, warmup=DEFAULT_WARMUP):
+    """Latency, throughput and peak memory of one stage on one page.
+
+    Timed runs and the memory run are separate because tracemalloc slows code down.
+    """
+    setup, run, measured = STAGES[stage]
+    size = len(page['content']) if measured == 'html' else len(page['text'].encode('utf-8'))
+    for _ in range(warmup):
+        run(setup(page))
+    latencies = []
+    for _ in range(repeat):
+        argument = setup(page)
+        start = time.perf_counter()
+        run(argument)
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    return {
+        'bytes': size,
+        'runs': repeat,
+        'mean_ms': total / repeat * 1000,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': max(latencies) * 1000,
+        'mb_per_s': size * repeat / total / 1e6 if total else None,
+        'ops_per_s': repeat / total if total else None,
+        'peak_kib': _peak_memory(setup, run, page) / 1024,
+    }
+
+
+def run_benchmark(fixtures, stages=None, repeat=DEFAULT_REPEAT, warmup=DEFAULT_WARMUP, progress=None):
+    """Run every stage on every fixture page, served by a local FixtureServer.
+
+    Returns {'meta': {...}, 'results': {stage: {fixture: measurements}}, 'errors': {stage: message}}.
+    A stage that fails (e.g. NLTK data that cannot be downloaded) is reported in errors and
+    left out of the results.
+    """
+    results, errors = {}, {}
+    with FixtureServer(fixtures) as server:
+        pages = {}
+        for name, content in fixtures.items():
+            website = Website(server.url(name))
+            if website.error:
+                raise RuntimeError(website.error)
+            pages[name] = {'url': server.url(name), 'content': content, 'text': website.text}
+
+        for stage in stages or STAGES:
+            results[stage] = {}
+            for name, page in pages.items():
+                if progress:
+                    progress(stage, name)
+                try:
+                    results[stage][name] = measure(stage, page, repeat=repeat, warmup=warmup)
+                except Exception as e:
+                    # First line that says something (NLTK wraps its messages in rows of asterisks)
+                    message = next((line.strip() for line in str(e).splitlines() if line.strip(' *')), '')
+                    errors[stage] = f"{type(e).__name__}: {message}"
+                    del results[stage]
+                    break
+    meta = {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'fixtures': {name: len(content) for name, content in fixtures.items()},
+    }
+    return {'meta': meta, 'results': results, 'errors': errors}
+
+# === Baseline ===
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compare two run_benchmark() results per stage and fixture.
+
+    Returns a list of (stage, fixture, p50 ratio, peak memory ratio, regressed) for the
+    measurements present in both.
+    """
+    rows = []
+    for stage, fixtures in results['results'].items():
+        for name, current in fixtures.items():
+            previous = baseline.get('results', {}).get(stage, {}).get(name)
+            if previous is None:
+                continue
+            time_ratio = current['p50_ms'] / previous['p50_ms'] if previous['p50_ms'] else 1.0
+            memory_ratio = current['peak_kib'] / previous['peak_kib'] if previous['peak_kib'] else 1.0
+            slower = (time_ratio > 1 + tolerance
+                      and (current['p50_ms'] - previous['p50_ms']) / 1000 > MIN_TIME_DELTA)
+            hungrier = (memory_ratio > 1 + tolerance
+                        and (current['peak_kib'] - previous['peak_kib']) * 1024 > MIN_MEMORY_DELTA)
+            rows.append((stage, name, time_ratio, memory_ratio, slower or hungrier))
+    return rows
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,48 @@
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the time budget of a request runs out before or during a stage."""
+
+
+class Deadline:
+    """Time budget shared by every stage of one request (fetch, parse, summarize, LLM, ...).
+
+    Each stage asks for the remaining time, caps its own timeouts with it and is skipped once
+    the budget is spent. seconds=None means no limit.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    @classmethod
+    def of(cls, value):
+        """Return value itself if it is a Deadline, else a new Deadline of value seconds."""
+        return value if isinstance(value, Deadline) else cls(value)
+
+    def remaining(self):
+        """Seconds left (never negative), or None without a limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self, stage):
+        """Raise DeadlineExceeded if the budget is spent before stage can start."""
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline of {self.seconds}s exceeded before {stage}")
+
+    def timeout(self, default=None):
+        """Return default (seconds or a (connect, read) pair) capped at the remaining time."""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if default is None:
+            return remaining
+        if isinstance(default, tuple):
+            return tuple(min(value, remaining) for value in default)
+        return min(default, remaining)
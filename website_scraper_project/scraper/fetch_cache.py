@@ -0,0 +1,102 @@
+import logging
+import threading
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import FetchCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# SQLite takes one writer at a time, so batch worker threads queue their cache writes here
+_write_lock = threading.Lock()
+
+
+class FetchCache:
+    """Database-backed store of fetched bodies used for conditional (304) re-fetches.
+
+    Only responses that carry an ETag or Last-Modified validator are stored. Entries older
+    than ttl seconds are dropped on lookup, and the oldest entries are evicted whenever the
+    total compressed size grows past max_bytes.
+
+    The cache never fails a scrape: a database error (say "database is locked") is logged
+    and the lookup is treated as a miss, or the body is simply not stored.
+    """
+
+    def __init__(self, ttl=None, max_bytes=None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'SCRAPER_FETCH_CACHE_TTL', 7 * 24 * 3600)
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'SCRAPER_FETCH_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+
+    def lookup(self, url):
+        """Return the cached entry for url, or None if missing or past its TTL."""
+        try:
+            entry = FetchCacheEntry.objects.filter(url=url).first()
+            if entry and entry.fetched_at < timezone.now() - timedelta(seconds=self.ttl):
+                with _write_lock:
+                    entry.delete()
+                return None
+        except DatabaseError:
+            logger.warning("Fetch cache lookup failed for %s", url, exc_info=True)
+            return None
+        return entry
+
+    def conditional_headers(self, entry):
+        """Return the If-None-Match / If-Modified-Since headers for revalidating entry."""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def revalidated(self, entry):
+        """Mark entry as fresh after a 304 response and return its decompressed body."""
+        try:
+            with _write_lock:
+                FetchCacheEntry.objects.filter(pk=entry.pk).update(fetched_at=timezone.now())
+        except DatabaseError:
+            logger.warning("Fetch cache refresh failed for %s", entry.url, exc_info=True)
+        return zlib.decompress(bytes(entry.body))
+
+    def store(self, url, response, body):
+        """Save body under url if the response carries a cache validator."""
+        try:
+            with _write_lock:
+                self._store(url, response, body)
+        except DatabaseError:
+            logger.warning("Fetch cache store failed for %s", url, exc_info=True)
+
+    def _store(self, url, response, body):
+        etag = response.headers.get('ETag', '')
+        last_modified = response.headers.get('Last-Modified', '')
+        if not (etag or last_modified):
+            FetchCacheEntry.objects.filter(url=url).delete()
+            return
+
+        compressed = zlib.compress(body, 6)
+        if len(compressed) > self.max_bytes:
+            return
+        FetchCacheEntry.objects.update_or_create(url=url, defaults={
+            'etag': etag[:255],
+            'last_modified': last_modified[:64],
+            'body': compressed,
+            'size': len(compressed),
+            'fetched_at': timezone.now(),
+        })
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently fetched entries until the cache fits in max_bytes."""
+        total = FetchCacheEntry.objects.aggregate(total=Sum('size'))['total'] or 0
+        if total <= self.max_bytes:
+            return
+        for pk, size in FetchCacheEntry.objects.order_by('fetched_at').values_list('pk', 'size').iterator():
+            FetchCacheEntry.objects.filter(pk=pk).delete()
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,180 @@
+import contextvars
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InvalidHeader
+from urllib3.util import Retry, make_headers
+
+# Default (connect, read) timeout in seconds for every fetch
+DEFAULT_TIMEOUT = (
+    float(os.getenv("SCRAPER_CONNECT_TIMEOUT", 5)),
+    float(os.getenv("SCRAPER_READ_TIMEOUT", 20)),
+)
+
+# Connection pool sizing: number of hosts kept and connections per host
+POOL_CONNECTIONS = int(os.getenv("SCRAPER_POOL_CONNECTIONS", 32))
+POOL_MAXSIZE = int(os.getenv("SCRAPER_POOL_MAXSIZE", 16))
+
+# Retry policy for transient failures (connection errors, 429 and 5xx)
+MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", 3))
+BACKOFF_FACTOR = float(os.getenv("SCRAPER_BACKOFF_FACTOR", 0.5))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Headers to mimic a real browser; Accept-Encoding lists every codec urllib3
+# can decode here (gzip and deflate always, br/zstd when brotli/zstandard are installed)
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/113.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+# Retry policy fetch() puts in place of the adapter's own for one request (see RetryAdapter)
+_retry_override = contextvars.ContextVar("retry_override", default=None)
+NO_RETRY = Retry(0, read=False)
+
+
+class RetryAdapter(HTTPAdapter):
+    """HTTPAdapter whose retry policy fetch() can replace for a single request.
+
+    Retries happen inside urllib3, out of reach of a deadline: fetch() turns them off and
+    retries itself when it has to stop in time, or drops the status retries when the caller
+    wants to see 429/503 answers.
+    """
+
+    @property
+    def max_retries(self):
+        override = _retry_override.get()
+        return self._max_retries if override is None else override
+
+    @max_retries.setter
+    def max_retries(self, value):
+        self._max_retries = value
+
+
+def build_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                  max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, headers=None):
+    """Build a requests Session with keep-alive connection pooling and retry/backoff."""
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = RetryAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_session():
+    """Return the process-wide shared Session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def set_session(session):
+    """Replace the process-wide Session (e.g. with a differently tuned one)."""
+    global _session
+    with _session_lock:
+        _session = session
+
+
+def fetch(url, session=None, timeout=None, deadline=None, unretried_statuses=(), **kwargs):
+    """GET a URL through the shared pooled Session with the default timeout.
+
+    With a deadline (see deadline.Deadline) every attempt's timeout is capped at the time
+    left, a retry is only made when its backoff (or Retry-After) fits in that time, and
+    DeadlineExceeded is raised if none is left. Answers with one of unretried_statuses are
+    returned as they come instead of retried (e.g. the 429/503 a PolitenessScheduler handles
+    itself); other statuses keep the session's retries. Both need a session from build_session().
+    """
+    session = session or get_session()
+    timeout = timeout or DEFAULT_TIMEOUT
+    adapter = session.get_adapter(url)
+    if not isinstance(adapter, RetryAdapter):
+        if deadline is not None:
+            deadline.check(f"fetching {url}")
+            timeout = deadline.timeout(timeout)
+        return session.get(url, timeout=timeout, **kwargs)
+
+    policy = adapter._max_retries
+    if unretried_statuses:
+        # urllib3 also retries any 429/503 carrying a Retry-After when it respects the header
+        policy = policy.new(status_forcelist=set(policy.status_forcelist or ()) - set(unretried_statuses),
+                            respect_retry_after_header=False)
+    if deadline is None or deadline.remaining() is None:
+        return _get(session, url, policy, timeout=timeout, **kwargs)
+    return _fetch_within(session, url, policy, timeout, deadline, **kwargs)
+
+
+def _get(session, url, retries, **kwargs):
+    token = _retry_override.set(retries)
+    try:
+        return session.get(url, **kwargs)
+    finally:
+        _retry_override.reset(token)
+
+
+def _fetch_within(session, url, policy, timeout, deadline, **kwargs):
+    """fetch() with a deadline: one attempt at a time, sleeping between them only while
+    the deadline allows it."""
+    statuses = policy.status_forcelist or ()
+    retries = policy.total or 0
+    attempt = 0
+    while True:
+        deadline.check(f"fetching {url}")
+        try:
+            response = _get(session, url, NO_RETRY, timeout=deadline.timeout(timeout), **kwargs)
+            error = None
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            response, error = None, e
+        if response is not None and response.status_code not in statuses:
+            return response
+
+        delay = _retry_delay(response, policy, attempt)
+        remaining = deadline.remaining()
+        if attempt >= retries or delay is None or delay >= remaining:
+            # Out of retries, or the next one would start too late: give the last outcome
+            if error is not None:
+                raise error
+            return response
+        if response is not None:
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def _retry_delay(response, policy, attempt):
+    """Seconds to wait before the next attempt: the Retry-After of a 429/503 when the policy
+    respects it, else the policy's exponential backoff. None for an unusable Retry-After."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and policy.respect_retry_after_header and response.status_code in Retry.RETRY_AFTER_STATUS_CODES:
+        try:
+            return policy.parse_retry_after(retry_after)
+        except InvalidHeader:
+            return None
+    return min(policy.backoff_max, policy.backoff_factor * (2 ** attempt))
@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL = 60  # seconds between sweeps for expired job results
+
+
+def submit(url):
+    """Queue a scrape of url, or return the job already queued or running for it.
+
+    Returns a (job, created) pair. The unique constraint on active jobs settles concurrent
+    submits of the same URL: the one that loses the race returns the winner's job.
+    """
+    active = ScrapeJob.objects.filter(url=url, status__in=[ScrapeJob.QUEUED, ScrapeJob.RUNNING])
+    while True:
+        job = active.order_by('created_at').first()
+        if job is not None:
+            return job, False
+        try:
+            with transaction.atomic():
+                return ScrapeJob.objects.create(url=url), True
+        except IntegrityError:
+            continue  # Queued by someone else in between; return theirs
+
+
+class JobWorkers:
+    """Pool of daemon threads that run queued ScrapeJobs in this process.
+
+    Jobs live in the database, so no broker is needed: a worker claims the oldest queued job
+    with a conditional UPDATE, runs scrape(url) -> (result, error) on it and stores the
+    outcome. Jobs left running longer than lease seconds (e.g. by a process that died) are
+    queued again, and finished jobs are deleted retention seconds after they finish.
+    """
+
+    def __init__(self, scrape, workers=None, retention=None, lease=None, poll_interval=1.0):
+        self.scrape = scrape
+        self.workers = workers or getattr(settings, 'SCRAPER_JOB_WORKERS', 4)
+        self.retention = retention if retention is not None else getattr(settings, 'SCRAPER_JOB_RETENTION', 24 * 3600)
+        self.lease = lease if lease is not None else getattr(settings, 'SCRAPER_JOB_LEASE', 15 * 60)
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._last_purge = 0.0
+
+    def start(self):
+        """Start the worker threads (once)."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"scrape-job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """Wake idle workers because a job was queued."""
+        self.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            try:
+                job = self._claim()
+                if job is None:
+                    self._housekeeping()
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                else:
+                    self._execute(job)
+            except Exception:
+                logger.exception("Scrape job worker failed")
+                time.sleep(self.poll_interval)
+            finally:
+                close_old_connections()
+
+    def _claim(self):
+        """Take the oldest queued job, or None if another worker got there first or none is queued."""
+        queued = ScrapeJob.objects.filter(status=ScrapeJob.QUEUED).order_by('created_at')
+        for pk in queued.values_list('pk', flat=True)[:self.workers]:
+            claimed = ScrapeJob.objects.filter(pk=pk, status=ScrapeJob.QUEUED).update(
+                status=ScrapeJob.RUNNING, started_at=timezone.now())
+            if claimed:
+                return ScrapeJob.objects.get(pk=pk)
+        return None
+
+    def _execute(self, job):
+        try:
+            result, error = self.scrape(job.url)
+        except Exception as e:
+            result, error = None, f"Error scraping {job.url}: {e}"
+        job.status = ScrapeJob.FAILED if error else ScrapeJob.DONE
+        job.result = result
+        job.error = error or ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+
+    def _housekeeping(self):
+        """Requeue expired claims and delete expired results, at most once per PURGE_INTERVAL."""
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        cutoff = timezone.now()
+        ScrapeJob.objects.filter(status=ScrapeJob.RUNNING,
+                                 started_at__lt=cutoff - timedelta(seconds=self.lease)).update(
+            status=ScrapeJob.QUEUED, started_at=None)
+        ScrapeJob.objects.filter(status__in=[ScrapeJob.DONE, ScrapeJob.FAILED],
+                                 finished_at__lt=cutoff - timedelta(seconds=self.retention)).delete()
@@ -0,0 +1,237 @@
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import CACHE_LOOKUPS
+
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+DEFAULT_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "3000"))  # Page text sent per request
+DEFAULT_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+DEFAULT_WORKERS = 4
+MAX_REDUCE_ROUNDS = 3  # Intermediate reduce rounds before the partial summaries are cut to fit
+CHARS_PER_TOKEN = 4  # Rough estimate used when tiktoken is not installed
+
+SYSTEM_PROMPT = ("You are an assistant that analyzes the contents of a website and provides a short summary, "
+                 "ignoring text that might be navigation related. Respond in markdown.")
+DEFAULT_INSTRUCTIONS = "Please provide a short summary of this website in markdown."
+
+# === Token counting and chunking ===
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # Unknown model name or the encoding could not be downloaded
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """Number of tokens text costs for model (estimated from its length without tiktoken)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_into_chunks(text, max_tokens=DEFAULT_CHUNK_TOKENS, model=DEFAULT_MODEL):
+    """Split text on line boundaries into chunks of at most max_tokens tokens each.
+
+    Lines longer than the budget on their own are cut into pieces of roughly max_tokens.
+    """
+    chunks, chunk, size = [], [], 0
+    for line in text.splitlines():
+        tokens = count_tokens(line, model) + 1
+        if tokens > max_tokens:
+            step = max(1, len(line) * max_tokens // tokens)
+            pieces = [line[i:i + step] for i in range(0, len(line), step)]
+        else:
+            pieces = [line]
+        for piece in pieces:
+            tokens = count_tokens(piece, model) + 1 if len(pieces) > 1 else tokens
+            if chunk and size + tokens > max_tokens:
+                chunks.append("\n".join(chunk))
+                chunk, size = [], 0
+            chunk.append(piece)
+            size += tokens
+    if chunk:
+        chunks.append("\n".join(chunk))
+    return chunks
+
+
+def truncate_to_tokens(text, max_tokens, model=DEFAULT_MODEL):
+    """Cut text down to at most max_tokens tokens (estimated from its length without tiktoken)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max(0, max_tokens - 1) * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+# === Response cache ===
+
+class ResponseCache:
+    """Completions stored on disk as one small JSON file per (model, prompt, content) hash."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, model, system, user):
+        digest = hashlib.sha256(f"{model}\0{system}\0{user}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def get(self, model, system, user):
+        try:
+            with open(self._path(model, system, user), encoding="utf-8") as f:
+                completion = json.load(f)["completion"]
+        except (OSError, ValueError, KeyError):
+            CACHE_LOOKUPS.inc(cache="llm", result="miss")
+            return None
+        CACHE_LOOKUPS.inc(cache="llm", result="hit")
+        return completion
+
+    def set(self, model, system, user, completion):
+        path = self._path(model, system, user)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename so concurrent readers never see partial JSON
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"completion": completion}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+# === Map-reduce summarizer ===
+
+class MapReduceSummarizer:
+    """Summarize text of any length with an OpenAI-compatible chat model.
+
+    Text that fits in one chunk_tokens budget is summarized in a single request. Longer text
+    is split into chunks that are summarized concurrently (map), and the partial summaries
+    are combined by one more request (reduce), repeating up to max_reduce_rounds times while
+    they are still too long and cutting each one to fit after that. Every completion is
+    cached on disk, so unchanged pages cost no requests the second time.
+
+    client defaults to openai.OpenAI(), which honours OPENAI_API_KEY and OPENAI_BASE_URL,
+    so a local stub server can stand in for the real API.
+    """
+
+    def __init__(self, client=None, model=DEFAULT_MODEL, system_prompt=SYSTEM_PROMPT,
+                 chunk_tokens=DEFAULT_CHUNK_TOKENS, max_workers=DEFAULT_WORKERS, cache=None,
+                 max_reduce_rounds=MAX_REDUCE_ROUNDS):
+        self._client = client
+        self.model = model
+        self.system_prompt = system_prompt
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+        self.max_reduce_rounds = max_reduce_rounds
+        self.cache = cache if cache is not None else ResponseCache()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI()
+        return self._client
+
+    def _messages(self, user_prompt):
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _request_options(self, deadline):
+        """Request timeout from the deadline, raising DeadlineExceeded when no time is left."""
+        if deadline is None or deadline.remaining() is None:
+            return {}
+        deadline.check('llm')
+        return {'timeout': deadline.remaining()}
+
+    def complete(self, user_prompt, deadline=None):
+        """Return the model's answer to user_prompt, from the cache when possible."""
+        if self.cache:
+            cached = self.cache.get(self.model, self.system_prompt, user_prompt)
+            if cached is not None:
+                return cached
+        response = self.client.chat.completions.create(
+            model=self.model, messages=self._messages(user_prompt), **self._request_options(deadline))
+        completion = response.choices[0].message.content
+        if self.cache and completion is not None:
+            self.cache.set(self.model, self.system_prompt, user_prompt, completion)
+        return completion
+
+    def complete_stream(self, user_prompt, deadline=None):
+        """Yield the model's answer to user_prompt piece by piece as it is generated.
+
+        A cached answer is yielded in one piece. With a deadline, DeadlineExceeded is raised
+        when it runs out mid-answer, after the pieces received so far.
+        """
+        if self.cache:
+            cached = self.cache.get(self.model, self.system_prompt, user_prompt)
+            if cached is not None:
+                yield cached
+                return
+        stream = self.client.chat.completions.create(
+            model=self.model, messages=self._messages(user_prompt), stream=True, **self._request_options(deadline))
+        parts = []
+        for chunk in stream:
+            if deadline is not None and deadline.expired():
+                stream.close()
+                deadline.check('the end of the LLM answer')
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+        if self.cache and parts:
+            self.cache.set(self.model, self.system_prompt, user_prompt, "".join(parts))
+
+    def summarize(self, text, instructions=DEFAULT_INSTRUCTIONS, deadline=None):
+        """Summarize text following instructions, which prefix the page content in the prompt.
+
+        deadline (a deadline.Deadline) caps every request's timeout; DeadlineExceeded is raised
+        once it has run out.
+        """
+        return self.complete(self._final_prompt(text, instructions, deadline), deadline)
+
+    def summarize_stream(self, text, instructions=DEFAULT_INSTRUCTIONS, deadline=None):
+        """Like summarize, but yield the final answer piece by piece as the model generates it."""
+        return self.complete_stream(self._final_prompt(text, instructions, deadline), deadline)
+
+    def _final_prompt(self, text, instructions, deadline=None):
+        """Run the map (and any intermediate reduce) rounds; return the prompt whose answer is the summary."""
+        chunks = split_into_chunks(text, self.chunk_tokens, self.model)
+        if len(chunks) <= 1:
+            return f"{instructions}\n\n{text}"
+
+        for _ in range(self.max_reduce_rounds + 1):
+            prompts = [f"{instructions}\n\nThis is part {i} of {len(chunks)} of the contents; "
+                       f"summarize this part only, keeping names, figures and dates.\n\n{chunk}"
+                       for i, chunk in enumerate(chunks, 1)]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                partials = [partial for partial in
+                            executor.map(functools.partial(self.complete, deadline=deadline), prompts) if partial]
+
+            # Reduce: combine the partial summaries, in another round if they exceed the budget
+            combined = "\n\n".join(partials)
+            if count_tokens(combined, self.model) <= self.chunk_tokens:
+                break
+            chunks = split_into_chunks(combined, self.chunk_tokens, self.model)
+        else:
+            # Summaries that barely shrink would go round forever: give each an equal share instead
+            share = max(1, self.chunk_tokens // len(partials) - 1)
+            combined = "\n\n".join(truncate_to_tokens(partial, share, self.model) for partial in partials)
+        return (f"The following are summaries of consecutive parts of one website. "
+                f"Combine them into a single answer. {instructions}\n\n{combined}")
+
+
+def llm_available():
+    """True when the openai package is installed and an API key is configured."""
+    return bool(os.getenv("OPENAI_API_KEY")) and importlib.util.find_spec("openai") is not None
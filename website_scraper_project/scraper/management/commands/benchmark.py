@@ -0,0 +1,77 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.benchmark import (DEFAULT_REPEAT, DEFAULT_TOLERANCE, DEFAULT_WARMUP, STAGES, compare,
+                               generated_fixtures, load_fixtures, load_results, run_benchmark, save_results)
+
+
+class Command(BaseCommand):
+    help = ("Benchmark page fetch/parse, section extraction and the summarizers on HTML fixtures served "
+            "locally, and compare against the stored baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixtures', help="Directory of recorded pages (*.html); generated pages by default")
+        parser.add_argument('--stages', help=f"Comma-separated subset of: {', '.join(STAGES)}")
+        parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per stage and page")
+        parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="Untimed runs first")
+        parser.add_argument('--baseline', default=str(getattr(settings, 'SCRAPER_BENCHMARK_BASELINE', '')),
+                            help="Baseline results to compare against (default SCRAPER_BENCHMARK_BASELINE)")
+        parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help="Slowdown or memory growth (0.2 = 20%%) counted as a regression")
+        parser.add_argument('--output', help="Also write this run's results as JSON to this path")
+
+    def handle(self, *args, **options):
+        stages = options['stages'].split(',') if options['stages'] else list(STAGES)
+        unknown = [stage for stage in stages if stage not in STAGES]
+        if unknown:
+            raise CommandError(f"Unknown stages: {', '.join(unknown)}")
+        if options['fixtures']:
+            try:
+                fixtures = load_fixtures(options['fixtures'])
+            except OSError as e:
+                raise CommandError(str(e))
+            if not fixtures:
+                raise CommandError(f"No .html fixtures in {options['fixtures']}")
+        else:
+            fixtures = generated_fixtures()
+
+        results = run_benchmark(fixtures, stages, repeat=options['repeat'], warmup=options['warmup'],
+                                progress=lambda stage, name: self.stderr.write(f"  {stage} on {name}...", ending='\r'))
+        self._report(results)
+        if options['output']:
+            save_results(results, options['output'])
+
+        baseline_path = options['baseline']
+        if options['save_baseline']:
+            if not baseline_path:
+                raise CommandError("No baseline path: pass --baseline or set SCRAPER_BENCHMARK_BASELINE")
+            save_results(results, baseline_path)
+            self.stdout.write(f"Saved baseline to {baseline_path}")
+        elif baseline_path and os.path.exists(baseline_path):
+            self._compare(results, load_results(baseline_path), options['tolerance'], baseline_path)
+        else:
+            self.stdout.write("No baseline to compare against; store one with --save-baseline")
+
+    def _report(self, results):
+        self.stdout.write(f"{'stage':<22}{'page':<10}{'KiB':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+                          f"{'MB/s':>9}{'ops/s':>9}{'peak KiB':>11}")
+        for stage, fixtures in results['results'].items():
+            for name, m in fixtures.items():
+                self.stdout.write(f"{stage:<22}{name:<10}{m['bytes'] / 1024:9.0f}{m['p50_ms']:10.2f}{m['p95_ms']:10.2f}"
+                                  f"{m['p99_ms']:10.2f}{m['mb_per_s']:9.2f}{m['ops_per_s']:9.1f}{m['peak_kib']:11.0f}")
+        for stage, error in results['errors'].items():
+            self.stdout.write(self.style.WARNING(f"{stage} skipped: {error}"))
+
+    def _compare(self, results, baseline, tolerance, path):
+        self.stdout.write(f"\nAgainst {path} ({baseline['meta']['date']}):")
+        rows = compare(results, baseline, tolerance)
+        for stage, name, time_ratio, memory_ratio, regressed in rows:
+            line = f"  {stage:<22}{name:<10} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}"
+            self.stdout.write(self.style.ERROR(line + "  REGRESSION") if regressed else line)
+        regressions = [f"{stage}/{name}" for stage, name, _, _, regressed in rows if regressed]
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) beyond {tolerance:.0%}: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {tolerance:.0%}"))
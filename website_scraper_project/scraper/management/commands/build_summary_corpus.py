@@ -0,0 +1,22 @@
+import zlib
+
+from django.core.management.base import BaseCommand
+
+from scraper.models import FetchCacheEntry
+from scraper.parsing import parse_html
+from scraper.summarization import Corpus
+
+
+class Command(BaseCommand):
+    help = "Build the TF-IDF summary corpus from the pages stored in the fetch cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path of the corpus JSON file (point SCRAPER_SUMMARY_CORPUS at it)")
+
+    def handle(self, *args, **options):
+        corpus = Corpus()
+        for body in FetchCacheEntry.objects.values_list('body', flat=True).iterator():
+            soup = parse_html(zlib.decompress(bytes(body)))
+            corpus.add(soup.get_text(separator="\n", strip=True))
+        corpus.save(options['output'])
+        self.stdout.write(f"Wrote corpus of {corpus.documents} pages to {options['output']}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.http_client import fetch
+from scraper.parsing import time_parsers
+
+
+class Command(BaseCommand):
+    help = "Time each available HTML parser backend (full and partial parse) on a page."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="URL to fetch, or path to a saved HTML file")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per backend; the best time is kept")
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if source.startswith(('http://', 'https://')):
+            response = fetch(source)
+            if response.status_code != 200:
+                raise CommandError(f"Fetching {source} returned HTTP {response.status_code}")
+            content = response.content
+        else:
+            try:
+                with open(source, 'rb') as f:
+                    content = f.read()
+            except OSError as e:
+                raise CommandError(str(e))
+
+        timings = time_parsers(content, repeat=options['repeat'])
+        self.stdout.write(f"{len(content)} bytes, best of {options['repeat']} runs:")
+        for (parser, partial), seconds in sorted(timings.items(), key=lambda item: item[1]):
+            mode = "partial" if partial else "full"
+            self.stdout.write(f"  {parser:<12} {mode:<8} {seconds * 1000:8.2f} ms")
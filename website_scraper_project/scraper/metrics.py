@@ -0,0 +1,194 @@
+import contextvars
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds of the histogram buckets (Prometheus "le"), in seconds and in bytes
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set, e.g. cache lookups by result."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, key, value
+
+
+class Histogram:
+    """Distribution of observed values (durations, sizes) per label set, in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._series = {}  # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield f'{self.name}_bucket', key + (('le', _format_value(bound)),), cumulative
+            yield f'{self.name}_sum', key, values[-2]
+            yield f'{self.name}_count', key, values[-1]
+
+
+class Registry:
+    """The metrics of this process, rendered in the Prometheus text exposition format.
+
+    Values are kept in memory per process: with several worker processes each one reports
+    its own, as Prometheus expects from one scrape target per process.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'scraper_stage_seconds', 'Time spent in each scrape stage.', ['stage']))
+PAGE_BYTES = REGISTRY.register(Histogram(
+    'scraper_page_bytes', 'Size of fetched page bodies.', ['source'], buckets=BYTE_BUCKETS))
+FETCHED_BYTES = REGISTRY.register(Counter(
+    'scraper_fetched_bytes_total', 'Page body bytes fetched from the network or served from the fetch cache.',
+    ['source']))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'scraper_cache_lookups_total', 'Cache lookups by cache and result (hit, miss or stale).', ['cache', 'result']))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'scraper_request_seconds', 'Time to produce the response of each scraper endpoint.', ['view']))
+REQUESTS = REGISTRY.register(Counter(
+    'scraper_requests_total', 'Responses of each scraper endpoint by status code.', ['view', 'status']))
+
+# === Stage timing ===
+
+_timings = contextvars.ContextVar('scraper_stage_timings', default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Collect the stages timed in this context (thread) into a list of (stage, seconds)."""
+    timings = []
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def timed(stage):
+    """Time a block as stage: observed in scraper_stage_seconds and, inside collect_timings(),
+    added to the current request's timings (for its Server-Timing header)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def server_timing(timings, total=None):
+    """Server-Timing header value for (stage, seconds) pairs; repeated stages are summed."""
+    durations = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    if total is not None:
+        durations['total'] = total
+    return ', '.join(f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in durations.items())
+
+
+def instrumented(view):
+    """Decorate a view to record its response time and status, and to send the stages timed
+    while it ran in a Server-Timing header (streamed responses: only the time to start)."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        start = time.perf_counter()
+        with collect_timings() as timings:
+            response = view(request, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        REQUEST_SECONDS.observe(elapsed, view=view.__name__)
+        REQUESTS.inc(view=view.__name__, status=response.status_code)
+        if not getattr(response, 'streaming', False):
+            response['Server-Timing'] = server_timing(timings, elapsed)
+        return response
+    return wrapper
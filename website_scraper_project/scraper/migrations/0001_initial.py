@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048, unique=True)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('body', models.BinaryField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
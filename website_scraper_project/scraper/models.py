@@ -1,3 +1,41 @@
 from django.db import models
 
-# Create your models here.
+
+class FetchCacheEntry(models.Model):
+    """A previously fetched page, kept so re-scrapes can send conditional requests."""
+    url = models.URLField(max_length=2048, unique=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    body = models.BinaryField()  # zlib-compressed response body
+    size = models.PositiveIntegerField(default=0)  # compressed size in bytes
+    fetched_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.url
+
+
+class ScrapeJob(models.Model):
+    """A scrape queued through the jobs API and run by the in-process worker pool (see scraper.jobs)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    url = models.URLField(max_length=2048, db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            # One queued or running job per URL, so concurrent submits cannot both queue it
+            models.UniqueConstraint(fields=['url'], condition=models.Q(status__in=['queued', 'running']),
+                                    name='unique_active_scrape_job_url'),
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({self.status})"
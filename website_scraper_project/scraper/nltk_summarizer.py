@@ -0,0 +1,87 @@
+import threading
+from collections import Counter
+from functools import lru_cache
+
+# NLTK data packages used here and where nltk.data.find looks for them
+# (punkt_tab replaces the pickled punkt models in NLTK >= 3.8.2)
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+}
+
+_available = set()
+_download_lock = threading.Lock()
+
+
+def ensure_nltk_resource(name):
+    """Download an NLTK data package the first time it is needed, unless it is already installed.
+
+    Returns True when the package is available. Failures are not remembered, so a later
+    call retries the download.
+    """
+    if name in _available:
+        return True
+    import nltk
+
+    with _download_lock:
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+            found = True
+        except LookupError:
+            found = nltk.download(name, quiet=True)
+    if found:
+        _available.add(name)
+    return found
+
+
+@lru_cache(maxsize=None)
+def english_stopwords():
+    """Return the English stopword set, loaded once per process."""
+    ensure_nltk_resource('stopwords')
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words("english"))
+
+
+@lru_cache(maxsize=None)
+def tokenizers():
+    """Return the (sentence, word) tokenizer functions, loading the punkt models once per process."""
+    ensure_nltk_resource('punkt')
+    ensure_nltk_resource('punkt_tab')
+    from nltk.tokenize import sent_tokenize, word_tokenize
+    return sent_tokenize, word_tokenize
+
+
+# Text summarization using NLTK
+class Summarizer:
+    def __init__(self, text):
+        self.text = text
+
+    def summarize(self, num_sentences=3):
+        """Return the num_sentences sentences whose words are most frequent in the text.
+
+        The text is tokenized once: the same per-sentence word tokens feed both the
+        frequency count and the sentence scores.
+        """
+        sent_tokenize, word_tokenize = tokenizers()
+        stop_words = english_stopwords()
+
+        # Tokenize into sentences, then each sentence into words (already sentence-split, so
+        # word_tokenize is told not to run the sentence tokenizer again)
+        sentences = sent_tokenize(self.text)
+        tokenized = [word_tokenize(sentence.lower(), preserve_line=True) for sentence in sentences]
+
+        # Calculate word frequency
+        word_freq = Counter(word for words in tokenized for word in words
+                            if word.isalnum() and word not in stop_words)
+
+        # Score sentences based on word frequency
+        sentence_scores = {}
+        for sentence, words in zip(sentences, tokenized):
+            score = sum(word_freq[word] for word in words if word in word_freq)
+            if score:
+                sentence_scores[sentence] = sentence_scores.get(sentence, 0) + score
+
+        # Sort and extract top sentences
+        top_sentences = sorted(sentence_scores, key=sentence_scores.get, reverse=True)[:num_sentences]
+        return "\n".join(top_sentences)
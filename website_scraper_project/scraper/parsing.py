@@ -0,0 +1,106 @@
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from .metrics import timed
+
+# Tags whose content never contributes to the extracted page text
+UNWANTED_TAGS = ("script", "style", "img", "input")
+
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = "lxml"
+except ImportError:
+    FAST_PARSER = "html.parser"
+
+# Parser used when none is requested; override per deployment with SCRAPER_HTML_PARSER
+DEFAULT_PARSER = os.getenv("SCRAPER_HTML_PARSER", FAST_PARSER)
+
+# Only real tag names: "<style-guide>" is not a style tag
+_NAME_END = r"(?=[\s/>])"
+# Comments (group 1) and textareas (group 2) are matched only to be kept as they are, since a
+# "<script>" inside them is not a tag; closed script/style blocks and img/input tags are cut.
+# Every branch hangs off the one leading "<", which keeps the scan about as fast as a literal search.
+_UNWANTED = (rf"<(?:(!--.*?--)|(textarea){_NAME_END}[^>]*>.*?</textarea\s*"
+             rf"|(script|style){_NAME_END}[^>]*>.*?</\3\s*|(?:img|input){_NAME_END}[^>]*)>")
+_UNWANTED_BYTES = re.compile(_UNWANTED.encode(), re.IGNORECASE | re.DOTALL)
+_UNWANTED_TEXT = re.compile(_UNWANTED, re.IGNORECASE | re.DOTALL)
+_LEFTOVER_BYTES = re.compile(rf"<(?:script|style){_NAME_END}".encode(), re.IGNORECASE)
+_LEFTOVER_TEXT = re.compile(rf"<(?:script|style){_NAME_END}", re.IGNORECASE)
+
+
+def _keep_or_drop(match):
+    if match.group(1) is not None or match.group(2) is not None:
+        return match.group(0)
+    return match.group(0)[:0]  # b"" or "", like the markup
+
+
+def strip_unwanted_markup(content):
+    """Cut script/style blocks and img/input tags out of raw markup (bytes or str) before parsing.
+
+    A block without its closing tag (e.g. cut off by the byte cap) is left for the parser.
+    """
+    pattern = _UNWANTED_BYTES if isinstance(content, bytes) else _UNWANTED_TEXT
+    return pattern.sub(_keep_or_drop, content)
+
+
+def parse_html(content, parser=None, partial=True):
+    """Parse markup into a BeautifulSoup tree with the selected parser backend.
+
+    In partial mode the unwanted tags are removed from the markup first, so they are never
+    turned into tree nodes; any it cannot safely cut out are decomposed after parsing.
+    Otherwise the full document is parsed and they are decomposed.
+    Falls back to the built-in html.parser when the requested backend is not installed.
+    """
+    parser = parser or DEFAULT_PARSER
+    leftovers = False
+    if partial:
+        with timed('strip_markup'):
+            content = strip_unwanted_markup(content)
+            leftovers = (_LEFTOVER_BYTES if isinstance(content, bytes) else _LEFTOVER_TEXT).search(content)
+    with timed('parse'):
+        try:
+            soup = BeautifulSoup(content, parser)
+        except FeatureNotFound:
+            soup = BeautifulSoup(content, "html.parser")
+
+    # Script/style tags the markup pass could not cut out (unclosed, or inside comments) are
+    # removed from the tree, as in a full parse
+    if not partial or leftovers:
+        with timed('decompose'):
+            for irrelevant in soup.find_all(list(UNWANTED_TAGS)):
+                irrelevant.decompose()
+    return soup
+
+
+def available_parsers():
+    """Return the parser backends usable in this environment."""
+    parsers = ["html.parser"]
+    for name in ("lxml", "html5lib"):
+        try:
+            BeautifulSoup("", name)
+        except FeatureNotFound:
+            continue
+        parsers.append(name)
+    return parsers
+
+
+def time_parsers(content, parsers=None, repeat=5):
+    """Time parse_html + get_text for each backend in full and partial mode.
+
+    Returns {(parser, partial): best seconds over repeat runs}, to help pick the fastest
+    backend for a deployment.
+    """
+    timings = {}
+    for parser in parsers or available_parsers():
+        for partial in (False, True):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                parse_html(content, parser=parser, partial=partial).get_text(separator="\n", strip=True)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[(parser, partial)] = best
+    return timings
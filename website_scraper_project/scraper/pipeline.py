@@ -0,0 +1,92 @@
+from .deadline import Deadline, DeadlineExceeded
+from .metrics import timed
+from .website_scraper import Website, summarize_text
+
+
+def scrape_url(url, corpus=None, deadline=None, **options):
+    """Fetch, summarize and extract company details for one URL.
+
+    corpus (a summarization.Corpus) switches the summary to TF-IDF weighting; deadline
+    (a deadline.Deadline or seconds) bounds the whole scrape: stages that cannot start in
+    time are left as None and listed in the result's 'skipped_stages'; 'truncated' is True when
+    a streamed page was cut at max_bytes. Other options are
+    passed through to Website (session, timeout, cache, parser, ...).
+    Returns a (result, error) pair; result is None when the page could not be fetched.
+    """
+    deadline = Deadline.of(deadline)
+    website = Website(url, deadline=deadline, **options)
+
+    if website.error:
+        return None, website.error
+
+    result = {
+        'title': website.get_title(),
+        'truncated': website.truncated,
+        'summary': None,
+        'company_details': None
+    }
+    # Summarize only the main content so menus and footers don't crowd out real sentences
+    def summary():
+        main_text = website.get_main_text()
+        with timed('summary'):
+            return summarize_text(main_text, corpus=corpus)
+
+    stages = [
+        ('summary', summary),
+        ('company_details', website.get_company_details),
+    ]
+    skipped = []
+    for name, stage in stages:
+        if deadline.expired():
+            skipped.append(name)
+        else:
+            result[name] = stage()
+    result['skipped_stages'] = skipped
+
+    return result, None
+
+
+def scrape_url_events(url, corpus=None, llm=None, deadline=None, **options):
+    """Yield (event, data) pairs for one URL as soon as each stage has finished.
+
+    Events, in order: 'title' once the page is fetched (with 'truncated', see scrape_url), 'summary'
+    (extractive), 'company_details', then, when an llm.MapReduceSummarizer is given, one 'llm' event
+    per generated piece of the LLM summary, and finally 'done' with the 'skipped_stages' the deadline left out. A page that
+    cannot be fetched yields a single 'error' event; a failing LLM call yields 'llm_error'.
+    """
+    deadline = Deadline.of(deadline)
+    website = Website(url, deadline=deadline, **options)
+    if website.error:
+        yield 'error', {'error': website.error}
+        return
+
+    yield 'title', {'url': url, 'title': website.get_title(), 'truncated': website.truncated}
+    skipped = []
+    if deadline.expired():
+        skipped.append('summary')
+    else:
+        main_text = website.get_main_text()
+        with timed('summary'):
+            summary = summarize_text(main_text, corpus=corpus)
+        yield 'summary', {'summary': summary}
+    if deadline.expired():
+        skipped.append('company_details')
+    else:
+        yield 'company_details', website.get_company_details()
+
+    if llm is not None:
+        instructions = (f"You are looking at a website titled {website.get_title()}.\n"
+                        "The contents of this website are as follows. Please provide a short summary in markdown.")
+        try:
+            deadline.check('llm')
+            main_text = website.get_main_text()
+            with timed('llm'):
+                for token in llm.summarize_stream(main_text, instructions=instructions, deadline=deadline):
+                    yield 'llm', {'token': token}
+        except DeadlineExceeded:
+            # Tokens already sent stand; the summary is cut short
+            skipped.append('llm')
+        except Exception as e:
+            yield 'llm_error', {'error': f"Error during summarization: {e}"}
+
+    yield 'done', {'skipped_stages': skipped}
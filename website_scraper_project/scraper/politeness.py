@@ -0,0 +1,267 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import requests
+
+from .deadline import DeadlineExceeded
+from .http_client import fetch
+from .streaming import read_streamed
+
+DEFAULT_RATE = 1.0  # Requests per second allowed against one host
+DEFAULT_BURST = 2  # Requests that may go out back to back after a quiet period
+ROBOTS_TTL = 24 * 3600  # Seconds a parsed robots.txt is reused
+ROBOTS_ERROR_TTL = 5 * 60  # Seconds an unreachable robots.txt counts as "disallow all"
+ROBOTS_MAX_BYTES = 500 * 1024  # robots.txt is read up to here, the rest is never downloaded
+DEFAULT_PAUSE = 30.0  # Seconds a host is left alone after a 429/503 without Retry-After
+MAX_PAUSE = 10 * 60
+PAUSE_STATUSES = (429, 503)  # Answers that pause a host instead of being retried at once
+
+
+class RobotsDisallowed(requests.exceptions.RequestException):
+    """Raised when robots.txt does not allow fetching a URL."""
+
+
+def origin_of(url):
+    """Return scheme://host[:port] of a URL, the unit robots.txt and rate limits apply to."""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def check_url(url):
+    """Raise InvalidURL unless url is http(s) with a host, so no robots.txt is looked up for it."""
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        raise requests.exceptions.InvalidURL(f"Invalid URL '{url}': an http(s) URL with a host is needed")
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds a Retry-After header asks for, or None if it is unusable."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# === Token bucket ===
+
+class TokenBucket:
+    """Rate limiter for one host: rate requests per second with bursts of up to burst.
+
+    Callers reserve a token and are told how long to wait before using it, so concurrent
+    callers are spaced out instead of all waking at once.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()  # In the future while the host is paused
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, now=None):
+        """Take a token; return the seconds to wait before the request may be sent."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.tokens -= 1
+        return max(0.0, self.updated - now) + max(0.0, -self.tokens) / self.rate
+
+    def cancel(self):
+        """Give back a reserved token that will not be used."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def ready_in(self, now=None):
+        """Seconds until a token is available, without taking one."""
+        now = time.monotonic() if now is None else now
+        tokens = self.tokens
+        if now > self.updated:
+            tokens = min(self.burst, tokens + (now - self.updated) * self.rate)
+        return max(0.0, self.updated - now) + max(0.0, 1 - tokens) / self.rate
+
+    def slow_down(self, rate, burst=1):
+        self.rate = min(self.rate, rate)
+        self.burst = min(self.burst, burst)
+        self.tokens = min(self.tokens, self.burst)
+
+    def pause(self, seconds, now=None):
+        """Send nothing for the next seconds (e.g. after a 429 with Retry-After)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.updated = max(self.updated, now + seconds)
+        self.tokens = min(self.tokens, 1)
+
+# === robots.txt ===
+
+class RobotsCache:
+    """Parsed robots.txt per origin, fetched once and reused for ttl seconds.
+
+    Following RFC 9309, a missing robots.txt (4xx) allows everything, while a server error
+    or an unreachable host disallows everything until the shorter error_ttl has passed.
+    throttle(url, deadline), when set, is called right before robots.txt is requested;
+    PolitenessScheduler uses it to count that request against the host's rate limit.
+    """
+
+    def __init__(self, user_agent="*", ttl=ROBOTS_TTL, error_ttl=ROBOTS_ERROR_TTL, session=None, timeout=None,
+                 throttle=None):
+        self.user_agent = user_agent
+        self.throttle = throttle
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.session = session
+        self.timeout = timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._origin_locks = {}
+
+    def get(self, url, deadline=None):
+        """Return the RobotFileParser that applies to url, fetching robots.txt if needed.
+
+        deadline (a deadline.Deadline) bounds that fetch; DeadlineExceeded is raised, and
+        nothing cached, when it runs out first.
+        """
+        origin = origin_of(url)
+        entry = self._entries.get(origin)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        with self._lock:
+            origin_lock = self._origin_locks.setdefault(origin, threading.Lock())
+        # One fetch per origin; other threads wanting the same robots.txt wait for it
+        with origin_lock:
+            entry = self._entries.get(origin)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            parser, ttl = self._load(origin, deadline)
+            self._entries[origin] = (time.monotonic() + ttl, parser)
+            return parser
+
+    def _load(self, origin, deadline=None):
+        parser = robotparser.RobotFileParser(f"{origin}/robots.txt")
+        if self.throttle is not None:
+            self.throttle(parser.url, deadline)
+        try:
+            response = fetch(parser.url, session=self.session, timeout=self.timeout, deadline=deadline, stream=True)
+            if response.status_code < 400:
+                body, _ = read_streamed(response, max_bytes=ROBOTS_MAX_BYTES, deadline=deadline)
+            else:
+                response.close()
+        except requests.exceptions.RequestException as e:
+            if deadline is not None and deadline.expired():
+                # Our own time ran out, which says nothing about the host
+                raise DeadlineExceeded(f"Deadline of {deadline.seconds}s exceeded while reading {parser.url}") from e
+            parser.disallow_all = True
+            return parser, self.error_ttl
+        if response.status_code >= 500:
+            parser.disallow_all = True
+            return parser, self.error_ttl
+        if response.status_code >= 400:
+            parser.allow_all = True
+            return parser, self.ttl
+        text = body.decode("utf-8", errors="replace")
+        parser.parse(text.splitlines())
+        parser.modified()  # can_fetch() refuses everything until the parser is marked as read
+        return parser, self.ttl
+
+    def can_fetch(self, url, deadline=None):
+        return self.get(url, deadline).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url, deadline=None):
+        """Seconds robots.txt asks between requests (Crawl-delay or Request-rate), or None."""
+        parser = self.get(url, deadline)
+        delay = parser.crawl_delay(self.user_agent)
+        rate = parser.request_rate(self.user_agent)
+        if rate and rate.requests:
+            delay = max(float(delay or 0), rate.seconds / rate.requests)
+        return float(delay) if delay else None
+
+# === Scheduler ===
+
+class PolitenessScheduler:
+    """Keeps every host's request rate polite: per-host token buckets plus robots.txt.
+
+    Call acquire(url) right before each request (it blocks until the host's bucket allows
+    it and raises RobotsDisallowed for excluded URLs) and record_response(url, response)
+    after it, so 429/503 answers pause the host for their Retry-After. A Crawl-delay in
+    robots.txt lowers the host's rate. Batch runners use ready_in() to serve hosts that are
+    ready now instead of waiting on a throttled one.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, respect_robots=True, robots=None,
+                 default_pause=DEFAULT_PAUSE, max_pause=MAX_PAUSE):
+        self.rate = rate
+        self.burst = burst
+        self.robots = (robots or RobotsCache()) if respect_robots else None
+        if self.robots is not None and self.robots.throttle is None:
+            self.robots.throttle = self._wait_turn  # robots.txt requests count against the host too
+        self.default_pause = default_pause
+        self.max_pause = max_pause
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url):
+        # Callers hold self._lock
+        origin = origin_of(url)
+        bucket = self._buckets.get(origin)
+        if bucket is None:
+            bucket = self._buckets[origin] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def allowed(self, url, deadline=None):
+        """True unless robots.txt excludes url."""
+        return self.robots is None or self.robots.can_fetch(url, deadline)
+
+    def ready_in(self, url):
+        """Seconds before a request to url's host would be let through (0 for hosts not seen yet)."""
+        with self._lock:
+            bucket = self._buckets.get(origin_of(url))
+            return bucket.ready_in() if bucket is not None else 0.0
+
+    def acquire(self, url, deadline=None):
+        """Block until url may be requested.
+
+        Raises InvalidURL for anything but an http(s) URL with a host, RobotsDisallowed for
+        URLs robots.txt excludes, and DeadlineExceeded when reading robots.txt or the wait
+        would outlast deadline (a deadline.Deadline).
+        """
+        check_url(url)
+        if not self.allowed(url, deadline):
+            raise RobotsDisallowed(f"robots.txt does not allow fetching {url}")
+        # robots.txt is cached by now; its Crawl-delay can only lower the host's rate
+        delay = self.robots.crawl_delay(url, deadline) if self.robots else None
+        if delay:
+            with self._lock:
+                self._bucket(url).slow_down(1 / delay)
+        self._wait_turn(url, deadline)
+
+    def _wait_turn(self, url, deadline=None):
+        # Take one of the host's tokens, sleeping until it may be used
+        with self._lock:
+            bucket = self._bucket(url)
+            wait = bucket.reserve()
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and wait > remaining:
+                bucket.cancel()
+                raise DeadlineExceeded(f"{origin_of(url)} cannot be requested again within the deadline")
+        if wait > 0:
+            time.sleep(wait)
+
+    def record_response(self, url, response):
+        """Pause url's host when it answers 429 Too Many Requests or 503 with Retry-After."""
+        if response.status_code not in PAUSE_STATUSES:
+            return
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            if response.status_code == 503:
+                return
+            delay = self.default_pause
+        with self._lock:
+            self._bucket(url).pause(min(delay, self.max_pause))
@@ -0,0 +1,120 @@
+import re
+
+from bs4 import NavigableString, Tag
+
+# Elements that never hold main content
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form", "noscript", "svg", "button", "select",
+                    "script", "style", "template", "iframe"}
+# class/id hints for boilerplate containers and for likely content containers
+NEGATIVE_HINTS = re.compile(
+    r"nav|menu|footer|header|sidebar|cookie|consent|gdpr|banner|breadcrumb|social|share|popup|modal|"
+    r"newsletter|subscribe|skip|legal|copyright|sitemap", re.IGNORECASE)
+POSITIVE_HINTS = re.compile(r"article|content|main|body|entry|post|story|text|about|intro", re.IGNORECASE)
+# Elements whose text is scored as a paragraph of content
+TEXT_BLOCKS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "dd", "dt", "blockquote", "pre"}
+MIN_BLOCK_CHARS = 25
+
+
+def _hint_text(tag):
+    return " ".join(filter(None, [tag.get("id") or "", " ".join(tag.get("class") or []), tag.get("role") or ""]))
+
+
+def _is_boilerplate(tag):
+    """True for elements (and so subtrees) that are navigation, chrome or cookie banners."""
+    if tag.name in BOILERPLATE_TAGS or tag.get("aria-hidden") == "true":
+        return True
+    if tag.get("role") in ("navigation", "banner", "contentinfo", "complementary"):
+        return True
+    hints = _hint_text(tag)
+    return bool(hints) and bool(NEGATIVE_HINTS.search(hints)) and not POSITIVE_HINTS.search(hints)
+
+
+def _content_tags(root):
+    """Yield the tags under root in document order, pruning boilerplate subtrees."""
+    stack = [root]
+    while stack:
+        tag = stack.pop()
+        yield tag
+        stack.extend(child for child in reversed(tag.contents) if isinstance(child, Tag) and not _is_boilerplate(child))
+
+
+def _link_density(tag, text_length):
+    link_chars = sum(len(a.get_text(strip=True)) for a in tag.find_all("a"))
+    return link_chars / text_length if text_length else 1.0
+
+
+def _class_weight(tag):
+    hints = _hint_text(tag)
+    weight = 0
+    if hints and POSITIVE_HINTS.search(hints):
+        weight += 25
+    if hints and NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    if tag.name in ("article", "main"):
+        weight += 25
+    return weight
+
+
+def visible_lines(root):
+    """Return root's stripped text lines, leaving out boilerplate subtrees."""
+    lines = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, NavigableString):
+            if type(node) is NavigableString:
+                text = node.strip()
+                if text:
+                    lines.append(text)
+        elif node is root or not _is_boilerplate(node):
+            stack.extend(reversed(node.contents))
+    return lines
+
+
+def extract_main_content(soup):
+    """Return the page's main content as newline-separated text, or "" if none stands out.
+
+    Readability-style scoring: every paragraph-like block outside navigation/header/footer/
+    cookie chrome scores by its length and commas; the score goes to its parent and half to
+    its grandparent. Containers are then weighted by class/id hints and penalised by link
+    density, and the best one is returned together with its strong siblings.
+    """
+    root = soup.body or soup
+    scores = {}
+    candidates = {}
+    for tag in _content_tags(root):
+        if tag.name not in TEXT_BLOCKS:
+            continue
+        text = tag.get_text(" ", strip=True)
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for ancestor, share in ((tag.parent, 1.0), (tag.parent.parent if tag.parent else None, 0.5)):
+            if ancestor is None or not isinstance(ancestor, Tag):
+                continue
+            key = id(ancestor)
+            if key not in scores:
+                candidates[key] = ancestor
+                scores[key] = _class_weight(ancestor)
+            scores[key] += score * share
+
+    if not scores:
+        return ""
+
+    for key, tag in candidates.items():
+        text_length = len(tag.get_text(strip=True))
+        scores[key] *= 1 - _link_density(tag, text_length)
+
+    best_key = max(scores, key=scores.get)
+    best = candidates[best_key]
+    if scores[best_key] <= 0:
+        return ""
+
+    # Siblings that score well (e.g. the next <section> of the same article) belong to the content
+    threshold = max(10, scores[best_key] * 0.2)
+    parts = []
+    siblings = best.parent.find_all(recursive=False) if best.parent else [best]
+    for sibling in siblings:
+        if sibling is best or scores.get(id(sibling), 0) >= threshold:
+            parts.extend(visible_lines(sibling))
+    return "\n".join(parts)
@@ -0,0 +1,150 @@
+import codecs
+from email.message import Message
+from html.parser import HTMLParser
+
+import requests
+from bs4.dammit import EncodingDetector
+from requests.compat import chardet
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+class UnsupportedContentType(requests.exceptions.RequestException):
+    """Raised when a response's Content-Type is not on the allowlist."""
+
+
+class StreamingTextExtractor(HTMLParser):
+    """Incremental HTML parser that collects the title, visible text and links while chunks arrive.
+
+    Produces the same shape of text as soup.get_text(separator="\\n", strip=True) with
+    script/style/img/input removed: one stripped line per text node, empty nodes dropped.
+    links are the href values of the <a> tags, in document order.
+    """
+
+    SKIPPED_TAGS = ("script", "style")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = None
+        self.lines = []
+        self.links = []
+        self._pending = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href is not None:
+                self.links.append(href)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in self.SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        # A text node can arrive split across several feed() calls; join it before stripping
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+        if self._in_title and self.title is None:
+            self.title = text
+        text = text.strip()
+        if text:
+            self.lines.append(text)
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+
+def check_content_type(response, allowed=DEFAULT_CONTENT_TYPES):
+    """Raise UnsupportedContentType unless the response's media type is allowed."""
+    content_type = response.headers.get("Content-Type", "")
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type and allowed and media_type not in allowed:
+        raise UnsupportedContentType(f"Unsupported content type {media_type!r} for {response.url}",
+                                     response=response)
+
+
+def read_streamed(response, max_bytes=DEFAULT_MAX_BYTES, extractor=None, chunk_size=CHUNK_SIZE, deadline=None):
+    """Read a stream=True response in chunks, stopping at max_bytes and feeding the extractor.
+
+    Returns (body bytes, truncated): a body longer than max_bytes is cut there and the rest is
+    never downloaded. The connection is also closed when a deadline (see deadline.Deadline)
+    runs out while a slow server is still sending.
+    """
+    decoder = None
+    body = bytearray()
+    truncated = False
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if len(body) + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - len(body)]
+                truncated = True
+            body.extend(chunk)
+            if deadline is not None:
+                deadline.check(f"finishing the download of {response.url}")
+            if extractor is not None:
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(_encoding_of(response, chunk))(errors="replace")
+                extractor.feed(decoder.decode(chunk))
+            if truncated:
+                break
+    finally:
+        response.close()
+
+    if extractor is not None:
+        if decoder is not None:
+            extractor.feed(decoder.decode(b"", final=True))
+        extractor.close()
+    return bytes(body), truncated
+
+
+def _encoding_of(response, first_chunk=b""):
+    """Return the charset of a streamed body: the one in the Content-Type header, else a
+    <meta charset> in the first chunk, else a guess from that chunk's bytes, else UTF-8."""
+    message = Message()
+    message["Content-Type"] = response.headers.get("Content-Type", "")
+    encoding = (message.get_content_charset()
+                or EncodingDetector.find_declared_encoding(first_chunk, is_html=True)
+                or _guess_encoding(first_chunk))
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = "utf-8"
+    return encoding
+
+
+def _guess_encoding(chunk):
+    # What response.apparent_encoding would say, from the bytes already read. Plain ASCII
+    # is read as UTF-8, its superset, in case later chunks are not ASCII.
+    encoding = chardet.detect(chunk)["encoding"] if chunk else None
+    if not encoding or encoding.lower() in ("ascii", "us-ascii"):
+        return "utf-8"
+    return encoding
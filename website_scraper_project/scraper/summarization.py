@@ -0,0 +1,105 @@
+import json
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_WORD_LIMIT = 200
+DEFAULT_TOP_WORDS = 50
+
+
+class Corpus:
+    """Document frequencies of words across previously scraped pages, used for TF-IDF weighting."""
+
+    def __init__(self, document_frequencies=None, documents=0):
+        self.document_frequencies = Counter(document_frequencies or {})
+        self.documents = documents
+
+    def add(self, text):
+        """Count each alphabetic word of text once towards its document frequency."""
+        self.document_frequencies.update({word.lower() for word in text.split() if word.isalpha()})
+        self.documents += 1
+
+    def idf(self, vocabulary):
+        """Return smoothed inverse document frequencies for a list of (lower-cased) words."""
+        frequencies = np.fromiter((self.document_frequencies.get(word, 0) for word in vocabulary),
+                                  dtype=np.float64, count=len(vocabulary))
+        return np.log((1 + self.documents) / (1 + frequencies)) + 1
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'documents': self.documents, 'document_frequencies': self.document_frequencies}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['document_frequencies'], data['documents'])
+
+
+class _Document:
+    """A text tokenized once into lines, token ids and the per-token line index."""
+
+    def __init__(self, text, vocabulary):
+        self.lines = text.split("\n")
+        tokens = [line.split() for line in self.lines]
+        self.line_lengths = np.fromiter((len(line) for line in tokens), dtype=np.int64, count=len(tokens))
+        self.line_ids = np.repeat(np.arange(len(self.lines)), self.line_lengths)
+        self.token_ids = np.fromiter(
+            (vocabulary.setdefault(word.lower(), len(vocabulary)) for line in tokens for word in line),
+            dtype=np.int64, count=int(self.line_lengths.sum()))
+
+
+class SummaryEngine:
+    """Extractive summarizer that scores lines by their share of the text's most frequent words.
+
+    Each text is tokenized once and scored with NumPy array operations. With a Corpus the
+    frequent words are chosen, and lines weighted, by TF-IDF instead of raw frequency.
+    """
+
+    def __init__(self, word_limit=DEFAULT_WORD_LIMIT, top_words=DEFAULT_TOP_WORDS, corpus=None):
+        self.word_limit = word_limit
+        self.top_words = top_words
+        self.corpus = corpus
+
+    def summarize(self, text):
+        """Summarize one text; see summarize_many."""
+        return self.summarize_many([text])[0]
+
+    def summarize_many(self, texts):
+        """Summarize a batch of texts, sharing one vocabulary across the batch.
+
+        Lines are ranked by score (ties keep document order) and taken greedily until the next
+        line would exceed word_limit words.
+        """
+        vocabulary = {}
+        documents = [_Document(text, vocabulary) for text in texts]
+        words = list(vocabulary)
+        alphabetic = np.fromiter((word.isalpha() for word in words), dtype=bool, count=len(words))
+        idf = self.corpus.idf(words) if self.corpus is not None else None
+        return [self._summarize_document(document, alphabetic, idf) for document in documents]
+
+    def _summarize_document(self, document, alphabetic, idf):
+        # Frequencies of the alphabetic words in this document, indexed by vocabulary id
+        local_ids, first_seen, token_index = np.unique(document.token_ids, return_index=True,
+                                                       return_inverse=True)
+        counts = np.bincount(token_index, minlength=local_ids.size).astype(np.float64)
+        counts[~alphabetic[local_ids]] = 0
+        weights = counts if idf is None else counts * idf[local_ids]
+
+        # Pick the top words (stable sort: ties keep first-occurrence order, like Counter.most_common)
+        order = np.lexsort((first_seen, -weights))[:self.top_words]
+        order = order[weights[order] > 0]
+        token_weight = np.zeros(local_ids.size)
+        token_weight[order] = 1.0 if idf is None else idf[local_ids[order]]
+
+        scores = np.bincount(document.line_ids, weights=token_weight[token_index],
+                             minlength=len(document.lines))
+        ranked = np.argsort(-scores, kind='stable')
+        taken = np.searchsorted(np.cumsum(document.line_lengths[ranked]), self.word_limit, side='right')
+        return ' '.join(document.lines[i] for i in ranked[:taken])
+
+
+def summarize_texts(texts, word_limit=DEFAULT_WORD_LIMIT, corpus=None):
+    """Summarize many texts in one batched call."""
+    return SummaryEngine(word_limit=word_limit, corpus=corpus).summarize_many(texts)
+
@@ -1,3 +1,1077 @@
-from django.test import TestCase
+import importlib.util
+import bz2
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from unittest import mock, skipUnless
+
+import requests
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .batch import run_concurrently
+from .benchmark import build_fixture, compare, generated_fixtures, run_benchmark
+from .deadline import Deadline, DeadlineExceeded
+from .fetch_cache import FetchCache
+from .http_client import build_session, fetch
+from .jobs import JobWorkers, submit
+from .keyword_index import KeywordMatcher, build_keyword_index
+from .llm import MapReduceSummarizer, ResponseCache, count_tokens
+from .models import FetchCacheEntry, ScrapeJob
+from . import nltk_summarizer
+from .parsing import parse_html
+from .pipeline import scrape_url
+from .readability import extract_main_content
+from .summarization import SummaryEngine, summarize_texts
+from .politeness import PolitenessScheduler, RobotsCache
+from .website_scraper import Website, summarize_text
+
+
+class StubServer:
+    """Local HTTP server for the tests; handler(request) answers each GET (a BaseHTTPRequestHandler).
+
+    Every request path is recorded in requests.
+    """
+
+    def __init__(self, handler):
+        requests = self.requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(request):
+                requests.append(request.path)
+                try:
+                    handler(request)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up waiting, as some tests want it to
+
+            do_POST = do_GET
+
+            def log_message(request, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path='/'):
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def respond(request, status=200, body=b'', content_type='text/html', headers=None):
+    request.send_response(status)
+    request.send_header('Content-Type', content_type)
+    request.send_header('Content-Length', str(len(body)))
+    for name, value in (headers or {}).items():
+        request.send_header(name, value)
+    request.end_headers()
+    request.wfile.write(body)
+
+
+def openai_stub(answer):
+    """StubServer handler for the OpenAI chat completions API: replies answer(user prompt)."""
+    def handle(request):
+        body = json.loads(request.rfile.read(int(request.headers['Content-Length'])))
+        prompt = body['messages'][-1]['content']
+        request.server.prompts.append(prompt)
+        completion = {'id': 'stub', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+                      'choices': [{'index': 0, 'finish_reason': 'stop',
+                                   'message': {'role': 'assistant', 'content': answer(prompt)}}]}
+        respond(request, body=json.dumps(completion).encode(), content_type='application/json')
+    return handle
+
+
+def openai_client(server):
+    from openai import OpenAI
+    server.server.prompts = []
+    return OpenAI(api_key='test', base_url=server.url('/v1'), max_retries=0)
+
+
+class HttpClientTests(TestCase):
+    def test_hanging_host_stays_within_deadline(self):
+        def hang(request):
+            time.sleep(3)
+            respond(request, body=b'late')
+
+        with StubServer(hang) as server:
+            start = time.monotonic()
+            with self.assertRaises(Exception):
+                fetch(server.url(), session=build_session(), deadline=Deadline(1))
+            elapsed = time.monotonic() - start
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_retries_that_fit_in_the_deadline_are_made(self):
+        def flaky(request):
+            respond(request, status=503 if len(server.requests) < 2 else 200, body=b'ok')
+
+        with StubServer(flaky) as server:
+            response = fetch(server.url(), session=build_session(backoff_factor=0.05), deadline=Deadline(5))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_retry_after_longer_than_the_deadline_is_not_waited_for(self):
+        def busy(request):
+            respond(request, status=429, headers={'Retry-After': '30'})
+
+        with StubServer(busy) as server:
+            start = time.monotonic()
+            response = fetch(server.url(), session=build_session(), deadline=Deadline(2))
+        self.assertEqual(response.status_code, 429)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_status_retries_can_be_turned_off(self):
+        with StubServer(lambda request: respond(request, status=503)) as server:
+            response = fetch(server.url(), session=build_session(backoff_factor=0), unretried_statuses=(503,))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(server.requests), 1)
+
+
+class PolitenessTests(TestCase):
+    def test_url_without_scheme_or_host_is_rejected_before_robots(self):
+        scheduler = PolitenessScheduler()
+        for url in ('notaurl', 'ftp://example.com/', 'http:///path'):
+            with self.assertRaises(requests.exceptions.InvalidURL):
+                scheduler.acquire(url)
+
+    def test_robots_fetch_is_bounded_by_the_deadline(self):
+        def hang(request):
+            time.sleep(3)
+            respond(request, body=b'User-agent: *\nDisallow:\n', content_type='text/plain')
+
+        with StubServer(hang) as server:
+            scheduler = PolitenessScheduler(robots=RobotsCache(session=build_session()))
+            start = time.monotonic()
+            with self.assertRaises(DeadlineExceeded):
+                scheduler.acquire(server.url('/page'), Deadline(1))
+            self.assertLess(time.monotonic() - start, 1.5)
+            # Running out of time is not held against the host
+            self.assertEqual(scheduler.robots._entries, {})
+
+    def test_robots_txt_is_read_up_to_the_cap(self):
+        robots = b'User-agent: *\nDisallow: /private\n' + b'#' * 2000 + b'\nDisallow: /page\n'
+
+        with StubServer(lambda request: respond(request, body=robots, content_type='text/plain')) as server, \
+                mock.patch('scraper.politeness.ROBOTS_MAX_BYTES', 1000):
+            cache = RobotsCache(session=build_session())
+            self.assertFalse(cache.can_fetch(server.url('/private')))
+            self.assertTrue(cache.can_fetch(server.url('/page')))
+
+    def test_robots_fetch_takes_a_token_from_the_host(self):
+        with StubServer(lambda request: respond(request, body=b'', content_type='text/plain')) as server:
+            scheduler = PolitenessScheduler(rate=4, burst=1, robots=RobotsCache(session=build_session()))
+            start = time.monotonic()
+            scheduler.acquire(server.url('/page'))
+            self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(server.requests, ['/robots.txt'])
+
+    def test_scheduled_fetch_still_retries_502(self):
+        def flaky(request):
+            respond(request, status=502 if len(server.requests) < 2 else 200, body=b'<p>Back</p>')
+
+        with StubServer(flaky) as server:
+            website = Website(server.url('/page'), session=build_session(backoff_factor=0.01),
+                              scheduler=PolitenessScheduler(respect_robots=False))
+        self.assertIsNone(website.error)
+        self.assertEqual(server.requests, ['/page', '/page'])
+
+    def test_scheduled_fetch_sees_429_and_pauses_the_host(self):
+        def busy(request):
+            respond(request, status=429, headers={'Retry-After': '60'})
+
+        with StubServer(busy) as server:
+            scheduler = PolitenessScheduler(respect_robots=False)
+            website = Website(server.url('/page'), scheduler=scheduler)
+        self.assertIsNotNone(website.error)
+        self.assertEqual(server.requests, ['/page'])
+        self.assertGreater(scheduler.ready_in(server.url('/page')), 30)
+
+
+class StreamingEncodingTests(TestCase):
+    def fetch_text(self, body):
+        with StubServer(lambda request: respond(request, body=body)) as server:
+            website = Website(server.url('/page'), stream=True)
+        self.assertIsNone(website.error)
+        return website.text
+
+    def test_meta_charset_is_used_without_a_header_charset(self):
+        body = ('<html><head><meta charset="windows-1252"><title>Caf\u00e9</title></head>'
+                '<body><p>Caf\u00e9 Soci\u00e9t\u00e9</p></body></html>').encode('cp1252')
+        self.assertIn('Caf\u00e9 Soci\u00e9t\u00e9', self.fetch_text(body))
+
+    def test_encoding_is_guessed_without_any_declaration(self):
+        body = ('<html><body><p>' + 'Caf\u00e9 Soci\u00e9t\u00e9, cr\u00e8me br\u00fbl\u00e9e \u00e0 la carte. ' * 5
+                + '</p></body></html>').encode('cp1252')
+        self.assertIn('Caf\u00e9 Soci\u00e9t\u00e9', self.fetch_text(body))
+
+
+class StreamingFetchTests(TestCase):
+    PAGE = (b'<html><head><title>Acme</title></head><body><nav><a href="/about">About Us</a></nav>'
+            b'<p>' + b'Acme builds anvils and rockets for coyotes. ' * 20 + b'</p></body></html>')
+
+    def test_a_body_over_max_bytes_is_cut_and_flagged(self):
+        with StubServer(lambda request: respond(request, body=self.PAGE * 100)) as server:
+            website = Website(server.url('/page'), stream=True, max_bytes=2000)
+            complete = Website(server.url('/page'), stream=True)
+        self.assertIsNone(website.error)
+        self.assertTrue(website.truncated)
+        self.assertEqual(website.get_title(), 'Acme')
+        self.assertLess(len(website.text), len(complete.text))
+        self.assertFalse(complete.truncated)
+
+    def test_text_only_takes_links_from_the_stream_without_parsing(self):
+        with StubServer(lambda request: respond(request, body=self.PAGE)) as server:
+            with mock.patch('scraper.website_scraper.parse_html', wraps=parse_html) as parse:
+                website = Website(server.url('/page'), stream=True, text_only=True)
+        self.assertEqual(website.get_title(), 'Acme')
+        self.assertIn('About Us', website.text)
+        self.assertEqual(website.get_links(), ['/about'])
+        self.assertEqual(parse.call_count, 0)
+
+    def test_streamed_scrape_parses_the_page_once(self):
+        with StubServer(lambda request: respond(request, body=self.PAGE)) as server:
+            with mock.patch('scraper.website_scraper.parse_html', wraps=parse_html) as parse:
+                result, error = scrape_url(server.url('/page'), stream=True)
+        self.assertIsNone(error)
+        self.assertEqual(result['title'], 'Acme')
+        self.assertFalse(result['truncated'])
+        self.assertEqual(parse.call_count, 1)
+
+
+def etag_page(body):
+    """StubServer handler serving body with an ETag, and 304 to a matching If-None-Match."""
+    def handle(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            respond(request, status=304)
+        else:
+            respond(request, body=body, headers={'ETag': '"v1"'})
+    return handle
+
+
+class FetchCacheTests(TestCase):
+    PAGE = b'<html><head><title>Acme</title></head><body><p>Anvils</p></body></html>'
+
+    def test_a_stored_page_is_revalidated_and_reused(self):
+        cache = FetchCache()
+        with StubServer(etag_page(self.PAGE)) as server:
+            first = Website(server.url('/page'), cache=cache)
+            second = Website(server.url('/page'), cache=cache)
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.get_title(), 'Acme')
+
+    def test_an_expired_entry_is_a_miss(self):
+        cache = FetchCache(ttl=60)
+        cache.store('http://example.com/', mock.Mock(headers={'ETag': '"v1"'}), self.PAGE)
+        self.assertIsNotNone(cache.lookup('http://example.com/'))
+        FetchCacheEntry.objects.update(fetched_at=timezone.now() - timedelta(seconds=120))
+        self.assertIsNone(cache.lookup('http://example.com/'))
+        self.assertFalse(FetchCacheEntry.objects.exists())
+
+    def test_a_locked_database_does_not_fail_the_scrape(self):
+        locked = OperationalError('database is locked')
+        with StubServer(etag_page(self.PAGE)) as server, \
+                mock.patch.object(FetchCacheEntry.objects, 'filter', side_effect=locked), \
+                mock.patch.object(FetchCacheEntry.objects, 'update_or_create', side_effect=locked):
+            website = Website(server.url('/page'), cache=FetchCache())
+        self.assertIsNone(website.error)
+        self.assertEqual(website.get_title(), 'Acme')
+
+
+class FetchCacheConcurrencyTests(TransactionTestCase):
+    def test_concurrent_writes_are_all_stored(self):
+        cache = FetchCache()
+        errors = []
+
+        def store(n):
+            try:
+                for i in range(10):
+                    cache.store(f'http://example.com/{n}/{i}', mock.Mock(headers={'ETag': f'"{i}"'}), b'body' * 100)
+                    cache.lookup(f'http://example.com/{n}/{i}')
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=store, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(FetchCacheEntry.objects.count(), 80)
+
+
+class MetricsTests(TestCase):
+    PAGE = b'<html><head><title>Acme</title></head><body><p>Acme builds anvils for coyotes.</p></body></html>'
+
+    def setUp(self):
+        # No robots.txt or rate limit between the test and its stub server
+        patcher = mock.patch('scraper.views._politeness_scheduler', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scrape_reports_its_stages_in_server_timing_and_metrics(self):
+        with StubServer(lambda request: respond(request, body=self.PAGE)) as server:
+            response = self.client.get(reverse('scrape_website'), {'url': server.url('/page')})
+        self.assertEqual(response.status_code, 200)
+        stages = [part.split(';')[0] for part in response['Server-Timing'].split(', ')]
+        self.assertIn('fetch', stages)
+        self.assertIn('summary', stages)
+        self.assertEqual(stages[-1], 'total')
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE scraper_stage_seconds histogram', text)
+        self.assertIn('scraper_stage_seconds_count{stage="fetch"}', text)
+        self.assertIn('scraper_requests_total{view="scrape_website",status="200"}', text)
+        self.assertIn('scraper_stage_seconds_bucket{stage="fetch",le="+Inf"}', text)
+
+    @override_settings(SCRAPER_METRICS=False)
+    def test_metrics_can_be_switched_off(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+class RunConcurrentlyTests(TestCase):
+    def test_every_url_once_with_failures_reported(self):
+        def fetch_page(url):
+            if url.endswith('/broken'):
+                raise ValueError('boom')
+            return url.upper()
+
+        urls = ['http://a.test/1', 'http://b.test/1', 'http://a.test/1', 'http://a.test/broken']
+        results = {url: (result, exc) for url, result, exc in run_concurrently(urls, fetch_page)}
+        self.assertEqual(set(results), {'http://a.test/1', 'http://b.test/1', 'http://a.test/broken'})
+        self.assertEqual(results['http://b.test/1'], ('HTTP://B.TEST/1', None))
+        self.assertIsNone(results['http://a.test/broken'][0])
+        self.assertIsInstance(results['http://a.test/broken'][1], ValueError)
+
+    def test_concurrency_is_bounded_overall_and_per_host(self):
+        lock = threading.Lock()
+        running = {}
+        peaks = {'all': 0}
+        started = []
+
+        def fetch_page(url):
+            host = url.split('/')[2]
+            with lock:
+                started.append(host)
+                running[host] = running.get(host, 0) + 1
+                peaks[host] = max(peaks.get(host, 0), running[host])
+                peaks['all'] = max(peaks['all'], sum(running.values()))
+            time.sleep(0.02)
+            with lock:
+                running[host] -= 1
+
+        urls = [f'http://big.test/{i}' for i in range(12)] + [f'http://{name}.test/' for name in 'abc']
+        self.assertEqual(len(list(run_concurrently(urls, fetch_page, max_workers=4, per_host=2))), 15)
+        self.assertEqual(peaks['big.test'], 2)
+        self.assertLessEqual(peaks['all'], 4)
+        # Round-robin: the small hosts do not wait behind the big one
+        self.assertEqual(set(started[:5]), {'big.test', 'a.test', 'b.test', 'c.test'})
+
+
+def counter_summarize_text(text, word_limit=200):
+    """summarize_text as it was before SummaryEngine, kept as the reference output."""
+    from collections import Counter
+
+    word_counts = Counter([word.lower() for word in text.split() if word.isalpha()])
+    most_common_words = [word for word, _ in word_counts.most_common(50)]
+    sentence_scores = [(sum(1 for word in sentence.split() if word.lower() in most_common_words), sentence)
+                       for sentence in text.split("\n")]
+    summary = []
+    word_count = 0
+    for _, sentence in sorted(sentence_scores, reverse=True, key=lambda x: x[0]):
+        if word_count + len(sentence.split()) > word_limit:
+            break
+        summary.append(sentence)
+        word_count += len(sentence.split())
+    return ' '.join(summary)
+
+
+class SummaryEngineTests(TestCase):
+    def random_text(self, rng):
+        words = [rng.choice(['Acme', 'anvil', 'rocket', 'magnet', 'desert', 'coyote']) for _ in range(5)] + \
+                [f'word{n}' for n in range(80)] + ['2026', 'e-mail', 'ACME', '&', 'caf\u00e9']
+        lines = [' '.join(rng.choice(words) for _ in range(rng.randint(0, 25))) for _ in range(rng.randint(1, 40))]
+        return '\n'.join(lines)
+
+    def test_output_matches_the_counter_implementation(self):
+        rng = random.Random(7)
+        texts = [self.random_text(rng) for _ in range(200)] + ['', '\n\n', 'one', 'Acme, anvils. Acme!']
+        for text in texts:
+            for word_limit in (5, 50, 200):
+                self.assertEqual(summarize_text(text, word_limit=word_limit),
+                                 counter_summarize_text(text, word_limit=word_limit), text)
+
+    def test_a_batch_gives_the_same_summaries_as_one_by_one(self):
+        rng = random.Random(11)
+        texts = [self.random_text(rng) for _ in range(20)]
+        self.assertEqual(summarize_texts(texts, word_limit=40),
+                         [SummaryEngine(word_limit=40).summarize(text) for text in texts])
+
+
+class NltkSummarizerTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(nltk_summarizer, '_available', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        nltk_summarizer.english_stopwords.cache_clear()
+        self.addCleanup(nltk_summarizer.english_stopwords.cache_clear)
+
+    def test_importing_the_module_does_not_load_nltk(self):
+        code = 'import sys, scraper.nltk_summarizer; print("nltk" in sys.modules)'
+        output = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, capture_output=True, text=True,
+                                check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+    def test_a_missing_resource_is_downloaded_once(self):
+        with mock.patch('nltk.data.find', side_effect=LookupError) as find, \
+                mock.patch('nltk.download', return_value=True) as download:
+            self.assertTrue(nltk_summarizer.ensure_nltk_resource('stopwords'))
+            self.assertTrue(nltk_summarizer.ensure_nltk_resource('stopwords'))
+        find.assert_called_once_with('corpora/stopwords')
+        download.assert_called_once_with('stopwords', quiet=True)
+
+    def test_a_failed_download_is_retried_on_the_next_call(self):
+        with mock.patch('nltk.data.find', side_effect=LookupError), \
+                mock.patch('nltk.download', side_effect=[False, True]) as download:
+            self.assertFalse(nltk_summarizer.ensure_nltk_resource('punkt'))
+            self.assertTrue(nltk_summarizer.ensure_nltk_resource('punkt'))
+        self.assertEqual(download.call_count, 2)
+
+    def test_stopwords_are_loaded_once_per_process(self):
+        with mock.patch.object(nltk_summarizer, 'ensure_nltk_resource') as ensure, \
+                mock.patch('nltk.corpus.stopwords', new=mock.Mock()) as stopwords:
+            stopwords.words.return_value = ['the', 'and']
+            self.assertEqual(nltk_summarizer.english_stopwords(), {'the', 'and'})
+            nltk_summarizer.english_stopwords()
+        ensure.assert_called_once_with('stopwords')
+        stopwords.words.assert_called_once_with('english')
+
+
+class KeywordIndexTests(TestCase):
+    def test_found_sets(self):
+        matcher = KeywordMatcher(['about', 'about us', 'us', 'contact', 'careers', 'about'])
+        self.assertEqual(matcher.search('read about us or contact'), {'about', 'about us', 'us', 'contact'})
+        self.assertEqual(matcher.search('bus'), {'us'})
+        self.assertEqual(matcher.search('nothing here'), set())
+        self.assertEqual(matcher.search(''), set())
+        self.assertEqual(matcher.search('about careers', {'careers'}), {'careers'})
+        self.assertEqual(KeywordMatcher([]).search('about'), set())
+
+    def test_index_maps_keywords_to_their_first_node(self):
+        soup = parse_html(b'<html><body><h2>About Us</h2><p>Our Services and about us again</p>'
+                          b'<p>Contact</p></body></html>')
+        index = build_keyword_index(soup, ['About Us', 'Services', 'Contact', 'Careers'])
+        self.assertEqual(index['about us'], 'About Us')
+        self.assertEqual(index['services'], 'Our Services and about us again')
+        self.assertEqual(index['contact'], 'Contact')
+        self.assertIsNone(index['careers'])
+
+
+class ReadabilityTests(TestCase):
+    PAGE = (b'<html><body>'
+            b'<header><a href="/">Acme</a><nav><a href="/products">Products</a><a href="/about">About us</a>'
+            b'<a href="/contact">Contact our friendly sales team today</a></nav></header>'
+            b'<div class="cookie-banner"><p>We use cookies to improve your experience, accept them all.</p></div>'
+            b'<div class="layout">'
+            b'<aside class="sidebar"><ul><li><a href="/news">Latest news from the Acme newsroom</a></li>'
+            b'<li><a href="/jobs">Careers at Acme, join our growing team</a></li></ul></aside>'
+            b'<div class="article-content"><h1>About Acme</h1>'
+            b'<p>Acme Corporation was founded in 1949, in the desert, by a family of engineers.</p>'
+            b'<p>Today it builds anvils, rockets, giant magnets and portable holes, shipped worldwide.</p>'
+            b'<p>Every product is tested on roadrunners, by our own team, before it leaves the factory.</p>'
+            b'</div></div>'
+            b'<footer><p>Copyright 2026 Acme Corporation, all rights reserved, terms apply.</p></footer>'
+            b'</body></html>')
+
+    def test_main_content_leaves_out_navigation_sidebar_and_footer(self):
+        text = extract_main_content(parse_html(self.PAGE))
+        self.assertTrue(text.startswith('About Acme\nAcme Corporation was founded in 1949'))
+        self.assertIn('tested on roadrunners', text)
+        for boilerplate in ('Contact our friendly sales team', 'cookies', 'Careers at Acme', 'Copyright'):
+            self.assertNotIn(boilerplate, text)
+
+    def test_full_text_is_used_when_no_block_stands_out(self):
+        page = b'<html><head><title>Acme</title></head><body><nav><p>Home, Products, About us, Contact us</p></nav>' \
+               b'<div><span>Coming soon</span></div></body></html>'
+        self.assertEqual(extract_main_content(parse_html(page)), '')
+        with StubServer(lambda request: respond(request, body=page)) as server:
+            website = Website(server.url('/page'))
+        self.assertEqual(website.get_main_text(), website.get_text())
+        self.assertIn('Coming soon', website.get_main_text())
+
+
+def openai_stream_stub(tokens):
+    """StubServer handler for a streamed chat completion that sends tokens one chunk at a time."""
+    def handle(request):
+        body = json.loads(request.rfile.read(int(request.headers['Content-Length'])))
+        chunks = [{'id': 'stub', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model'],
+                   'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]}
+                  for token in tokens]
+        events = ''.join(f'data: {json.dumps(chunk)}\n\n' for chunk in chunks) + 'data: [DONE]\n\n'
+        respond(request, body=events.encode(), content_type='text/event-stream')
+    return handle
+
+
+class ScrapeStreamTests(TestCase):
+    PAGE = (b'<html><head><title>Acme</title></head><body><h2>About Us</h2>'
+            b'<p>Acme Corporation builds anvils, rockets and giant magnets for coyotes everywhere.</p></body></html>')
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        patcher = mock.patch('scraper.views._politeness_scheduler', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def events(self, url, llm_handler=None):
+        """GET the stream view for url and return its server-sent events as [(event, data)]."""
+        with StubServer(llm_handler or (lambda request: None)) as llm_server:
+            summarizer = MapReduceSummarizer(client=openai_client(llm_server),
+                                             cache=ResponseCache(self.cache_dir.name)) if llm_handler else None
+            with mock.patch('scraper.views._llm_summarizer', return_value=summarizer):
+                response = self.client.get(reverse('scrape_stream'), {'url': url})
+                self.assertEqual(response['Content-Type'], 'text/event-stream')
+                body = b''.join(response.streaming_content).decode()
+        events = []
+        for block in body.split('\n\n'):
+            if block:
+                event, data = block.split('\n')
+                events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return events
+
+    def test_stages_arrive_in_order_with_the_llm_summary_token_by_token(self):
+        with StubServer(lambda request: respond(request, body=self.PAGE)) as server:
+            events = self.events(server.url('/page'), openai_stream_stub(['Acme ', 'makes ', 'anvils.']))
+        self.assertEqual([event for event, _ in events],
+                         ['title', 'summary', 'company_details', 'llm', 'llm', 'llm', 'done'])
+        self.assertEqual(events[0][1], {'url': server.url('/page'), 'title': 'Acme', 'truncated': False})
+        self.assertIn('anvils', events[1][1]['summary'])
+        self.assertEqual(''.join(data['token'] for event, data in events if event == 'llm'), 'Acme makes anvils.')
+        self.assertEqual(events[-1][1], {'skipped_stages': []})
+
+    def test_a_failed_llm_call_is_an_event_too(self):
+        with StubServer(lambda request: respond(request, body=self.PAGE)) as server:
+            events = self.events(server.url('/page'), lambda request: respond(request, status=500))
+        self.assertEqual([event for event, _ in events], ['title', 'summary', 'company_details', 'llm_error', 'done'])
+        self.assertIn('Error during summarization', events[3][1]['error'])
+
+    def test_an_unreachable_page_sends_a_single_error_event(self):
+        with StubServer(lambda request: respond(request, status=404)) as server:
+            events = self.events(server.url('/missing'))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][0], 'error')
+        self.assertIn('404', events[0][1]['error'])
+
+    def test_url_is_required(self):
+        self.assertEqual(self.client.get(reverse('scrape_stream')).status_code, 400)
+
+
+class JobTests(TestCase):
+    def test_submit_returns_the_active_job_for_a_url(self):
+        job, created = submit('http://example.com/')
+        self.assertTrue(created)
+        self.assertEqual(submit('http://example.com/'), (job, False))
+        ScrapeJob.objects.filter(pk=job.pk).update(status=ScrapeJob.DONE)
+        self.assertTrue(submit('http://example.com/')[1])
+
+    def test_one_active_job_per_url(self):
+        ScrapeJob.objects.create(url='http://example.com/')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ScrapeJob.objects.create(url='http://example.com/')
+        ScrapeJob.objects.create(url='http://example.com/', status=ScrapeJob.DONE)
+
+    def test_losing_a_submit_race_returns_the_winners_job(self):
+        winner = ScrapeJob.objects.create(url='http://example.com/')
+        real_first = QuerySet.first
+        lookups = []
+
+        def first_misses_once(queryset):
+            # Our first lookup runs before the winner's insert, so it finds nothing
+            lookups.append(queryset)
+            return None if len(lookups) == 1 else real_first(queryset)
+
+        with mock.patch.object(QuerySet, 'first', first_misses_once):
+            job, created = submit('http://example.com/')
+        self.assertEqual((job, created), (winner, False))
+        self.assertEqual(ScrapeJob.objects.count(), 1)
+
+    def test_status_poll_starts_the_workers(self):
+        job = ScrapeJob.objects.create(url='http://example.com/')
+        with mock.patch.object(JobWorkers, 'start') as start:
+            response = self.client.get(reverse('scrape_job', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        start.assert_called_once()
+
+
+class MapReduceSummarizerTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def summarizer(self, server, **kwargs):
+        return MapReduceSummarizer(client=openai_client(server), cache=ResponseCache(self.cache_dir.name), **kwargs)
+
+    def test_short_text_is_summarized_in_one_request(self):
+        with StubServer(openai_stub(lambda prompt: 'Short summary.')) as server:
+            self.assertEqual(self.summarizer(server).summarize('Acme makes rockets.'), 'Short summary.')
+        self.assertEqual(len(server.server.prompts), 1)
+
+    def test_long_text_is_mapped_then_reduced_and_cached_on_disk(self):
+        text = '\n'.join(f'Paragraph {i} about Acme rockets, offices and customers.' for i in range(40))
+
+        def answer(prompt):
+            return 'Final summary.' if prompt.startswith('The following') else f'Part summary {len(prompt)}.'
+
+        with StubServer(openai_stub(answer)) as server:
+            self.assertEqual(self.summarizer(server, chunk_tokens=100).summarize(text), 'Final summary.')
+            prompts = server.server.prompts
+            map_prompts = [prompt for prompt in prompts if 'This is part' in prompt]
+            self.assertGreater(len(map_prompts), 1)
+            self.assertEqual(len(prompts), len(map_prompts) + 1)
+            self.assertTrue(all(f'of {len(map_prompts)} of the contents' in prompt for prompt in map_prompts))
+
+            # Same page again, with a fresh summarizer over the same cache directory: no requests
+            self.assertEqual(self.summarizer(server, chunk_tokens=100).summarize(text), 'Final summary.')
+            self.assertEqual(server.server.prompts, [])
+
+    def test_reduce_rounds_are_bounded_when_summaries_do_not_shrink(self):
+        # A model that repeats its input never gets the partial summaries under budget
+        with StubServer(openai_stub(lambda prompt: prompt.split('\n\n', 2)[-1])) as server:
+            summarizer = self.summarizer(server, chunk_tokens=50, max_reduce_rounds=2)
+            text = '\n'.join(f'Line {i} of the page about Acme and its many products.' for i in range(60))
+            summarizer.summarize(text, instructions='Summarize.')
+            prompts = server.server.prompts
+        final = prompts[-1]
+        self.assertTrue(final.startswith('The following are summaries'))
+        self.assertLessEqual(count_tokens(final.split('\n\n', 1)[1]), 50)
+
+
+class TranslatorTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        self.requests = []
+
+    def translator(self, backend=None, **kwargs):
+        from translation import TranslationCache, Translator
+
+        def upper(text):
+            self.requests.append(text)
+            return text.upper()
+
+        return Translator(backend=backend or upper, cache=TranslationCache(self.cache_dir), max_workers=2,
+                          base_delay=0, **kwargs)
+
+    def test_paragraphs_are_batched_and_then_served_from_the_cache(self):
+        paragraphs = ['hola mundo', 'bonjour', '', 'hola mundo', 'guten tag']
+        self.assertEqual(self.translator().translate_many(paragraphs),
+                         ['HOLA MUNDO', 'BONJOUR', '', 'HOLA MUNDO', 'GUTEN TAG'])
+        self.assertEqual(self.requests, ['hola mundo\nbonjour\nguten tag'])
+
+        # A new translator over the same cache directory sends only the unseen paragraph
+        self.requests.clear()
+        self.assertEqual(self.translator().translate_many(['bonjour', 'ciao', 'guten tag']),
+                         ['BONJOUR', 'CIAO', 'GUTEN TAG'])
+        self.assertEqual(self.requests, ['ciao'])
+
+    def test_batches_respect_max_chars(self):
+        self.translator(max_chars=12).translate_many(['aaaa', 'bbbb', 'cccc', 'dddd'])
+        self.assertCountEqual(self.requests, ['aaaa\nbbbb', 'cccc\ndddd'])  # Sent concurrently
+
+    def test_merged_lines_fall_back_to_one_request_per_paragraph(self):
+        def merging(text):
+            self.requests.append(text)
+            return text.replace('\n', ' ').upper()
+
+        self.assertEqual(self.translator(merging).translate_many(['uno', 'dos']), ['UNO', 'DOS'])
+        self.assertEqual(self.requests, ['uno\ndos', 'uno', 'dos'])
+
+
+def mediawiki_stub(pages, redirects):
+    """StubServer handler for the MediaWiki query API over pages {title: {...}}: normalizes the
+    first letter of titles, follows redirects {from: to} and answers prop=links from 'links'."""
+    def handle(request):
+        query = {key: values[0] for key, values in parse_qs(urlsplit(request.path).query).items()}
+        normalized, redirected, results = [], [], []
+        for title in query['titles'].split('|'):
+            name = title[0].upper() + title[1:]
+            if name != title:
+                normalized.append({'from': title, 'to': name})
+            if name in redirects:
+                redirected.append({'from': name, 'to': redirects[name]})
+                name = redirects[name]
+            page = pages.get(name)
+            if page is None:
+                results.append({'title': name, 'missing': True})
+                continue
+            result = {'title': name, 'fullurl': 'https://en.wikipedia.org/wiki/' + name.replace(' ', '_')}
+            if query['prop'] == 'links':
+                result['links'] = [{'ns': 0, 'title': link} for link in page.get('links', [])]
+            else:
+                if 'links' in page:
+                    result['pageprops'] = {'disambiguation': ''}
+                result['extract'] = page.get('extract', '')
+                result['revisions'] = [{'slots': {'main': {'content': page.get('wikitext', '')}}}]
+            results.append(result)
+        body = {'batchcomplete': True, 'query': {'normalized': normalized, 'redirects': redirected, 'pages': results}}
+        respond(request, body=json.dumps(body).encode(), content_type='application/json')
+    return handle
+
+
+class CrawlStateTests(TestCase):
+    def test_a_reopened_state_resumes_the_crawl(self):
+        from crawl_state import CrawlState
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'crawl.sqlite3')
+            state = CrawlState(path)
+            state.add('https://acme.test/about', depth=0)
+            state.add('https://acme.test/about/team', depth=1, site='https://acme.test/about')
+            state.claim()
+            state.close()  # Crashed with the start page claimed
+
+            state = CrawlState(path)
+            self.assertTrue(state.seen('https://ACME.test//about/'))
+            self.assertFalse(state.add('https://acme.test/about', depth=0))
+            self.assertEqual(state.claim(limit=2), [('https://acme.test/about/team', 1, 'https://acme.test/about')])
+            state.release_claims()
+            self.assertEqual([url for url, _, _ in state.claim(limit=2)],
+                             ['https://acme.test/about', 'https://acme.test/about/team'])
+            state.close()
+
+    def test_bloom_filter_hits_are_checked_against_the_database(self):
+        from crawl_state import CrawlState
+
+        state = CrawlState(bloom_capacity=1)
+        for n in range(50):
+            state.add(f'https://acme.test/about/{n}', depth=1)
+        # The tiny filter is saturated, so an unseen URL passes it and only the exact lookup can tell
+        self.assertIn('https://acme.test/careers', state._bloom)
+        self.assertFalse(state.seen('https://acme.test/careers'))
+        self.assertTrue(state.seen('https://acme.test/about/7'))
+
+    def test_has_unfinished_follows_claims_per_site(self):
+        from crawl_state import CrawlState
+
+        state = CrawlState()
+        state.add('https://acme.test/about', depth=0)
+        state.add('https://other.test/about', depth=0)
+        self.assertTrue(state.has_unfinished('https://acme.test/about'))
+        state.claim(site='https://acme.test/about')
+        self.assertTrue(state.has_unfinished('https://acme.test/about'))
+        state.complete('https://acme.test/about')
+        self.assertFalse(state.has_unfinished('https://acme.test/about'))
+        self.assertTrue(state.has_unfinished())
+        state.claim()
+        state.fail('https://other.test/about', 'boom')
+        self.assertFalse(state.has_unfinished())
+        self.assertEqual(state.counts(), {'done': 1, 'failed': 1})
+
+
+class DuplicateIndexTests(TestCase):
+    PAGE = ('Acme Corporation was founded in 1949 in the Arizona desert. Today it builds anvils, rockets, '
+            'giant magnets and portable holes for customers across the world. Our team of engineers tests '
+            'every product on roadrunners before it ships. We believe in quality, safety and fast delivery '
+            'by mail order. Contact our sales office for a catalogue of our products and services.')
+
+    def test_exact_and_near_duplicates_point_at_the_first_page(self):
+        from fingerprint import DuplicateIndex, simhash
+
+        index = DuplicateIndex()
+        self.assertIsNone(index.check('https://acme.test/about', self.PAGE))
+        self.assertEqual(index.check('https://acme.test/about?ref=nav', self.PAGE), 'https://acme.test/about')
+        self.assertEqual(index.check('https://acme.test/about-us', self.PAGE + ' Follow us.'),
+                         'https://acme.test/about')
+        self.assertIsNone(index.check('https://acme.test/garden', 'Gardening tools and tomato plants in spring.'))
+        self.assertEqual(index.find(simhash(self.PAGE)), 'https://acme.test/about')
+
+    def test_fingerprints_within_max_distance_share_a_band(self):
+        from fingerprint import DuplicateIndex
+
+        index = DuplicateIndex(max_distance=3)  # Four 16-bit bands
+        fingerprint = 0x0123456789abcdef
+        with mock.patch('fingerprint.simhash', return_value=fingerprint):
+            index.check('https://acme.test/about', '')
+        # Three flipped bits, each in a different band, leave the fourth band intact
+        self.assertEqual(index.find(fingerprint ^ (1 | 1 << 16 | 1 << 32)), 'https://acme.test/about')
+        self.assertEqual(index.find(fingerprint ^ (1 << 63 | 1 << 62 | 1 << 61)), 'https://acme.test/about')
+        # A fourth flipped bit is one too many, even though the last band still matches
+        self.assertIsNone(index.find(fingerprint ^ (1 | 1 << 16 | 1 << 32 | 1 << 33)))
+        self.assertIsNone(index.find(fingerprint ^ (1 | 1 << 16 | 1 << 32 | 1 << 48)))
+
+
+class LanguageDetectionTests(TestCase):
+    def test_stopwords_tell_latin_script_languages_apart(self):
+        from language_detection import detect_language
+
+        self.assertEqual(detect_language('We are a company that builds software for our customers.'), 'en')
+        self.assertEqual(detect_language('Wij zijn een bedrijf dat software maakt voor onze klanten.'), 'nl')
+        self.assertEqual(detect_language('Nous sommes une entreprise qui fabrique des logiciels pour nos clients.'), 'fr')
+        self.assertEqual(detect_language('Wir sind ein Unternehmen, das Software f\u00fcr unsere Kunden entwickelt.'), 'de')
+
+    def test_too_few_or_tied_hits_are_undetermined(self):
+        from language_detection import UNDETERMINED, detect_language
+
+        for text in ('', '   ', 'Acme', 'Contact Careers Blog', 'the'):
+            self.assertEqual(detect_language(text), UNDETERMINED, text)
+        self.assertEqual(detect_language('the', min_hits=1), 'en')
+        # 'de' and 'la' are function words of French, Spanish and Italian alike
+        self.assertEqual(detect_language('de la'), UNDETERMINED)
+
+    def test_scripts_and_mixed_text(self):
+        from language_detection import detect_language
+
+        self.assertEqual(detect_language('\u041f\u0440\u0438\u0432\u0435\u0442, \u043c\u044b \u043a\u043e\u043c\u043f\u0430\u043d\u0438\u044f'), 'ru')
+        self.assertEqual(detect_language('\u65e5\u672c\u306e\u4f1a\u793e\u3067\u3059'), 'ja')  # Kanji with kana
+        self.assertEqual(detect_language('\u516c\u53f8\u7b80\u4ecb'), 'zh')
+        # A few foreign words do not outvote the language most of the text is in
+        self.assertEqual(detect_language('Our products are sold in Russia as \u041f\u0440\u043e\u0434\u0443\u043a\u0442 '
+                                         'and we ship them from the port'), 'en')
+        self.assertEqual(detect_language('Welcome! Wij zijn een bedrijf en we maken de beste software van het land.'), 'nl')
+
+    def test_needs_translation_unless_confidently_in_the_target(self):
+        from language_detection import needs_translation
+
+        self.assertFalse(needs_translation('The company and the team behind it'))
+        self.assertTrue(needs_translation('Acme'))  # Undetermined text is translated to be safe
+        self.assertFalse(needs_translation('Acme', language='en'))
+        self.assertFalse(needs_translation('Wij zijn een bedrijf', target='nl'))
+
+
+class PageRecordsTests(TestCase):
+    RECORDS = [
+        {'url': 'https://acme.test/about', 'page_content': 'Caf\u00e9 Acme', 'summarized_content': ['Acme.'],
+         'language': 'fr', 'extra_field': {'nested': 1}},
+        {'url': 'https://acme.test/broken', 'error': 'Page load failed after retries'},
+    ]
+
+    def round_trip(self, name):
+        from page_records import open_writer, read_records
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, name)
+            with open_writer(path) as writer:
+                for record in self.RECORDS:
+                    writer.write(record)
+            return list(read_records(path))
+
+    def test_jsonl_round_trip(self):
+        self.assertEqual(self.round_trip('pages.jsonl'), self.RECORDS)
+        self.assertEqual(self.round_trip('pages.jsonl.gz'), self.RECORDS)
+
+    def test_a_resumed_file_skips_the_record_cut_off_by_a_crash(self):
+        from page_records import open_writer, read_records
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pages.jsonl')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.RECORDS[0]) + '\n{"url": "https://acme.te')
+            with open_writer(path) as writer:
+                writer.write(self.RECORDS[1])
+            with self.assertLogs(level='WARNING'):
+                self.assertEqual(list(read_records(path)), self.RECORDS)
+
+    @skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_parquet_round_trip(self):
+        self.assertEqual(self.round_trip('pages.parquet'), self.RECORDS)
+
+
+class AsyncCrawlerTests(TestCase):
+    def test_workers_wait_for_links_still_being_discovered(self):
+        import asyncio
+        from async_crawler import AsyncCrawler
+
+        # Only the start page is claimable at first; the others come in as it is visited
+        graph = {
+            'https://acme.test/about': ['https://acme.test/about/team', 'https://acme.test/about/history'],
+            'https://acme.test/about/team': ['https://acme.test/about/team/board'],
+        }
+
+        async def visit(url):
+            await asyncio.sleep(0.05)
+            return {'url': url}, graph.get(url, [])
+
+        async def crawl():
+            async with AsyncCrawler(concurrency=3, max_depth=2, scheduler=PolitenessScheduler(respect_robots=False)) as crawler:
+                crawler._visit = visit
+                return await crawler.crawl('https://acme.test/about'), crawler.state.counts()
+
+        results, counts = asyncio.run(crawl())
+        self.assertCountEqual([info['url'] for info in results], [
+            'https://acme.test/about', 'https://acme.test/about/team', 'https://acme.test/about/history',
+            'https://acme.test/about/team/board'])
+        self.assertEqual(counts, {'done': 4})
+
+
+class WikipediaBatchLookupTests(TestCase):
+    PAGES = {
+        'Cognizant': {'extract': 'Cognizant is an American IT services company.',
+                      'wikitext': '{{Infobox company\n| name = Cognizant\n| industry = [[IT services]]\n}}\nText.'},
+        'TCS': {'links': ['TCS (band)', 'Tata Consultancy Services', 'Transmission control system']},
+        'Tata Consultancy Services': {'extract': 'Tata Consultancy Services is an Indian IT company.',
+                                      'wikitext': '{{Infobox company\n| name = TCS\n| founded = 1968\n}}\nText.'},
+        'TCS (band)': {'extract': 'A band.', 'wikitext': 'A band.'},
+    }
+    REDIRECTS = {'Cognizant Technology Solutions': 'Cognizant'}
+
+    def test_batch_lookup_follows_normalization_redirects_and_disambiguation(self):
+        # webscraping.py sits at the root of the repository, outside this Django project
+        root = os.path.dirname(settings.BASE_DIR)
+        with tempfile.TemporaryDirectory() as directory, \
+                StubServer(mediawiki_stub(self.PAGES, self.REDIRECTS)) as server:
+            names = os.path.join(directory, 'names.txt')
+            output = os.path.join(directory, 'companies.json')
+            with open(names, 'w', encoding='utf-8') as f:
+                f.write('# companies\ncognizant Technology Solutions\nTCS\n\nNo Such Company\nTCS\n')
+            subprocess.run([sys.executable, 'webscraping.py', '--batch', names, '--output', output], cwd=root,
+                           env=dict(os.environ, WIKIPEDIA_API_URL=server.url('/w/api.php')),
+                           check=True, capture_output=True, timeout=60)
+            with open(output, encoding='utf-8') as f:
+                records = {record['query']: record for record in json.load(f)}
+
+        self.assertEqual(list(records), ['cognizant Technology Solutions', 'TCS', 'No Such Company'])
+        cognizant = records['cognizant Technology Solutions']
+        self.assertEqual((cognizant['status'], cognizant['title']), ('found', 'Cognizant'))
+        self.assertEqual(cognizant['infobox']['Industry'], 'IT services')
+        tcs = records['TCS']
+        self.assertEqual((tcs['status'], tcs['title'], tcs['resolved_from']), ('found', 'Tata Consultancy Services', 'TCS'))
+        self.assertEqual(records['No Such Company']['status'], 'missing')
+        # One request for the names, one for the disambiguation links, one for the candidates
+        self.assertEqual(len(server.requests), 3)
+
+
+class WikipediaDumpIndexTests(TestCase):
+    DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/" xml:lang="en">
+  <siteinfo><sitename>Wikipedia</sitename></siteinfo>
+  <page><title>Acme Corporation</title><ns>0</ns><id>1</id>
+    <revision><id>11</id><text xml:space="preserve">{{Infobox company
+| name = Acme Corporation
+| industry = [[Manufacturing]]
+| founded = 1949
+}}
+'''Acme Corporation''' is a fictional maker of anvils and rockets. It sells by mail order.</text></revision></page>
+  <page><title>Acme Corp</title><ns>0</ns><id>2</id><redirect title="Acme Corporation" />
+    <revision><id>12</id><text xml:space="preserve">#REDIRECT [[Acme Corporation]]</text></revision></page>
+  <page><title>Anvil</title><ns>0</ns><id>3</id>
+    <revision><id>13</id><text xml:space="preserve">An '''anvil''' is a metalworking tool.</text></revision></page>
+  <page><title>Anvils</title><ns>0</ns><id>4</id><redirect title="Anvil" />
+    <revision><id>14</id><text xml:space="preserve">#REDIRECT [[Anvil]]</text></revision></page>
+  <page><title>Talk:Acme Corporation</title><ns>1</ns><id>5</id>
+    <revision><id>15</id><text xml:space="preserve">{{Infobox company | name = Not an article }}</text></revision></page>
+</mediawiki>
+"""
+
+    def test_offline_lookups_from_an_index_built_from_a_dump(self):
+        # webscraping.py and wikipedia_dump.py sit at the root of the repository, outside this Django project
+        root = os.path.dirname(settings.BASE_DIR)
+        with tempfile.TemporaryDirectory() as directory:
+            dump = os.path.join(directory, 'pages-articles.xml.bz2')
+            index = os.path.join(directory, 'companies.db')
+            names = os.path.join(directory, 'names.txt')
+            output = os.path.join(directory, 'companies.json')
+            with bz2.open(dump, 'wt', encoding='utf-8') as f:
+                f.write(self.DUMP)
+            with open(names, 'w', encoding='utf-8') as f:
+                f.write('acme corporation\nAcme Corp\nAnvils\nTalk:Acme Corporation\n')
+            built = subprocess.run([sys.executable, 'webscraping.py', '--build-index', dump, '--index', index,
+                                    '--workers', '2'], cwd=root, check=True, capture_output=True, text=True, timeout=60)
+            self.assertIn('Indexed 1 companies', built.stdout)
+            subprocess.run([sys.executable, 'webscraping.py', '--batch', names, '--offline', '--index', index,
+                            '--output', output], cwd=root, check=True, capture_output=True, timeout=60)
+            with open(output, encoding='utf-8') as f:
+                records = {record['query']: record for record in json.load(f)}
+
+        acme = records['acme corporation']
+        self.assertEqual((acme['status'], acme['title']), ('found', 'Acme Corporation'))
+        self.assertEqual(acme['url'], 'https://en.wikipedia.org/wiki/Acme_Corporation')
+        self.assertEqual(acme['infobox']['Industry'], 'Manufacturing')
+        self.assertIn('maker of anvils and rockets', acme['summary'])
+        self.assertEqual(records['Acme Corp']['title'], 'Acme Corporation')  # Through the redirect
+        # Neither a redirect to a non-company page nor another namespace makes it into the index
+        self.assertEqual(records['Anvils']['status'], 'missing')
+        self.assertEqual(records['Talk:Acme Corporation']['status'], 'missing')
+
+
+class BenchmarkTests(TestCase):
+    STAGES = ['website', 'website_stream', 'company_details', 'summarize_text']
+
+    def test_run_measures_every_stage_on_every_fixture(self):
+        results = run_benchmark(generated_fixtures({'tiny': 5000, 'small': 20000}), self.STAGES, repeat=2, warmup=0)
+        self.assertEqual(results['errors'], {})
+        self.assertEqual(list(results['results']), self.STAGES)
+        for fixtures in results['results'].values():
+            self.assertEqual(list(fixtures), ['tiny', 'small'])
+            for measurement in fixtures.values():
+                self.assertEqual(measurement['runs'], 2)
+                self.assertGreater(measurement['p50_ms'], 0)
+                self.assertLessEqual(measurement['p50_ms'], measurement['max_ms'])
+        # Compared with itself nothing has regressed
+        self.assertFalse(any(row[-1] for row in compare(results, results)))
+
+    def test_command_saves_a_baseline_and_compares_against_it(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'home.html'), 'wb') as f:
+                f.write(build_fixture(10000))
+            baseline = os.path.join(directory, 'baseline.json')
+            options = {'fixtures': directory, 'stages': 'website,summarize_text', 'repeat': 1, 'warmup': 0,
+                       'baseline': baseline, 'stdout': StringIO(), 'stderr': StringIO()}
+            call_command('benchmark', save_baseline=True, **options)
+            self.assertTrue(os.path.exists(baseline))
+
+            out = StringIO()
+            call_command('benchmark', **dict(options, stdout=out, tolerance=100))
+        self.assertIn('home', out.getvalue())
+        self.assertIn('No regressions', out.getvalue())
+
+
+class PartialParseTests(TestCase):
+    def text(self, markup, partial=True):
+        return parse_html(markup, partial=partial).get_text('|', strip=True)
+
+    def test_unwanted_tags_are_left_out(self):
+        markup = b'<p>Hi</p><script>var a = 1;</script><STYLE>p{}</STYLE ><img src="x"><p>Bye</p>'
+        self.assertEqual(self.text(markup), 'Hi|Bye')
+        self.assertEqual(self.text(markup, partial=False), 'Hi|Bye')
+
+    def test_only_real_tags_are_cut_out(self):
+        self.assertEqual(self.text(b'<p>A</p><style-guide>Guide</style-guide><p>B</p>'), 'A|Guide|B')
+        self.assertEqual(self.text(b'<p>A</p><!-- <script> old --><p>Important</p>'), 'A|Important')
+        self.assertEqual(self.text(b'<p>A</p><!-- <script> old --><p>Important</p><script>x()</script>'),
+                         'A|Important')
+        self.assertEqual(self.text(b'<p>A</p><textarea>Type <script> here</textarea><p>Important</p>'),
+                         'A|Type <script> here|Important')
+
+    def test_blocks_cut_off_by_the_byte_cap_are_left_out(self):
+        self.assertEqual(self.text(b'<p>Hi</p><script>var html = "<p>secret</p>";'), 'Hi')
+        self.assertEqual(self.text(b'<p>Hi</p><style>p { color: red }'), 'Hi')
+        self.assertEqual(self.text(b'<p>Hi</p><script type="text/java'), 'Hi')
+        self.assertEqual(self.text('<p>Caf\u00e9</p><script>1'), 'Caf\u00e9')
@@ -3,4 +3,8 @@ from . import views
 
 urlpatterns = [
     path('scrape/', views.scrape_website, name='scrape_website'),
+    path('scrape/batch/', views.scrape_batch, name='scrape_batch'),
+    path('scrape/stream/', views.scrape_stream, name='scrape_stream'),
+    path('scrape/jobs/', views.scrape_jobs, name='scrape_jobs'),
+    path('scrape/jobs/<int:job_id>/', views.scrape_job, name='scrape_job'),
 ]
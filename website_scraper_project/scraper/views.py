@@ -1,24 +1,250 @@
-from django.http import JsonResponse
-from .website_scraper import Website, summarize_text
+import json
+from functools import lru_cache, partial
 
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 
+from .batch import run_concurrently
+from .fetch_cache import FetchCache
+from .jobs import JobWorkers, submit
+from .llm import MapReduceSummarizer, llm_available
+from .metrics import CONTENT_TYPE, REGISTRY, instrumented
+from .pipeline import scrape_url, scrape_url_events
+from .politeness import PolitenessScheduler, RobotsCache
+from .models import ScrapeJob
+from .summarization import Corpus
+
+
+@instrumented
 def scrape_website(request):
     url = request.GET.get('url')
 
     if not url:
         return JsonResponse({'error': 'URL parameter is required'}, status=400)
 
-    website = Website(url)
+    result, error = scrape_url(url, **_scrape_options(request))
+
+    if error:
+        return JsonResponse({'error': error}, status=400)
+
+    return JsonResponse(result)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+@instrumented
+def scrape_batch(request):
+    """Scrape many URLs concurrently, streaming one JSON line per URL as each one finishes.
+
+    Accepts repeated ``url`` query parameters or a JSON body of the form {"urls": [...]}.
+    """
+    urls = request.GET.getlist('url')
+    if request.method == 'POST':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Request body must be valid JSON'}, status=400)
+        urls = payload.get('urls', []) if isinstance(payload, dict) else []
+
+    urls = [url for url in urls if isinstance(url, str) and url.strip()]
+    if not urls:
+        return JsonResponse({'error': 'At least one URL is required'}, status=400)
+
+    max_urls = getattr(settings, 'SCRAPER_BATCH_MAX_URLS', 500)
+    if len(urls) > max_urls:
+        return JsonResponse({'error': f'At most {max_urls} URLs are allowed per batch'}, status=400)
+
+    def results():
+        for url, outcome, exc in run_concurrently(
+            urls,
+            partial(scrape_url, **_scrape_options(request)),
+            max_workers=getattr(settings, 'SCRAPER_BATCH_MAX_WORKERS', 16),
+            per_host=getattr(settings, 'SCRAPER_BATCH_PER_HOST', 2),
+            scheduler=_politeness_scheduler(),
+        ):
+            if exc is not None:
+                line = {'url': url, 'error': f"Error scraping {url}: {exc}"}
+            else:
+                result, error = outcome
+                line = {'url': url, 'error': error} if error else dict(result, url=url)
+            yield json.dumps(line) + '\n'
+
+    return StreamingHttpResponse(results(), content_type='application/x-ndjson')
+
+
+@instrumented
+def scrape_stream(request):
+    """Stream the scrape of one URL as server-sent events, one event per finished stage.
+
+    The title arrives as soon as the page is fetched, followed by the extractive summary,
+    the company details and, when an OpenAI key is configured, the LLM summary token by token.
+    """
+    url = request.GET.get('url')
+
+    if not url:
+        return JsonResponse({'error': 'URL parameter is required'}, status=400)
+
+    def events():
+        for event, data in scrape_url_events(url, llm=_llm_summarizer(), **_scrape_options(request)):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+@instrumented
+def scrape_jobs(request):
+    """Queue scrapes to run in the background worker pool; poll the returned status_url for the result.
+
+    Accepts a ``url`` parameter or a JSON body of the form {"url": ...} or {"urls": [...]}.
+    A URL that is already queued or running returns the existing job instead of a new one.
+    """
+    urls = request.GET.getlist('url')
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Request body must be valid JSON'}, status=400)
+        if isinstance(payload, dict):
+            urls = payload.get('urls') or [payload.get('url')]
+    else:
+        urls = request.POST.getlist('url') or urls
+
+    urls = [url for url in urls if isinstance(url, str) and url.strip()]
+    if not urls:
+        return JsonResponse({'error': 'URL parameter is required'}, status=400)
+
+    max_urls = getattr(settings, 'SCRAPER_BATCH_MAX_URLS', 500)
+    if len(urls) > max_urls:
+        return JsonResponse({'error': f'At most {max_urls} URLs are allowed per request'}, status=400)
+
+    jobs = [_job_data(submit(url)[0]) for url in urls]
+    _job_workers().notify()
+
+    if len(jobs) == 1:
+        return JsonResponse(jobs[0], status=202)
+    return JsonResponse({'jobs': jobs}, status=202)
+
+
+@instrumented
+def scrape_job(request, job_id):
+    """Return the status of a queued scrape, and its result once it is done."""
+    # Workers otherwise only start on a POST: after a restart, jobs left queued (and leases
+    # to requeue) are picked up as soon as a client polls for them
+    _job_workers().start()
+    job = ScrapeJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    return JsonResponse(_job_data(job, with_result=True))
+
+
+def metrics(request):
+    """Expose this process's scrape metrics (stage timings, bytes, cache hits) to Prometheus."""
+    if not getattr(settings, 'SCRAPER_METRICS', True):
+        raise Http404
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+def _job_data(job, with_result=False):
+    data = {
+        'id': job.pk,
+        'url': job.url,
+        'status': job.status,
+        'status_url': reverse('scrape_job', args=[job.pk]),
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if with_result:
+        data['result'] = job.result
+        data['error'] = job.error or None
+    return data
+
+
+@lru_cache(maxsize=None)
+def _job_workers():
+    """Return this process's scrape job worker pool (its threads start with the first job)."""
+    return JobWorkers(lambda url: scrape_url(url, **_scrape_options()))
+
+
+def _scrape_options(request=None):
+    """Return the scrape_url keyword arguments configured in settings.
+
+    The per-URL deadline is SCRAPER_DEADLINE seconds, or a shorter ``deadline`` request parameter.
+    """
+    return {
+        'deadline': _deadline_seconds(request),
+        'cache': _fetch_cache(),
+        'corpus': _summary_corpus(),
+        'parser': getattr(settings, 'SCRAPER_HTML_PARSER', None),
+        'partial_parse': getattr(settings, 'SCRAPER_PARTIAL_PARSE', True),
+        'stream': getattr(settings, 'SCRAPER_STREAM_FETCH', True),
+        'max_bytes': getattr(settings, 'SCRAPER_MAX_BODY_BYTES', None),
+        'content_types': getattr(settings, 'SCRAPER_ALLOWED_CONTENT_TYPES', None),
+        'scheduler': _politeness_scheduler(),
+    }
+
+
+def _deadline_seconds(request=None):
+    """Seconds each scrape may take: SCRAPER_DEADLINE, lowered by a ``deadline`` query parameter."""
+    limit = getattr(settings, 'SCRAPER_DEADLINE', None)
+    try:
+        requested = float(request.GET['deadline']) if request is not None else None
+    except (KeyError, ValueError):
+        requested = None
+    if requested is None or requested <= 0:
+        return limit
+    return min(requested, limit) if limit else requested
+
+
+def _fetch_cache():
+    """Return the conditional-request cache, or None when it is disabled in settings."""
+    if getattr(settings, 'SCRAPER_FETCH_CACHE_ENABLED', True):
+        return FetchCache()
+    return None
+
+
+@lru_cache(maxsize=None)
+def _politeness_scheduler():
+    """Return the process-wide per-host rate limiter, or None when politeness is disabled in settings."""
+    if not getattr(settings, 'SCRAPER_POLITENESS', True):
+        return None
+    robots = None
+    if getattr(settings, 'SCRAPER_RESPECT_ROBOTS', True):
+        robots = RobotsCache(
+            user_agent=getattr(settings, 'SCRAPER_ROBOTS_USER_AGENT', '*'),
+            ttl=getattr(settings, 'SCRAPER_ROBOTS_TTL', 24 * 3600),
+        )
+    return PolitenessScheduler(
+        rate=getattr(settings, 'SCRAPER_HOST_RATE', 1.0),
+        burst=getattr(settings, 'SCRAPER_HOST_BURST', 2),
+        respect_robots=robots is not None,
+        robots=robots,
+    )
+
 
-    if website.error:
-        return JsonResponse({'error': website.error}, status=400)
+@lru_cache(maxsize=None)
+def _summary_corpus():
+    """Load the TF-IDF corpus named in settings once per process, or None to rank by raw frequency."""
+    path = getattr(settings, 'SCRAPER_SUMMARY_CORPUS', None)
+    if path:
+        try:
+            return Corpus.load(path)
+        except FileNotFoundError:
+            return None
+    return None
 
-    # Scrape the website and summarize its content
-    summary = summarize_text(website.get_text())
-    company_details = website.get_company_details()
 
-    return JsonResponse({
-        'title': website.get_title(),
-        'summary': summary,
-        'company_details': company_details
-    })
+@lru_cache(maxsize=None)
+def _llm_summarizer():
+    """Return the LLM summarizer, or None when disabled in settings or no OpenAI key/package is available."""
+    if getattr(settings, 'SCRAPER_LLM_SUMMARY', True) and llm_available():
+        return MapReduceSummarizer(model=getattr(settings, 'SCRAPER_LLM_MODEL', 'gpt-4o-mini'))
+    return None
@@ -1,45 +1,131 @@
 import requests
-from bs4 import BeautifulSoup
-from collections import Counter
+
+from .deadline import Deadline, DeadlineExceeded
+from .http_client import fetch
+from .keyword_index import build_keyword_index
+from .metrics import CACHE_LOOKUPS, FETCHED_BYTES, PAGE_BYTES, timed
+from .parsing import parse_html
+from .politeness import PAUSE_STATUSES
+from .readability import extract_main_content
+from .summarization import SummaryEngine
+from .streaming import (DEFAULT_CONTENT_TYPES, DEFAULT_MAX_BYTES, StreamingTextExtractor,
+                        check_content_type, read_streamed)
 
 
 class Website:
-    def __init__(self, url):
-        """Create a Website object that extracts basic info (title and content) using BeautifulSoup."""
+    def __init__(self, url, session=None, timeout=None, cache=None, parser=None, partial_parse=True,
+                 stream=False, max_bytes=None, content_types=None, deadline=None, scheduler=None, text_only=False):
+        """Create a Website object that extracts basic info (title and content) using BeautifulSoup.
+
+        The page is fetched through the shared pooled HTTP session (see http_client) unless
+        a session is injected; timeout defaults to http_client.DEFAULT_TIMEOUT. When a cache
+        (see fetch_cache.FetchCache) is given, a stored copy is revalidated with a conditional
+        request and reused on 304 Not Modified. parser selects the BeautifulSoup backend
+        (parsing.DEFAULT_PARSER by default); with partial_parse, script/style/img/input markup
+        is dropped before parsing instead of being decomposed afterwards.
+
+        With stream, the body is read in chunks and cut at max_bytes (truncated is then True),
+        and non-allowlisted content types are rejected. Adding text_only, for callers that need
+        no more than the title, text and links, extracts those while the download runs and never
+        builds the BeautifulSoup tree unless asked for it; without it the page is parsed once.
+
+        deadline (a deadline.Deadline or seconds) bounds the whole fetch, including a slow body;
+        running out of it is reported like any other fetch error. A politeness.PolitenessScheduler
+        delays the request until the host's rate limit allows it and refuses URLs robots.txt
+        excludes.
+
+        Each stage (fetch, parse, text, main_text, sections, ...) is timed into metrics.
+        """
         self.url = url
         self.title = None
         self.text = None
         self.error = None
-        self.soup = None
-
-        # Define headers to mimic a real browser for requests
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/113.0.0.0 Safari/537.36"
-            )
-        }
+        self.from_cache = False
+        self.truncated = False
+        self._links = None
+        self._main_text = None
+        self._soup = None
+        self._content = None
+        self._parser = parser
+        self._partial_parse = partial_parse
+        self._keyword_nodes = {}
+        self.deadline = Deadline.of(deadline)
+        self.scheduler = scheduler
 
         # Try to fetch the webpage content and parse it
         try:
-            response = requests.get(self.url, headers=self.headers)
-            response.raise_for_status()  # Will raise an exception for HTTP errors
-            self.soup = BeautifulSoup(response.content, 'html.parser')
+            if stream:
+                extractor = StreamingTextExtractor() if text_only else None
+                with timed('fetch'):
+                    self._content = self._fetch_content(session, timeout, cache, streaming=True, extractor=extractor,
+                                                        max_bytes=max_bytes, content_types=content_types)
+                if extractor is not None and not self.from_cache:
+                    self.title = extractor.title if extractor.title is not None else "No title found"
+                    self.text = extractor.text
+                    self._links = extractor.links
+                    return
+            else:
+                with timed('fetch'):
+                    self._content = self._fetch_content(session, timeout, cache)
 
             # Extract the title of the webpage
             self.title = self.soup.title.string if self.soup.title else "No title found"
 
-            # Remove irrelevant tags (scripts, styles, images, inputs, etc.)
-            for irrelevant in self.soup.find_all(["script", "style", "img", "input"]):
-                irrelevant.decompose()
-
             # Get the remaining text content from the page
-            self.text = self.soup.get_text(separator="\n", strip=True)
+            soup = self.soup
+            with timed('text'):
+                self.text = soup.get_text(separator="\n", strip=True)
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, DeadlineExceeded) as e:
             self.error = f"Error fetching {url}: {e}"
 
+    @property
+    def soup(self):
+        """The parsed page, built on first use without irrelevant tags (scripts, styles, images, inputs)."""
+        if self._soup is None and self._content is not None:
+            self._soup = parse_html(self._content, parser=self._parser, partial=self._partial_parse)
+        return self._soup
+
+    def _fetch_content(self, session, timeout, cache, streaming=False, extractor=None, max_bytes=None,
+                       content_types=None):
+        """Fetch the raw page body, revalidating a cached copy when one exists.
+
+        With streaming the body is read in capped chunks, fed to the extractor if one is given.
+        """
+        entry = cache.lookup(self.url) if cache else None
+        headers = cache.conditional_headers(entry) if entry else None
+
+        if self.scheduler is not None:
+            self.scheduler.acquire(self.url, self.deadline)
+        # A scheduled fetch gets 429/503 answers back unretried, so the scheduler can pause the host
+        response = fetch(self.url, session=session, timeout=timeout, deadline=self.deadline, headers=headers,
+                         stream=streaming, unretried_statuses=PAUSE_STATUSES if self.scheduler else ())
+        if self.scheduler is not None:
+            self.scheduler.record_response(self.url, response)
+        if entry and response.status_code == 304:
+            response.close()
+            self.from_cache = True
+            CACHE_LOOKUPS.inc(cache='fetch', result='hit')
+            return self._count_bytes(cache.revalidated(entry), 'cache')
+        if cache:
+            CACHE_LOOKUPS.inc(cache='fetch', result='stale' if entry else 'miss')
+
+        response.raise_for_status()  # Will raise an exception for HTTP errors
+        if streaming:
+            check_content_type(response, content_types or DEFAULT_CONTENT_TYPES)
+            content, self.truncated = read_streamed(response, max_bytes=max_bytes or DEFAULT_MAX_BYTES,
+                                                    extractor=extractor, deadline=self.deadline)
+        else:
+            content = response.content
+        if cache and not self.truncated:
+            cache.store(self.url, response, content)
+        return self._count_bytes(content, 'network')
+
+    def _count_bytes(self, content, source):
+        PAGE_BYTES.observe(len(content), source=source)
+        FETCHED_BYTES.inc(len(content), source=source)
+        return content
+
     def get_title(self):
         """Returns the title of the webpage."""
         return self.title
@@ -48,12 +134,35 @@ class Website:
         """Returns the main text content of the webpage."""
         return self.text
 
+    def get_links(self):
+        """Returns the href of every link on the page, in document order."""
+        if self._links is None:
+            soup = self.soup
+            self._links = [a["href"] for a in soup.find_all("a", href=True)] if soup is not None else []
+        return self._links
+
+    def get_main_text(self):
+        """Returns only the page's main content (no navigation, footer or cookie banners).
+
+        Falls back to the full text when no content block stands out.
+        """
+        if self._main_text is None and self.text is not None:
+            soup = self.soup
+            with timed('main_text'):
+                self._main_text = (extract_main_content(soup) if soup is not None else "") or self.text
+        return self._main_text
+
+    @property
+    def main_text(self):
+        return self.get_main_text()
+
     def get_error(self):
         """Returns error message if the webpage failed to load."""
         return self.error
 
     def get_company_details(self):
         """Extract additional information like overview, services, and contact."""
+        self._index_keywords(['overview', 'services', 'contact'])
         details = {
             'overview': self.extract_section('overview'),
             'services': self.extract_section('services'),
@@ -63,46 +172,35 @@ class Website:
 
     def extract_section(self, keyword):
         """Search for sections related to keyword and extract."""
-        # Find all elements containing the keyword in their text
-        sections = self.soup.find_all(string=lambda text: text and keyword.lower() in text.lower())
+        # Find the first text node containing the keyword (answered from the keyword index)
+        self._index_keywords([keyword])
+        node = self._keyword_nodes[keyword.lower()]
 
-        if sections:
+        if node is not None:
             # Ensure there's a parent 'section' element to extract text from
-            parent_section = sections[0].find_parent('section')
-            if parent_section:
-                return parent_section.get_text(separator="\n", strip=True)
+            with timed('sections'):
+                parent_section = node.find_parent('section')
+                if parent_section:
+                    return parent_section.get_text(separator="\n", strip=True)
 
         # Return a message if no relevant section is found
         return f"{keyword.capitalize()} section not found."
 
+    def _index_keywords(self, keywords):
+        """Locate all not-yet-indexed keywords in one pass over the page's text nodes."""
+        missing = [keyword for keyword in keywords if keyword.lower() not in self._keyword_nodes]
+        if missing:
+            soup = self.soup
+            with timed('keyword_index'):
+                self._keyword_nodes.update(build_keyword_index(soup, missing))
 
-def summarize_text(text, word_limit=200):
-    """Summarize the text by extracting key sentences based on word frequency, ensuring the word limit is respected."""
-    words = text.split()
-    word_counts = Counter([word.lower() for word in words if word.isalpha()])
-    most_common_words = [word for word, _ in word_counts.most_common(50)]
-
-    sentences = text.split("\n")
-
-    sentence_scores = []
-    for sentence in sentences:
-        sentence_score = sum(1 for word in sentence.split() if word.lower() in most_common_words)
-        sentence_scores.append((sentence_score, sentence))
 
-    ranked_sentences = sorted(sentence_scores, reverse=True, key=lambda x: x[0])
-
-    summary = []
-    word_count = 0
-
-    for _, sentence in ranked_sentences:
-        words_in_sentence = sentence.split()
-        if word_count + len(words_in_sentence) <= word_limit:
-            summary.append(sentence)
-            word_count += len(words_in_sentence)
-        else:
-            break
+def summarize_text(text, word_limit=200, corpus=None):
+    """Summarize the text by extracting key sentences based on word frequency, ensuring the word limit is respected.
 
-    return ' '.join(summary)
+    Scoring is done by summarization.SummaryEngine; pass a summarization.Corpus to weight words by TF-IDF.
+    """
+    return SummaryEngine(word_limit=word_limit, corpus=corpus).summarize(text)
 
 
 if __name__ == "__main__":
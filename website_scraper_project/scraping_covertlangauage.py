@@ -2,38 +2,58 @@ import time
 import logging
 from playwright.sync_api import sync_playwright
 from playwright_stealth import stealth_sync
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 import re
-import json
-from deep_translator import GoogleTranslator
 
-# Setup logging
-logging.basicConfig(filename='translation_errors.log', level=logging.ERROR)
+from scraper.deadline import Deadline
+from scraper.politeness import PolitenessScheduler
+from scraper.website_scraper import Website
+from crawl_state import CrawlState, canonicalize_url
+from fingerprint import DuplicateIndex
+from language_detection import detect_language, needs_translation
+from page_records import open_writer, read_records
+from translation import default_translator
 
-visited_urls = set()
 TARGET_KEYWORDS = ["about", "who-we-are", "company"]
 MAX_URL_DEPTH = 3  # Max number of path segments (e.g., /about-us/ = 1)
 
+COOKIE_BUTTON_SELECTORS = [
+    "button:has-text('Accept')",
+    "button:has-text('I Accept')",
+    "button:has-text('OK')",
+    "div[class*='cookie'] button",
+    "[aria-label*='Accept']",
+    "button[class*='cookie']"
+]
+UNWANTED_TAGS = ["script", "style", "img", "input"]
+
+# Requests the browser never needs to render the page text
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "texttrack", "manifest"}
+TRACKER_HOSTS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook.com", "hotjar.com", "segment.io", "segment.com",
+    "clarity.ms", "bat.bing.com", "snap.licdn.com", "px.ads.linkedin.com", "cookielaw.org",
+]
+
+# Hybrid mode: a plain HTTP fetch is used when it yields at least this much text
+MIN_STATIC_TEXT_CHARS = 500
+
+# Seconds one page may take from fetch to translation; stages still pending then are skipped
+PAGE_DEADLINE = 60
+GOTO_TIMEOUT = 20000  # ms per browser navigation attempt
+CLAIM_POLL_INTERVAL = 2  # Seconds between claims while other workers still hold URLs
+
 # === Utility Functions ===
 
 def normalize_url(url):
-    parsed = urlparse(url)
-    return f"{parsed.scheme}://{parsed.netloc}{parsed.path.rstrip('/')}"
+    return canonicalize_url(url)
 
 def get_url_depth(url):
     path = urlparse(url).path
     return len([segment for segment in path.strip('/').split('/') if segment])
 
 def close_cookie_popup(page):
-    selectors = [
-        "button:has-text('Accept')",
-        "button:has-text('I Accept')",
-        "button:has-text('OK')",
-        "div[class*='cookie'] button",
-        "[aria-label*='Accept']",
-        "button[class*='cookie']"
-    ]
-    for sel in selectors:
+    for sel in COOKIE_BUTTON_SELECTORS:
         try:
             button = page.query_selector(sel)
             if button:
@@ -44,31 +64,67 @@ def close_cookie_popup(page):
             continue
 
 def remove_unwanted_elements(page):
-    tags_to_remove = ["script", "style", "img", "input"]
-    for tag in tags_to_remove:
+    for tag in UNWANTED_TAGS:
         try:
             page.eval_on_selector_all(tag, "els => els.forEach(el => el.remove())")
         except:
             continue
 
-def safe_goto(page, url, max_retries=3):
+def should_block_request(resource_type, url):
+    """True for non-document resources (images, fonts, media, CSS) and known tracker hosts."""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).netloc.lower()
+    return any(host == tracker or host.endswith("." + tracker) for tracker in TRACKER_HOSTS)
+
+def block_resources(route):
+    """Playwright route handler that aborts requests the page text does not depend on."""
+    request = route.request
+    if should_block_request(request.resource_type, request.url):
+        route.abort()
+    else:
+        route.continue_()
+
+def fetch_static_page(url, min_chars=MIN_STATIC_TEXT_CHARS, deadline=None, scheduler=None):
+    """Try a plain HTTP fetch + parse of url, without a browser.
+
+    Returns (info, links) when the static HTML carries at least min_chars of text, or None
+    when the page should be rendered by the headless browser instead.
+    """
+    website = Website(url, stream=True, text_only=True, deadline=deadline, scheduler=scheduler)
+    if website.error or len(website.text or "") < min_chars:
+        return None
+    links = [urljoin(url, href) for href in website.get_links()]
+    return {"url": url, "page_content": website.text}, links
+
+def browser_timeout(deadline, default_ms):
+    """Playwright timeout in ms: default_ms capped at what is left of the deadline."""
+    remaining = deadline.remaining() if deadline else None
+    return default_ms if remaining is None else max(1, min(default_ms, int(remaining * 1000)))
+
+def safe_goto(page, url, max_retries=3, deadline=None):
     for i in range(max_retries):
+        if deadline and deadline.expired():
+            break
         try:
-            page.goto(url, timeout=20000, wait_until="domcontentloaded")
+            page.goto(url, timeout=browser_timeout(deadline, GOTO_TIMEOUT), wait_until="domcontentloaded")
             return True
         except Exception as e:
             print(f"Goto failed ({i+1}/{max_retries}): {e}")
-            time.sleep(2)
+            time.sleep(deadline.timeout(2) if deadline else 2)
     return False
 
-def scrape_page_text(page, url):
+def scrape_page_text(page, url, deadline=None):
     info = {"url": url}
     try:
         print(f"\nScraping: {url}")
-        if not safe_goto(page, url):
-            info["error"] = "Page load failed after retries"
+        if not safe_goto(page, url, deadline=deadline):
+            if deadline and deadline.expired():
+                info["error"] = "Page load did not finish within the deadline"
+            else:
+                info["error"] = "Page load failed after retries"
             return info
-        page.wait_for_selector("body", timeout=5000)
+        page.wait_for_selector("body", timeout=browser_timeout(deadline, 5000))
         close_cookie_popup(page)
         remove_unwanted_elements(page)
         text = page.inner_text("body")
@@ -84,6 +140,17 @@ def is_target_link(href):
     except:
         return False
 
+def filter_links(links, state):
+    """Keep the crawlable company-info links the crawl state has not seen yet."""
+    return [
+        href for href in links
+        if href.startswith("http")
+           and "linkedin.com" not in href.lower()
+           and is_target_link(href)
+           and get_url_depth(href) <= MAX_URL_DEPTH
+           and not state.seen(href)
+    ]
+
 def summarize_paragraphs(text, num_sentences=3):
     paragraphs = [p.strip() for p in text.split('\n') if len(p.strip()) > 60]
     summarized = []
@@ -95,80 +162,167 @@ def summarize_paragraphs(text, num_sentences=3):
             summarized.append(' '.join(sentences[:num_sentences]))
     return summarized
 
-def detect_and_translate(text, retries=3, delay=5):
-    MAX_CHAR_LIMIT = 4999
-    translated_text = ""
-    text_chunks = [text[i:i + MAX_CHAR_LIMIT] for i in range(0, len(text), MAX_CHAR_LIMIT)]
+def detect_and_translate(text, translator=None):
+    """Translate text to English (see translation.Translator: cached on disk, retried with backoff)."""
+    return (translator or default_translator()).translate(text)
 
-    for chunk in text_chunks:
-        attempt = 0
-        while attempt < retries:
-            try:
-                translated_text += GoogleTranslator(source='auto', target='en').translate(chunk) + "\n"
-                break
-            except Exception as e:
-                attempt += 1
-                print(f"Translation attempt {attempt} failed: {e}")
-                logging.error(f"Translation attempt {attempt} failed for chunk: {chunk}. Error: {e}")
-                if attempt < retries:
-                    print(f"Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                else:
-                    print("Max retries reached. Skipping translation.")
-                    translated_text += chunk + "\n"
-
-    return translated_text.strip()
-
-def scrape_company_info(start_url, max_depth=1):
+def process_page_content(info, duplicates=None, deadline=None):
+    """Add paragraph summaries, detected languages and English translations to a scraped page's info.
+
+    With a fingerprint.DuplicateIndex, a page near-identical to one already processed is only
+    recorded as {"url", "duplicate_of"}: its content is dropped and not summarized or translated.
+    With a deadline (scraper.deadline.Deadline), stages it leaves no time for are listed in
+    info["skipped_stages"]; "translation" is listed too when time ran out part-way, leaving
+    the remaining paragraphs untranslated.
+    """
+    deadline = deadline or Deadline()
+    skipped = []
+    if info.get("page_content") and duplicates is not None:
+        original = duplicates.check(info["url"], info["page_content"])
+        if original is not None:
+            info["duplicate_of"] = original
+            del info["page_content"]
+            return info
+
+    if info.get("page_content") and deadline.expired():
+        skipped = ["summary", "translation"]
+    elif info.get("page_content"):
+        summarized_paras = summarize_paragraphs(info["page_content"])
+        info["summarized_content"] = summarized_paras
+
+        # Detect languages offline; only paragraphs not already in English are sent out
+        info["language"] = detect_language(info["page_content"])
+        languages = [detect_language(p) for p in summarized_paras]
+        info["paragraph_languages"] = languages
+        foreign = [i for i, (paragraph, language) in enumerate(zip(summarized_paras, languages))
+                   if needs_translation(paragraph, language=language)]
+
+        # All of a page's paragraphs go out together, packed into as few requests as possible
+        translated = list(summarized_paras)
+        if foreign and deadline.expired():
+            skipped.append("translation")
+        elif foreign:
+            translations = default_translator().translate_many([summarized_paras[i] for i in foreign], deadline=deadline)
+            for i, translation in zip(foreign, translations):
+                translated[i] = translation
+            if deadline.expired():
+                skipped.append("translation")
+        info["translated_content"] = translated
+    if skipped:
+        info["skipped_stages"] = skipped
+    return info
+
+def scrape_company_info(start_url, max_depth=1, hybrid=True, state=None, skip_duplicates=True,
+                        page_deadline=PAGE_DEADLINE, scheduler=None, output=None):
+    """Crawl start_url's about/company pages and return the info dict of every page visited.
+
+    With hybrid, each page is first fetched over plain HTTP and only rendered in the headless
+    browser (launched on first need, with non-document resources blocked) when the static
+    HTML has too little text. Progress is tracked in state (a CrawlState; in-memory unless
+    given), so a crawl backed by a database file resumes where it stopped. With
+    skip_duplicates, near-duplicate pages are recorded with "duplicate_of" and not processed.
+    Each page gets page_deadline seconds (None: no limit) from fetch to translation; a page
+    that runs out has the stages left undone listed in "skipped_stages". Requests go through
+    scheduler (a PolitenessScheduler unless given), which paces them per host and skips
+    URLs robots.txt excludes. With output (a writer from page_records.open_writer), each
+    page's info is written there as soon as it is processed instead of being collected, and
+    the list returned stays empty.
+    """
+    state = state or CrawlState()
+    if get_url_depth(start_url) <= MAX_URL_DEPTH:
+        state.add(start_url, depth=0)
+    return crawl(state, max_depth=max_depth, hybrid=hybrid, site=start_url, skip_duplicates=skip_duplicates,
+                 page_deadline=page_deadline, scheduler=scheduler, output=output)
+
+def scrape_companies(start_urls, max_depth=1, hybrid=True, state=None, skip_duplicates=True,
+                     page_deadline=PAGE_DEADLINE, scheduler=None, output=None):
+    """Crawl several sites from one frontier; more processes can share a file-backed state."""
+    state = state or CrawlState()
+    for start_url in start_urls:
+        if get_url_depth(start_url) <= MAX_URL_DEPTH:
+            state.add(start_url, depth=0)
+    return crawl(state, max_depth=max_depth, hybrid=hybrid, skip_duplicates=skip_duplicates,
+                 page_deadline=page_deadline, scheduler=scheduler, output=output)
+
+def crawl(state, max_depth=1, hybrid=True, site=None, skip_duplicates=True, page_deadline=PAGE_DEADLINE,
+          scheduler=None, output=None):
+    """Claim and scrape URLs from state's frontier (optionally one site's) until none are left."""
+    duplicates = DuplicateIndex() if skip_duplicates else None
+    scheduler = scheduler or PolitenessScheduler()
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        stealth_sync(page)
-
-        def recurse(url, depth):
-            normalized_url = normalize_url(url)
-            if normalized_url in visited_urls or depth > max_depth:
-                return []
-            if get_url_depth(normalized_url) > MAX_URL_DEPTH:
-                return []
-
-            visited_urls.add(normalized_url)
-            info = scrape_page_text(page, normalized_url)
-            results = [info]
-
-            if info.get("page_content"):
-                summarized_paras = summarize_paragraphs(info["page_content"])
-                info["summarized_content"] = summarized_paras
-                translated = [detect_and_translate(p) for p in summarized_paras]
-                info["translated_content"] = translated
+        browser = None
+        page = None
 
+        def browser_page():
+            nonlocal browser, page
+            if page is None:
+                browser = p.chromium.launch(headless=True)
+                page = browser.new_page()
+                stealth_sync(page)
+                page.route("**/*", block_resources)
+            return page
+
+        def visit(url, deadline):
+            static = fetch_static_page(url, deadline=deadline, scheduler=scheduler) if hybrid else None
+            if static:
+                return static
+            scheduler.acquire(url, deadline)
+            info = scrape_page_text(browser_page(), url, deadline=deadline)
             try:
                 links = page.eval_on_selector_all("a", "elements => elements.map(el => el.href)")
-                valid_links = [
-                    href for href in links
-                    if href.startswith("http")
-                       and "linkedin.com" not in href.lower()
-                       and is_target_link(href)
-                       and normalize_url(href) not in visited_urls
-                       and get_url_depth(href) <= MAX_URL_DEPTH
-                ]
-                for link in valid_links:
-                    results.extend(recurse(link, depth + 1))
             except Exception as e:
                 logging.error(f"Failed to extract links from {url}: {e}")
+                links = []
+            return info, links
 
-            return results
+        all_info = []
+        emit = all_info.append if output is None else output.write
+        while True:
+            claimed = state.claim(site=site)
+            if not claimed:
+                # Other processes sharing the frontier may still add links from the pages they
+                # hold; wait for them (or for their leases to expire) before calling it done
+                if state.has_unfinished(site):
+                    time.sleep(CLAIM_POLL_INTERVAL)
+                    continue
+                break
+            for url, depth, url_site in claimed:
+                try:
+                    deadline = Deadline(page_deadline)
+                    info, links = visit(url, deadline)
+                    try:
+                        process_page_content(info, duplicates, deadline)
+                    finally:
+                        # Kept even when processing fails part-way, as far as it got
+                        emit(info)
+                    if depth < max_depth:
+                        for link in filter_links(links, state):
+                            state.add(link, depth + 1, site=url_site)
+                    state.complete(url)
+                except Exception as e:
+                    logging.error(f"Failed to crawl {url}: {e}")
+                    state.fail(url, e)
 
-        all_info = recurse(start_url, depth=0)
-        browser.close()
+        if browser:
+            browser.close()
         return all_info
 
 # === Run Script ===
 if __name__ == "__main__":
+    # Errors go to a log file when the crawler runs as a script; importers keep their own logging setup
+    logging.basicConfig(filename='translation_errors.log', level=logging.ERROR)
     start_url = "https://www.beroepskaart.be/nl"  # Replace with your target URL
-    info = scrape_company_info(start_url, max_depth=1)
+    # Crawl progress is kept on disk: re-running after a crash resumes the same crawl
+    state = CrawlState("crawl_state.sqlite3")
+    state.release_claims()
+    if state.has_unfinished():
+        print(f"Resuming the crawl in crawl_state.sqlite3: {state.counts()}")
+    # Pages are appended as they are processed, so a crash keeps everything scraped so far
+    output_file = "scraped_about_company_info_with_summary.jsonl"
+    with open_writer(output_file) as output:
+        scrape_company_info(start_url, max_depth=1, state=state, output=output)
 
-    for page in info:
+    for page in read_records(output_file):
         print("\n" + "=" * 100)
         print(f"Context: Scraping company page for: {page.get('url')}")
         print("\nSUMMARY (Paragraphs):")
@@ -177,6 +331,3 @@ if __name__ == "__main__":
         print("\nTRANSLATED CONTENT (Paragraphs):")
         for para in page.get("translated_content", []):
             print(f"- {para}")
-
-    with open("scraped_about_company_info_with_summary.json", "w", encoding="utf-8") as f:
-        json.dump(info, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_CHAR_LIMIT = 4999  # Longest text GoogleTranslator accepts in one request
+DEFAULT_CACHE_DIR = os.getenv("TRANSLATION_CACHE_DIR", ".translation_cache")
+DEFAULT_WORKERS = 4
+
+# === Backends ===
+
+class GoogleBackend:
+    """Translate through deep_translator's GoogleTranslator, one translator object per thread."""
+
+    def __init__(self, source="auto", target="en"):
+        self.source = source
+        self.target = target
+        self._local = threading.local()
+
+    def __call__(self, text):
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            from deep_translator import GoogleTranslator
+            translator = self._local.translator = GoogleTranslator(source=self.source, target=self.target)
+        return translator.translate(text)
+
+# === Disk cache ===
+
+class TranslationCache:
+    """Translations stored on disk as one small JSON file per content hash."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, namespace="auto:en"):
+        self.directory = directory
+        self.namespace = namespace
+
+    def _path(self, text):
+        digest = hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def get(self, text):
+        try:
+            with open(self._path(text), encoding="utf-8") as f:
+                return json.load(f)["translation"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, text, translation):
+        path = self._path(text)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename so concurrent readers never see partial JSON
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"translation": translation}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+# === Translator ===
+
+class Translator:
+    """Batched, cached and concurrent translation of many paragraphs.
+
+    Uncached paragraphs are packed, newline-separated, into as few requests as max_chars
+    allows; the requests run on a thread pool, each retried with exponential backoff and
+    jitter. Any callable text -> translation can serve as backend, e.g. a local stand-in
+    in tests. Text that still fails to translate is returned unchanged.
+    """
+
+    def __init__(self, backend=None, source="auto", target="en", cache=None, max_workers=DEFAULT_WORKERS,
+                 retries=3, base_delay=1.0, max_delay=30.0, max_chars=MAX_CHAR_LIMIT):
+        self.backend = backend or GoogleBackend(source=source, target=target)
+        self.cache = cache if cache is not None else TranslationCache(namespace=f"{source}:{target}")
+        self.max_workers = max_workers
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_chars = max_chars
+
+    def translate(self, text, deadline=None):
+        return self.translate_many([text], deadline=deadline)[0]
+
+    def translate_many(self, paragraphs, deadline=None):
+        """Translate a list of paragraphs, returning the translations in the same order.
+
+        With a deadline (see scraper.deadline.Deadline), no request is started or retried
+        once it has run out; paragraphs not translated by then are returned unchanged.
+        """
+        results = list(paragraphs)
+        pending = {}
+        for i, text in enumerate(paragraphs):
+            if not text or not text.strip():
+                continue
+            cached = self.cache.get(text) if self.cache else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        batches = self._pack(list(pending))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            translated = executor.map(lambda batch: self._translate_batch(batch, deadline), batches)
+            for batch, translations in zip(batches, translated):
+                for text, translation in zip(batch, translations):
+                    for i in pending[text]:
+                        results[i] = translation
+        return results
+
+    def _pack(self, texts):
+        """Group texts into batches whose newline-joined length stays within max_chars."""
+        batches, batch, size = [], [], 0
+        for text in texts:
+            if "\n" in text or len(text) > self.max_chars:
+                # Multi-line and oversized texts travel alone so the split back stays unambiguous
+                batches.append([text])
+                continue
+            needed = len(text) + (1 if batch else 0)
+            if batch and size + needed > self.max_chars:
+                batches.append(batch)
+                batch, size, needed = [], 0, len(text)
+            batch.append(text)
+            size += needed
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _translate_batch(self, batch, deadline=None):
+        if len(batch) == 1:
+            translations = [self._translate_long(batch[0], deadline)]
+        else:
+            joined = self._request("\n".join(batch), deadline)
+            translations = joined.split("\n") if joined is not None else None
+            if translations is None or len(translations) != len(batch):
+                # The translator merged or split lines; fall back to one request per paragraph
+                translations = [self._translate_long(text, deadline) for text in batch]
+
+        results = []
+        for text, translation in zip(batch, translations):
+            if translation is None:
+                results.append(text)
+                continue
+            if self.cache:
+                self.cache.set(text, translation)
+            results.append(translation)
+        return results
+
+    def _translate_long(self, text, deadline=None):
+        """Translate one text, splitting it into max_chars chunks when it is too long; None on failure."""
+        chunks = [text[i:i + self.max_chars] for i in range(0, len(text), self.max_chars)]
+        translated = [self._request(chunk, deadline) for chunk in chunks]
+        if any(part is None for part in translated):
+            return None
+        return "\n".join(translated).strip()
+
+    def _request(self, text, deadline=None):
+        """Send one backend request with exponential backoff; None if every attempt failed or time ran out."""
+        for attempt in range(1, self.retries + 1):
+            if deadline is not None and deadline.expired():
+                return None
+            try:
+                translation = self.backend(text)
+                if translation is not None:
+                    return translation
+                raise ValueError("translator returned no text")
+            except Exception as e:
+                print(f"Translation attempt {attempt} failed: {e}")
+                logging.error(f"Translation attempt {attempt} failed for chunk: {text}. Error: {e}")
+                if attempt < self.retries:
+                    delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                    if deadline is not None:
+                        delay = deadline.timeout(delay)
+                    time.sleep(delay)
+        print("Max retries reached. Skipping translation.")
+        return None
+
+
+_default_translator = None
+_default_lock = threading.Lock()
+
+
+def default_translator():
+    """Return the process-wide Google-backed Translator (auto -> English)."""
+    global _default_translator
+    if _default_translator is None:
+        with _default_lock:
+            if _default_translator is None:
+                _default_translator = Translator()
+    return _default_translator
@@ -78,6 +78,14 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Batch and job worker threads write concurrently: WAL lets reads go on during a write,
+        # and a writer waits up to 20 seconds for the lock instead of failing straight away
+        'OPTIONS': {
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL',
+        },
+        # A file, not the in-memory default, so tests lock the way the real database does
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -122,3 +130,62 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Scraper
+
+# Concurrency limits for the /api/scrape/batch/ endpoint
+SCRAPER_BATCH_MAX_URLS = 500
+SCRAPER_BATCH_MAX_WORKERS = 16
+SCRAPER_BATCH_PER_HOST = 2
+
+# Conditional-request fetch cache (see scraper.fetch_cache)
+SCRAPER_FETCH_CACHE_ENABLED = True
+SCRAPER_FETCH_CACHE_TTL = 7 * 24 * 3600  # seconds before a stored page is dropped
+SCRAPER_FETCH_CACHE_MAX_BYTES = 256 * 1024 * 1024  # total compressed bodies kept
+
+# HTML parsing: BeautifulSoup backend ('lxml', 'html.parser', 'html5lib'; None picks lxml
+# when installed) and whether script/style/img/input markup is dropped before parsing.
+# Compare backends on a real page with `python manage.py compare_parsers <url>`.
+SCRAPER_HTML_PARSER = None
+SCRAPER_PARTIAL_PARSE = True
+
+# Streaming fetch: read bodies in chunks, capped in size and restricted to these content types
+SCRAPER_STREAM_FETCH = True
+SCRAPER_MAX_BODY_BYTES = 5 * 1024 * 1024
+SCRAPER_ALLOWED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+# Optional TF-IDF corpus for summaries, built with `python manage.py build_summary_corpus`
+SCRAPER_SUMMARY_CORPUS = None
+
+# LLM summaries streamed by /api/scrape/stream/; used only when OPENAI_API_KEY is set
+# and the openai package is installed (OPENAI_BASE_URL selects a compatible server)
+SCRAPER_LLM_SUMMARY = True
+SCRAPER_LLM_MODEL = 'gpt-4o-mini'
+
+# Background scrape jobs (/api/scrape/jobs/): worker threads per process, how long finished
+# results are kept, and after how long a job stuck in 'running' is queued again (seconds)
+SCRAPER_JOB_WORKERS = 4
+SCRAPER_JOB_RETENTION = 24 * 3600
+SCRAPER_JOB_LEASE = 15 * 60
+
+# Time budget in seconds for each scraped URL, from fetch to LLM summary (None: no limit).
+# Stages that cannot start in time are skipped and listed in the result's 'skipped_stages';
+# requests may ask for less with ?deadline=<seconds>.
+SCRAPER_DEADLINE = 30
+
+# Politeness towards scraped sites: at most SCRAPER_HOST_RATE requests per second per host
+# (bursts of SCRAPER_HOST_BURST), slower when robots.txt sets a Crawl-delay, and a host
+# answering 429 is left alone for its Retry-After. robots.txt is re-read after SCRAPER_ROBOTS_TTL seconds.
+SCRAPER_POLITENESS = True
+SCRAPER_HOST_RATE = 1.0
+SCRAPER_HOST_BURST = 2
+SCRAPER_RESPECT_ROBOTS = True
+SCRAPER_ROBOTS_USER_AGENT = '*'
+SCRAPER_ROBOTS_TTL = 24 * 3600
+
+# Benchmark results `python manage.py benchmark` compares against (written with --save-baseline)
+SCRAPER_BENCHMARK_BASELINE = BASE_DIR / 'benchmark_baseline.json'
+
+# Prometheus metrics of each process (stage timings, bytes fetched, cache hits) at /metrics
+SCRAPER_METRICS = True
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from scraper import views as scraper_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('scraper.urls')),  # Include the scraper app's URLs
+    path('metrics', scraper_views.metrics, name='metrics'),  # Prometheus scrape target
 ]
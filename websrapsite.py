@@ -1,29 +1,24 @@
 import requests
 from bs4 import BeautifulSoup
-from collections import Counter
+
+from website_scraper_project.scraper.http_client import fetch
+from website_scraper_project.scraper.keyword_index import build_keyword_index
+from website_scraper_project.scraper.website_scraper import summarize_text
 
 
 class Website:
-    def __init__(self, url):
+    def __init__(self, url, session=None, timeout=None):
         """Create a Website object that extracts basic info (title and content) using BeautifulSoup."""
         self.url = url
         self.title = None
         self.text = None
         self.error = None
         self.soup = None
+        self._keyword_nodes = {}
 
-        # Define headers to mimic a real browser for requests
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/113.0.0.0 Safari/537.36"
-            )
-        }
-
-        # Try to fetch the webpage content and parse it
+        # Try to fetch the webpage content (through the shared pooled session) and parse it
         try:
-            response = requests.get(self.url, headers=self.headers)
+            response = fetch(self.url, session=session, timeout=timeout)
             response.raise_for_status()  # Will raise an exception for HTTP errors
             self.soup = BeautifulSoup(response.content, 'html.parser')
 
@@ -54,6 +49,9 @@ class Website:
 
     def get_company_details(self):
         """Extract additional information like overview, services, contact, about us, and who we are."""
+        # Index every keyword used below in a single pass over the page text
+        self._index_keywords(['overview', 'about', 'services', 'solutions', 'contact', 'contact us',
+                              'about us', 'who we are'])
         details = {
             'Overview': self.extract_section(['overview', 'about']),
             'Services': self.extract_section(['services', 'solutions']),
@@ -65,16 +63,23 @@ class Website:
 
     def extract_section(self, keywords):
         """Search for sections related to the keywords and extract."""
+        self._index_keywords(keywords)
         for keyword in keywords:
-            # Find all elements containing the keyword in their text
-            sections = self.soup.find_all(string=lambda text: text and keyword.lower() in text.lower())
-            if sections:
+            # First text node containing the keyword, looked up in the keyword index
+            node = self._keyword_nodes[keyword.lower()]
+            if node is not None:
                 # Try to find a parent section and return the text content
-                parent_section = sections[0].find_parent(['section', 'div'])
+                parent_section = node.find_parent(['section', 'div'])
                 if parent_section:
                     return parent_section.get_text(separator="\n", strip=True)
         return f"Section not found for {', '.join(keywords)}."
 
+    def _index_keywords(self, keywords):
+        """Locate all not-yet-indexed keywords in one pass over the page's text nodes."""
+        missing = [keyword for keyword in keywords if keyword.lower() not in self._keyword_nodes]
+        if missing:
+            self._keyword_nodes.update(build_keyword_index(self.soup, missing))
+
     def extract_about_us(self):
         """Check for 'About Us' section and extract relevant text."""
         return self.extract_section(['about us'])
@@ -84,35 +89,6 @@ class Website:
         return self.extract_section(['who we are'])
 
 
-def summarize_text(text, word_limit=200):
-    """Summarize the text by extracting key sentences based on word frequency, ensuring the word limit is respected."""
-    words = text.split()
-    word_counts = Counter([word.lower() for word in words if word.isalpha()])
-    most_common_words = [word for word, _ in word_counts.most_common(50)]
-
-    sentences = text.split("\n")
-
-    sentence_scores = []
-    for sentence in sentences:
-        sentence_score = sum(1 for word in sentence.split() if word.lower() in most_common_words)
-        sentence_scores.append((sentence_score, sentence))
-
-    ranked_sentences = sorted(sentence_scores, reverse=True, key=lambda x: x[0])
-
-    summary = []
-    word_count = 0
-
-    for _, sentence in ranked_sentences:
-        words_in_sentence = sentence.split()
-        if word_count + len(words_in_sentence) <= word_limit:
-            summary.append(sentence)
-            word_count += len(words_in_sentence)
-        else:
-            break
-
-    return ' '.join(summary)
-
-
 if __name__ == "__main__":
     # Example Usage
     url = "https://www.cognizant.com"  # Replace with the website URL you want to scrape
@@ -0,0 +1,187 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from website_scraper_project.scraper.http_client import fetch
+from wikipedia_infobox import lead_summary_text, parse_infobox_wikitext
+
+API_URL = os.getenv("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php")
+TITLES_PER_REQUEST = 20  # TextExtracts returns intros for at most 20 pages per request
+DEFAULT_WORKERS = 4
+MAX_CANDIDATES = 5  # Pages of a disambiguation list that are checked for a company infobox
+# Wikimedia asks API clients to identify themselves
+HEADERS = {"User-Agent": "web-scraping company lookup (https://github.com/aashique1915005/web-scraping)"}
+
+# Parenthetical qualifiers that mark a disambiguation entry as a company
+COMPANY_QUALIFIERS = re.compile(r"\((?:[^)]*\b(?:company|corporation|business|bank|firm|brand|group|"
+                                r"conglomerate|airline|retailer|manufacturer)\b[^)]*)\)", re.IGNORECASE)
+STOP_WORDS = {"of", "and", "the", "&", "for", "de"}
+
+# === MediaWiki API requests ===
+
+def _api_get(params, session=None, api_url=API_URL):
+    response = fetch(api_url, session=session, params=dict(params, format="json", formatversion="2"),
+                     headers=HEADERS)
+    response.raise_for_status()
+    data = response.json()
+    if "error" in data:
+        raise ValueError(f"MediaWiki API error: {data['error'].get('info', data['error'])}")
+    return data
+
+
+def query_pages(titles, session=None, api_url=API_URL):
+    """Fetch lead extract, lead wikitext and disambiguation flag of up to TITLES_PER_REQUEST titles.
+
+    Redirects are followed. Returns (pages, resolved): pages maps each final title to its page
+    dict, resolved maps each requested title to the final title it ended up at.
+    """
+    params = {
+        "action": "query",
+        "titles": "|".join(titles),
+        "redirects": "1",
+        "prop": "extracts|revisions|pageprops|info",
+        "exintro": "1",
+        "explaintext": "1",
+        "exlimit": "max",
+        "rvprop": "content",
+        "rvslots": "main",
+        "rvsection": "0",
+        "ppprop": "disambiguation",
+        "inprop": "url",
+    }
+    pages, resolved = {}, {title: title for title in titles}
+    while True:
+        data = _api_get(params, session, api_url)
+        query = data.get("query", {})
+        # Requested titles go through normalization ("tcs" -> "TCS") and then redirects
+        for mapping in query.get("normalized", []) + query.get("redirects", []):
+            for requested, current in resolved.items():
+                if current == mapping["from"]:
+                    resolved[requested] = mapping["to"]
+        for page in query.get("pages", []):
+            pages.setdefault(page["title"], {}).update(page)
+        if "continue" not in data:
+            return pages, resolved
+        params.update(data["continue"])
+
+
+def query_links(titles, session=None, api_url=API_URL):
+    """Return {title: [linked article titles]} for disambiguation pages, in one request per 50 titles."""
+    links = {}
+    for start in range(0, len(titles), 50):
+        params = {"action": "query", "titles": "|".join(titles[start:start + 50]), "prop": "links",
+                  "plnamespace": "0", "pllimit": "max"}
+        while True:
+            data = _api_get(params, session, api_url)
+            for page in data.get("query", {}).get("pages", []):
+                links.setdefault(page["title"], []).extend(link["title"] for link in page.get("links", []))
+            if "continue" not in data:
+                break
+            params.update(data["continue"])
+    return links
+
+# === Records ===
+
+def _wikitext_of(page):
+    revisions = page.get("revisions") or [{}]
+    return revisions[0].get("slots", {}).get("main", {}).get("content", "")
+
+
+def _is_disambiguation(page):
+    return "disambiguation" in page.get("pageprops", {})
+
+
+def page_record(query, page):
+    """Build the output record for one looked-up company name from its API page."""
+    record = {"query": query, "title": page.get("title"), "url": page.get("fullurl")}
+    if page.get("missing") or page.get("invalid"):
+        record.update(status="missing", summary=None, infobox=None)
+    elif _is_disambiguation(page):
+        record.update(status="disambiguation", summary=None, infobox=None)
+    else:
+        record.update(status="found", summary=lead_summary_text(page.get("extract", "")),
+                      infobox=parse_infobox_wikitext(_wikitext_of(page)))
+    return record
+
+
+def _initials(title):
+    words = re.sub(r"\([^)]*\)", "", title).split()
+    return "".join(word[0] for word in words if word.lower() not in STOP_WORDS).lower()
+
+
+def rank_candidates(query, titles):
+    """Order a disambiguation page's links by how likely each is the company meant by query."""
+    name = query.strip().lower()
+    scored = []
+    for index, title in enumerate(titles):
+        score = 0
+        if COMPANY_QUALIFIERS.search(title):
+            score += 2
+        if name and name in title.lower():
+            score += 2
+        if len(name) > 1 and _initials(title) == name.replace(" ", ""):
+            score += 3
+        if score:
+            scored.append((-score, index, title))
+    return [title for _, _, title in sorted(scored)]
+
+# === Bulk lookup ===
+
+def _batches(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def _fetch_batches(titles, workers, session, api_url):
+    """Query titles in batches of TITLES_PER_REQUEST on a thread pool; returns merged (pages, resolved)."""
+    pages, resolved = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch_pages, batch_resolved in executor.map(
+                lambda batch: query_pages(batch, session, api_url), _batches(titles, TITLES_PER_REQUEST)):
+            pages.update(batch_pages)
+            resolved.update(batch_resolved)
+    return pages, resolved
+
+
+def lookup_companies(names, workers=DEFAULT_WORKERS, session=None, api_url=API_URL):
+    """Look up many company names on Wikipedia; returns one record per distinct name, in input order.
+
+    Titles are fetched TITLES_PER_REQUEST per API request with several requests in flight.
+    A name that lands on a disambiguation page is resolved to the best-ranked linked article
+    that carries an Infobox company; the record then notes the page it was resolved from.
+    """
+    names = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+    pages, resolved = _fetch_batches(names, workers, session, api_url)
+    records = {name: page_record(name, pages.get(resolved.get(name, name), {"title": name, "missing": True}))
+               for name in names}
+
+    # Second round: follow the links of every disambiguation page, again in bulk
+    ambiguous = {name: record["title"] for name, record in records.items() if record["status"] == "disambiguation"}
+    if ambiguous:
+        links = query_links(sorted(set(ambiguous.values())), session, api_url)
+        candidates = {name: rank_candidates(name, links.get(title, []))[:MAX_CANDIDATES]
+                      for name, title in ambiguous.items()}
+        wanted = sorted({title for titles in candidates.values() for title in titles})
+        candidate_pages, candidate_resolved = _fetch_batches(wanted, workers, session, api_url) if wanted else ({}, {})
+        for name, titles in candidates.items():
+            for title in titles:
+                page = candidate_pages.get(candidate_resolved.get(title, title))
+                if page and not _is_disambiguation(page) and parse_infobox_wikitext(_wikitext_of(page)):
+                    record = page_record(name, page)
+                    record["resolved_from"] = ambiguous[name]
+                    records[name] = record
+                    break
+            else:
+                records[name]["candidates"] = titles
+    return [records[name] for name in names]
+
+
+def read_company_names(path):
+    """Read one company name per line, skipping blank lines and # comments."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def write_records(records, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
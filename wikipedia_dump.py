@@ -0,0 +1,169 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import queue
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from multiprocessing import Pool
+
+from wikipedia_infobox import lead_summary_wikitext, normalize_title, parse_infobox_wikitext
+
+DEFAULT_INDEX = "wikipedia_companies.db"
+PAGES_PER_TASK = 64  # Pages handed to a worker process at a time
+TASKS_IN_FLIGHT = 4  # Tasks queued per worker, which bounds memory while the parsers catch up
+ARTICLE_URL = "https://en.wikipedia.org/wiki/"
+
+_HAS_INFOBOX = re.compile(r"\{\{\s*Infobox[ _]+company\b", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (key TEXT PRIMARY KEY, title TEXT, summary TEXT, infobox TEXT);
+CREATE TABLE IF NOT EXISTS redirects (key TEXT PRIMARY KEY, target TEXT);
+"""
+
+# === Reading the dump ===
+
+def open_dump(path):
+    """Open a pages-articles XML dump, decompressing .bz2/.gz/.xz on the fly."""
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_pages(path):
+    """Yield (title, redirect_target, wikitext) for each main-namespace page of the dump.
+
+    Elements are cleared as soon as a page has been read, so memory stays flat however
+    large the dump is. redirect_target is None for articles.
+    """
+    with open_dump(path) as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+        for event, elem in context:
+            if event != "end" or _local(elem.tag) != "page":
+                continue
+            if elem.findtext(f"{ns}ns") == "0":
+                redirect = elem.find(f"{ns}redirect")
+                yield (elem.findtext(f"{ns}title"),
+                       redirect.get("title") if redirect is not None else None,
+                       elem.findtext(f"{ns}revision/{ns}text") or "")
+            # Finished pages are dropped from the tree, which would otherwise hold the whole dump
+            root.clear()
+
+# === Parsing in worker processes ===
+
+def parse_pages(pages):
+    """Worker: turn (title, wikitext) pairs into index rows for the pages with a company infobox."""
+    rows = []
+    for title, wikitext in pages:
+        infobox = parse_infobox_wikitext(wikitext)
+        if infobox is not None:
+            rows.append((normalize_title(title), title, lead_summary_wikitext(wikitext),
+                         json.dumps(infobox, ensure_ascii=False)))
+    return rows
+
+
+def _tasks(path, redirects, in_flight):
+    """Batch candidate pages for the workers; redirects are put on the redirects queue instead.
+
+    Runs in Pool's feeder thread while the main thread writes results, hence a queue rather
+    than a shared list. Waits on in_flight before producing each batch so the feeder cannot
+    read the dump far ahead of the parsers.
+    """
+    batch = []
+    for title, target, wikitext in iter_pages(path):
+        if target is not None:
+            redirects.put((normalize_title(title), normalize_title(target)))
+        elif _HAS_INFOBOX.search(wikitext):
+            batch.append((title, wikitext))
+            if len(batch) == PAGES_PER_TASK:
+                in_flight.acquire()
+                yield batch
+                batch = []
+    if batch:
+        in_flight.acquire()
+        yield batch
+
+# === Index ===
+
+def _drain(items):
+    """Yield what is on a queue.Queue right now, without waiting for more."""
+    while True:
+        try:
+            yield items.get_nowait()
+        except queue.Empty:
+            return
+
+
+def build_index(dump_path, index_path=DEFAULT_INDEX, workers=None):
+    """Stream dump_path into an SQLite index of company pages keyed by normalize_title().
+
+    Only pages with an {{Infobox company}} are kept, plus the redirects pointing at them.
+    The index is built next to index_path and moved into place when complete. Returns the
+    number of companies indexed.
+    """
+    workers = workers or os.cpu_count() or 1
+    tmp_path = index_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    db.executescript(SCHEMA)
+
+    redirects = queue.Queue()
+    in_flight = threading.BoundedSemaphore(workers * TASKS_IN_FLIGHT)
+    count = 0
+    with Pool(workers) as pool:
+        for rows in pool.imap_unordered(parse_pages, _tasks(dump_path, redirects, in_flight)):
+            in_flight.release()
+            db.executemany("INSERT OR REPLACE INTO companies VALUES (?, ?, ?, ?)", rows)
+            db.executemany("INSERT OR REPLACE INTO redirects VALUES (?, ?)", _drain(redirects))
+            count += len(rows)
+    db.executemany("INSERT OR REPLACE INTO redirects VALUES (?, ?)", _drain(redirects))
+    # Redirects to anything but a company are of no use for lookups
+    db.execute("DELETE FROM redirects WHERE target NOT IN (SELECT key FROM companies)")
+    db.commit()
+    db.execute("VACUUM")
+    db.close()
+    os.replace(tmp_path, index_path)
+    return count
+
+
+class DumpIndex:
+    """Offline company lookups against an index built by build_index(); no network needed."""
+
+    def __init__(self, index_path=DEFAULT_INDEX):
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No Wikipedia index at '{index_path}', build one with --build-index first")
+        self.db = sqlite3.connect(index_path)
+
+    def close(self):
+        self.db.close()
+
+    def lookup(self, name):
+        """Return a record shaped like wikipedia_api.lookup_companies() gives for one name."""
+        key = normalize_title(name)
+        row = self.db.execute("SELECT title, summary, infobox FROM companies WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            row = self.db.execute("SELECT c.title, c.summary, c.infobox FROM redirects r "
+                                  "JOIN companies c ON c.key = r.target WHERE r.key = ?", (key,)).fetchone()
+        if row is None:
+            return {"query": name, "title": None, "url": None, "status": "missing", "summary": None, "infobox": None}
+        title, summary, infobox = row
+        return {"query": name, "title": title, "url": ARTICLE_URL + title.replace(" ", "_"), "status": "found",
+                "summary": summary, "infobox": json.loads(infobox)}
+
+    def lookup_many(self, names):
+        names = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+        return [self.lookup(name) for name in names]
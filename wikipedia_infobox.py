@@ -0,0 +1,270 @@
+import html
+import re
+
+# Template:Infobox company parameters, in display order, with the labels Wikipedia renders
+# for them in the "infobox ib-company vcard" table; values of *_year parameters follow in
+# parentheses, e.g. "Revenue: US$19.42 billion (2022)"
+COMPANY_FIELDS = [
+    ("Formerly", ["former_name", "former_names"]),
+    ("Company type", ["type"]),
+    ("Traded as", ["traded_as"]),
+    ("ISIN", ["isin"]),
+    ("Industry", ["industry"]),
+    ("Genre", ["genre"]),
+    ("Predecessor", ["predecessor"]),
+    ("Predecessors", ["predecessors"]),
+    ("Successor", ["successor"]),
+    ("Successors", ["successors"]),
+    ("Founded", ["founded", "foundation"]),
+    ("Founder", ["founder"]),
+    ("Founders", ["founders"]),
+    ("Defunct", ["defunct"]),
+    ("Fate", ["fate"]),
+    ("Headquarters", ["hq_location", "location", "headquarters"]),
+    ("Number of locations", ["num_locations"]),
+    ("Area served", ["area_served"]),
+    ("Key people", ["key_people"]),
+    ("Products", ["products"]),
+    ("Brands", ["brands"]),
+    ("Production output", ["production"]),
+    ("Services", ["services"]),
+    ("Revenue", ["revenue"]),
+    ("Operating income", ["operating_income"]),
+    ("Net income", ["net_income"]),
+    ("AUM", ["aum"]),
+    ("Total assets", ["assets"]),
+    ("Total equity", ["equity"]),
+    ("Owner", ["owner"]),
+    ("Owners", ["owners"]),
+    ("Members", ["members"]),
+    ("Number of employees", ["num_employees"]),
+    ("Parent", ["parent"]),
+    ("Divisions", ["divisions"]),
+    ("Subsidiaries", ["subsid", "subsidiaries"]),
+    ("Website", ["website", "homepage", "url"]),
+]
+
+LIST_TEMPLATES = {"plainlist", "plain list", "ubl", "ublist", "unbulleted list", "flatlist", "flat list",
+                  "hlist", "bulleted list", "collapsible list", "indented plainlist"}
+DATE_TEMPLATES = {"start date", "start date and age", "end date", "end date and age", "start year", "dts"}
+DROPPED_TEMPLATES = {"efn", "refn", "sfn", "sfnp", "citation needed", "cn", "dead link", "better source",
+                     "increase", "decrease", "steady", "increasenegative", "decreasepositive", "gain", "loss",
+                     "official website", "official url", "flagicon", "wikidata", "nbsp", "cite web", "cite news"}
+TICKER_NAMES = {"nasdaq": "Nasdaq", "nyse": "NYSE", "lse": "LSE", "bse": "BSE", "nse": "NSE", "tyo": "TYO",
+                "sehk": "SEHK", "tsx": "TSX", "asx": "ASX", "fwb": "FWB", "euronext": "Euronext", "krx": "KRX",
+                "sgx": "SGX", "six": "SIX", "otc pink": "OTC Pink", "nyse american": "NYSE American"}
+CURRENCY_SYMBOLS = {"us$": "US$", "usd": "US$", "inr": "₹", "₹": "₹", "€": "€", "eur": "€", "euro": "€",
+                    "gbp": "£", "£": "£", "jpy": "¥", "yen": "¥", "cny": "CN¥", "a$": "A$", "aud": "A$"}
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+
+_INFOBOX_START = re.compile(r"\{\{\s*Infobox[ _]+company\b", re.IGNORECASE)
+_INNERMOST_TEMPLATE = re.compile(r"\{\{([^{}]*)\}\}")
+
+
+def normalize_title(title):
+    """Index key for a page title: underscores as spaces, single spaces, case-folded."""
+    return " ".join(title.replace("_", " ").split()).casefold()
+
+# === Rendered HTML (https://en.wikipedia.org/wiki/...) ===
+
+def lead_summary_html(soup, limit=3):
+    """Join the text of the first limit <p> elements, as webscraping.py always has."""
+    paragraphs = soup.find_all('p', limit=limit)
+    return " ".join([p.text.strip() for p in paragraphs if p.text.strip()])
+
+
+def parse_infobox_html(soup):
+    """Return {label: value} from the page's "infobox ib-company vcard" table, or None without one."""
+    infobox = soup.find('table', class_='infobox ib-company vcard')
+    if not infobox:
+        return None
+    details = {}
+    for row in infobox.find_all('tr'):
+        header = row.find('th')
+        data = row.find('td')
+        if header and data:
+            details[header.text.strip()] = data.text.strip()
+    return details
+
+# === Wikitext (MediaWiki API and XML dumps) ===
+
+def _split_args(text):
+    """Split template text on the pipes that are not inside [[links]] or {{templates}}."""
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(text):
+        pair = text[i:i + 2]
+        if pair in ("{{", "[["):
+            depth += 1
+            i += 2
+        elif pair in ("}}", "]]"):
+            depth = max(0, depth - 1)
+            i += 2
+        else:
+            if text[i] == "|" and depth == 0:
+                parts.append(text[start:i])
+                start = i + 1
+            i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _template_args(parts):
+    positional, named = [], {}
+    for part in parts:
+        name, equals, value = part.partition("=")
+        if equals and "[[" not in name and "{{" not in name:
+            named[name.strip().lower()] = value.strip()
+        else:
+            positional.append(part.strip())
+    return positional, named
+
+
+def _format_date(args):
+    numbers = [arg for arg in args if arg.isdigit()][:3]
+    if not numbers:
+        return " ".join(args)
+    year = numbers[0]
+    if len(numbers) >= 2 and 1 <= int(numbers[1]) <= 12:
+        month = MONTHS[int(numbers[1]) - 1]
+        return f"{int(numbers[2])} {month} {year}" if len(numbers) == 3 else f"{month} {year}"
+    return year
+
+
+def _render_template(inner):
+    """Plain-text rendering of one template that contains no other templates."""
+    parts = _split_args(inner)
+    name = parts[0].strip().lower().replace("_", " ")
+    positional, named = _template_args(parts[1:])
+
+    if name in DROPPED_TEMPLATES or name.startswith("cite "):
+        return ""
+    if name in LIST_TEMPLATES:
+        items = []
+        for arg in positional:
+            items.extend(line.lstrip("*# ").strip() for line in arg.splitlines())
+        return "\n".join(item for item in items if item)
+    if name in ("url", "official url"):
+        if len(positional) > 1 and positional[1]:
+            return positional[1]
+        return re.sub(r"^https?://", "", positional[0]).rstrip("/") if positional else ""
+    if name in DATE_TEMPLATES:
+        return _format_date(positional)
+    if name in TICKER_NAMES:
+        return f"{TICKER_NAMES[name]}: {positional[0]}" if positional else TICKER_NAMES[name]
+    if name in CURRENCY_SYMBOLS:
+        return CURRENCY_SYMBOLS[name] + (positional[0] if positional else "")
+    if name == "convert" and len(positional) >= 2:
+        return f"{positional[0]} {positional[1]}"
+    if name in ("lang", "langx") and positional:
+        return positional[-1]
+    # nowrap, nobr, small, abbr, flag, ... show their first argument
+    return positional[0] if positional else ""
+
+
+def wikitext_to_text(value):
+    """Turn a wikitext infobox value into the plain text a reader would see."""
+    value = re.sub(r"<!--.*?-->", "", value, flags=re.DOTALL)
+    value = re.sub(r"<ref[^>/]*/>", "", value, flags=re.IGNORECASE)
+    value = re.sub(r"<ref[^>]*>.*?</ref>", "", value, flags=re.IGNORECASE | re.DOTALL)
+    value = re.sub(r"<br\s*/?>", "\n", value, flags=re.IGNORECASE)
+    # Templates are rendered innermost first, so each one sees plain arguments
+    while True:
+        rendered = _INNERMOST_TEMPLATE.sub(lambda match: _render_template(match.group(1)), value)
+        if rendered == value:
+            break
+        value = rendered
+    value = re.sub(r"\[\[(?:File|Image):[^\]]*\]\]", "", value, flags=re.IGNORECASE)
+    value = re.sub(r"\[\[(?:[^|\]]*\|)?([^\]]*)\]\]", r"\1", value)
+    value = re.sub(r"\[(https?://[^\s\]]+)(?:\s+([^\]]*))?\]", lambda m: m.group(2) or m.group(1), value)
+    value = re.sub(r"'{2,}", "", value)
+    value = re.sub(r"<[^>]+>", "", value)
+    value = html.unescape(value).replace("\xa0", " ")
+    lines = [" ".join(line.split()) for line in value.splitlines()]
+    return ", ".join(line for line in lines if line)
+
+
+def _balanced_end(wikitext, start, opening="{{", closing="}}"):
+    """Index just past the closing bracket matching the one at start, or None if it is never closed."""
+    depth, i = 0, start
+    while i < len(wikitext):
+        pair = wikitext[i:i + 2]
+        if pair == opening:
+            depth += 1
+            i += 2
+        elif pair == closing:
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return None
+
+
+def find_infobox(wikitext):
+    """Return the text of the page's {{Infobox company ...}} template, or None."""
+    match = _INFOBOX_START.search(wikitext)
+    if not match:
+        return None
+    end = _balanced_end(wikitext, match.start())
+    return wikitext[match.start():end] if end else None
+
+
+def parse_infobox_wikitext(wikitext):
+    """Return {label: value} for the page's Infobox company, with the labels parse_infobox_html gives.
+
+    Returns None when the page has no company infobox.
+    """
+    infobox = find_infobox(wikitext)
+    if infobox is None:
+        return None
+    _, params = _template_args(_split_args(infobox[2:-2])[1:])
+
+    # The infobox renders city and country as one Headquarters row
+    if not any(params.get(key) for key in ("hq_location", "location", "headquarters")):
+        location = [params.get(key, "") for key in ("hq_location_city", "hq_location_country")]
+        params["hq_location"] = ", ".join(part for part in location if part.strip())
+
+    details = {}
+    for label, keys in COMPANY_FIELDS:
+        for key in keys:
+            text = wikitext_to_text(params.get(key, ""))
+            if text:
+                year = wikitext_to_text(params.get(f"{key}_year", ""))
+                details[label] = f"{text} ({year})" if year else text
+                break
+    return details
+
+
+def lead_summary_text(extract, limit=3):
+    """Join the first limit paragraphs of a plain-text lead (TextExtracts or dump lead)."""
+    paragraphs = [paragraph.strip() for paragraph in extract.split("\n") if paragraph.strip()]
+    return " ".join(paragraphs[:limit])
+
+
+def _strip_blocks(wikitext):
+    """Drop what the reader does not see as lead prose: templates, tables and images standing on their own line."""
+    kept, i = [], 0
+    while i < len(wikitext):
+        line_start = i == 0 or wikitext[i - 1] == "\n"
+        end = None
+        if line_start and wikitext.startswith("{{", i):
+            end = _balanced_end(wikitext, i)
+        elif line_start and wikitext.startswith("{|", i):
+            end = _balanced_end(wikitext, i, "{|", "|}")
+        elif line_start and re.match(r"\[\[(?:File|Image):", wikitext[i:i + 8], re.IGNORECASE):
+            end = _balanced_end(wikitext, i, "[[", "]]")
+        if end:
+            i = end
+        else:
+            kept.append(wikitext[i])
+            i += 1
+    return "".join(kept)
+
+
+def lead_summary_wikitext(wikitext, limit=3):
+    """Join the first limit lead paragraphs of an article's wikitext as plain text (for dumps)."""
+    lead = re.split(r"^==", wikitext, maxsplit=1, flags=re.MULTILINE)[0]
+    paragraphs = [wikitext_to_text(paragraph) for paragraph in re.split(r"\n\s*\n", _strip_blocks(lead))]
+    return " ".join([paragraph for paragraph in paragraphs if paragraph][:limit])